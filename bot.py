@@ -1,25 +1,38 @@
 import nonebot
 from nonebot.adapters.onebot.v11 import Adapter as ONEBOT_V11Adapter
-
-from src.common import ClientCache
-from src.common.cache.tieba_client import in_memory_cache
-from src.db import init_db
+from nonebot.message import event_preprocessor
 
 nonebot.init()
 
 driver = nonebot.get_driver()
 driver.register_adapter(ONEBOT_V11Adapter)
 
+# 以下模块在导入时读取驱动器配置，须在 nonebot.init() 之后导入
+from src.common import ClientCache, HttpClient, JobManager  # noqa: E402
+from src.common.cache import close_state_store  # noqa: E402
+from src.common.cache.tiered_cache import in_memory_cache  # noqa: E402
+from src.db import init_db  # noqa: E402
+from src.db.crud.events import start_event_migration, stop_event_migration  # noqa: E402
+from src.utils.prefilter import prefilter_message  # noqa: E402
+
+event_preprocessor(prefilter_message)
+
 
 @driver.on_startup
 async def startup():
     await init_db()
+    await start_event_migration()
     await in_memory_cache.start()
+    await HttpClient.start()
 
 
 @driver.on_shutdown
 async def shutdown():
+    await JobManager.drain()
+    await stop_event_migration()
     await ClientCache.stop()
+    await HttpClient.stop()
+    await close_state_store()
 
 
 nonebot.load_from_toml("pyproject.toml")
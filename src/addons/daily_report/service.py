@@ -6,7 +6,6 @@ from datetime import datetime, timedelta
 from io import BytesIO
 from pathlib import Path, PosixPath
 from typing import TYPE_CHECKING
-from urllib.request import urlopen
 
 import jieba_next as jieba
 import matplotlib as mpl
@@ -23,11 +22,13 @@ from wordcloud import WordCloud
 
 from logger import log
 from src.addons.interface.session import get_addon_session
-from src.common.cache import ClientCache, get_autoban_records
+from src.common import HttpClient
+from src.common.cache import ClientCache, get_autoban_records, get_user_infos_cached
+from src.common.cache.daily_report import get_report_chart, set_report_chart
 from src.db.crud import get_group, update_group
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable
+    from collections.abc import Awaitable, Callable, Iterable
 
     from src.db.models import GroupInfo
 
@@ -68,35 +69,39 @@ class BawuOpsStats:
 
 async def update_group_args(group_id: int, key: str, value: bool) -> None:
     group_info = await get_group(group_id)
-    group_args = group_info.group_args
-    group_args.update({key: value})
+    group_args = {**group_info.group_args, key: value}
     await update_group(group_id, group_args=group_args)
 
 
 _STOPWORDS_CACHE: set[str] | None = None
 
 
+async def _ensure_stopwords() -> None:
+    if STOPWORDS_PATH.exists():
+        return
+
+    content = ""
+    for url in (STOPWORDS_URL, STOPWORDS_URL_FALLBACK):
+        try:
+            resp = await HttpClient.get(url, timeout=10)
+            resp.raise_for_status()
+            content = resp.content.decode("utf-8", errors="ignore")
+            break
+        except Exception as exc:
+            log.warning(f"Failed to download stopwords from {url}: {exc}")
+
+    if content:
+        STOPWORDS_PATH.parent.mkdir(parents=True, exist_ok=True)
+        STOPWORDS_PATH.write_text(content, encoding="utf-8")
+
+
 def _load_stopwords() -> set[str]:
     global _STOPWORDS_CACHE
     if _STOPWORDS_CACHE is not None:
         return _STOPWORDS_CACHE
 
     if not STOPWORDS_PATH.exists():
-        STOPWORDS_PATH.parent.mkdir(parents=True, exist_ok=True)
-        content = ""
-        try:
-            with urlopen(STOPWORDS_URL, timeout=10) as resp:
-                content = resp.read().decode("utf-8", errors="ignore")
-        except Exception as exc:
-            log.warning(f"Failed to download stopwords: {exc}")
-            try:
-                with urlopen(STOPWORDS_URL_FALLBACK, timeout=10) as resp:
-                    content = resp.read().decode("utf-8", errors="ignore")
-            except Exception as fallback_exc:
-                log.warning(f"Failed to download stopwords via proxy: {fallback_exc}")
-                return set()
-        if content:
-            STOPWORDS_PATH.write_text(content, encoding="utf-8")
+        return set()
 
     _STOPWORDS_CACHE = {
         line.strip() for line in STOPWORDS_PATH.read_text(encoding="utf-8").splitlines() if line.strip()
@@ -274,15 +279,13 @@ async def _lookup_author_names(author_ids: list[int]) -> dict[int, str]:
     if not author_ids:
         return {}
     client = await ClientCache.get_client()
+    user_infos = await get_user_infos_cached(client, author_ids)
     names: dict[int, str] = {}
     for uid in author_ids:
-        try:
-            user_info = await client.get_user_info(uid)
-            if user_info.show_name:
-                names[uid] = user_info.show_name
-            else:
-                names[uid] = f"used_id: {uid}"
-        except Exception:
+        user_info = user_infos.get(uid)
+        if user_info is not None and user_info.show_name:
+            names[uid] = user_info.show_name
+        else:
             names[uid] = f"user_id: {uid}"
     return names
 
@@ -617,91 +620,165 @@ async def _get_bawu_ops_stats(group_id: int, fid: int, now: datetime) -> BawuOps
     return BawuOpsStats(labels, delete_counts, ban_counts, ban_excluded)
 
 
-async def build_daily_report(group_info: GroupInfo) -> tuple[str, list[bytes]]:
-    now = now_with_tz()
-    is_midnight = now.hour == 0
-
-    # ── 24小时对比图 ──────────────────────────────────────────────────
-    end_hour = now.replace(minute=0, second=0, microsecond=0)
-    if is_midnight:
-        end_hour -= timedelta(hours=1)  # 0点触发时回退到昨天23:00，排除空桶
+async def _cached_chart[T](
+    fid: int,
+    name: str,
+    bucket: datetime,
+    builder: Callable[[], Awaitable[T]],
+    cacheable: Callable[[T], bool] | None = None,
+) -> T:
+    """
+    按时间桶缓存单张图表，时间桶未变化时直接返回缓存。
+
+    Args:
+        fid (int): 贴吧fid
+        name (str): 图表名称
+        bucket (datetime): 图表所属时间桶的起点
+        builder (Callable[[], Awaitable[T]]): 图表生成函数
+        cacheable (Callable[[T], bool] | None): 判断结果是否可缓存，默认全部缓存
+
+    Returns:
+        T: 图表数据
+    """
+    bucket_key = bucket.isoformat()
+    cached = await get_report_chart(fid, name, bucket_key)
+    if cached is not None:
+        return cached
+    value = await builder()
+    if cacheable is None or cacheable(value):
+        await set_report_chart(fid, name, bucket_key, value)
+    return value
+
+
+async def _build_hourly_chart(fid: int, end_hour: datetime) -> bytes:
     start_48h = end_hour - timedelta(hours=48)
-    counts_48h = await _get_time_counts(group_info.fid, start_48h, end_hour + timedelta(hours=1), "hour")
+    counts_48h = await _get_time_counts(fid, start_48h, end_hour + timedelta(hours=1), "hour")
 
     hours_last = [end_hour - timedelta(hours=23 - i) for i in range(24)]
     hours_prev = [hour - timedelta(hours=24) for hour in hours_last]
     labels_hour = [hour.strftime("%m-%d %H") for hour in hours_last]
     last_counts = [counts_48h.get(hour, 0) for hour in hours_last]
     prev_counts = [counts_48h.get(hour, 0) for hour in hours_prev]
+    return await asyncio.to_thread(_plot_hourly_counts, labels_hour, last_counts, prev_counts)
 
-    # ── 30天每日发贴量 ────────────────────────────────────────────────
-    end_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
-    if is_midnight:
-        end_day -= timedelta(days=1)  # 0点触发时排除当天（数据为0）
+
+async def _build_daily_chart(fid: int, end_day: datetime) -> bytes:
     start_30d = end_day - timedelta(days=29)
-    counts_30d = await _get_time_counts(group_info.fid, start_30d, end_day + timedelta(days=1), "day")
+    counts_30d = await _get_time_counts(fid, start_30d, end_day + timedelta(days=1), "day")
     days_30 = [start_30d + timedelta(days=i) for i in range(30)]
     labels_day = [day.strftime("%m-%d") for day in days_30]
     daily_counts = [counts_30d.get(day, 0) for day in days_30]
+    return await asyncio.to_thread(_plot_daily_counts, labels_day, daily_counts)
 
-    # ── 等级分布 ─────────────────────────────────────────────────────
-    start_24h = now - timedelta(hours=24)
-    levels_24h, users_24h = await _get_level_counts(group_info.fid, start_24h, now)
-    start_7d = now - timedelta(days=7)
-    levels_7d, users_7d = await _get_level_counts(group_info.fid, start_7d, now)
 
-    levels_24 = _normalize_levels(levels_24h, users_24h)
-    total_24 = [levels_24h.get(level, 0) for level in levels_24]
-    users_24 = [users_24h.get(level, 0) for level in levels_24]
+async def _build_level_chart(fid: int, start: datetime, end: datetime, title: str, empty_text: str) -> bytes:
+    level_counts, user_counts = await _get_level_counts(fid, start, end)
+    levels = _normalize_levels(level_counts, user_counts)
+    if not levels:
+        return await asyncio.to_thread(_render_empty_image, empty_text)
+    totals = [level_counts.get(level, 0) for level in levels]
+    users = [user_counts.get(level, 0) for level in levels]
+    return await asyncio.to_thread(_plot_level_distribution, levels, totals, users, title)
 
-    levels_7 = _normalize_levels(levels_7d, users_7d)
-    total_7 = [levels_7d.get(level, 0) for level in levels_7]
-    users_7 = [users_7d.get(level, 0) for level in levels_7]
 
-    # ── 组装图表 ─────────────────────────────────────────────────────
-    images: list[bytes] = []
-    images.extend((
-        await asyncio.to_thread(_plot_hourly_counts, labels_hour, last_counts, prev_counts),
-        await asyncio.to_thread(_plot_daily_counts, labels_day, daily_counts),
-    ))
+async def _build_top_authors_chart(fid: int, start: datetime, end: datetime) -> bytes:
+    top_authors = await _get_top_authors(fid, start, end)
+    if not top_authors:
+        return await asyncio.to_thread(_render_empty_image, "近24小时无活跃用户数据")
 
-    if levels_24:
-        images.append(
-            await asyncio.to_thread(_plot_level_distribution, levels_24, total_24, users_24, "近24小时等级分布")
-        )
-    else:
-        images.append(await asyncio.to_thread(_render_empty_image, "近24小时无等级数据"))
-
-    if levels_7:
-        images.append(await asyncio.to_thread(_plot_level_distribution, levels_7, total_7, users_7, "近7天等级分布"))
-    else:
-        images.append(await asyncio.to_thread(_render_empty_image, "近7天无等级数据"))
-
-    # ── 最活跃用户 TOP 10 ────────────────────────────────────────────
-    top_authors = await _get_top_authors(group_info.fid, start_24h, now)
-    if top_authors:
-        author_ids = [aid for aid, _ in top_authors]
-        name_map = await _lookup_author_names(author_ids)
-        author_names = []
-        for aid in author_ids:
-            name = name_map.get(aid, str(aid))
-            author_names.append(name if len(name) <= 10 else name[:9] + "…")
-        author_counts = [cnt for _, cnt in top_authors]
-        images.append(await asyncio.to_thread(_plot_top_authors, author_names, author_counts))
-    else:
-        images.append(await asyncio.to_thread(_render_empty_image, "近24小时无活跃用户数据"))
+    author_ids = [aid for aid, _ in top_authors]
+    name_map = await _lookup_author_names(author_ids)
+    author_names = []
+    for aid in author_ids:
+        name = name_map.get(aid, str(aid))
+        author_names.append(name if len(name) <= 10 else name[:9] + "…")
+    author_counts = [cnt for _, cnt in top_authors]
+    return await asyncio.to_thread(_plot_top_authors, author_names, author_counts)
 
-    # ── 吧务操作 / 词云 ──────────────────────────────────────────────
-    bawu_stats = await _get_bawu_ops_stats(group_info.group_id, group_info.fid, now)
-    images.append(await asyncio.to_thread(_plot_bawu_ops, bawu_stats))
 
-    content_query = _content_text_query(group_info.fid, start_24h, now)
+async def _build_bawu_ops_chart(group_id: int, fid: int, now: datetime) -> tuple[bytes, BawuOpsStats]:
+    bawu_stats = await _get_bawu_ops_stats(group_id, fid, now)
+    return await asyncio.to_thread(_plot_bawu_ops, bawu_stats), bawu_stats
+
+
+async def _build_wordcloud(fid: int, start: datetime, end: datetime) -> bytes:
+    content_query = _content_text_query(fid, start, end)
     stmt_text = select(content_query.c.text).order_by(content_query.c.ctime.desc()).limit(5000)
     async with get_addon_session() as session:
         texts = [row.text for row in (await session.execute(stmt_text)).all() if row.text]
 
+    await _ensure_stopwords()
     tokens = await asyncio.to_thread(_tokenize_texts, texts)
-    images.append(await asyncio.to_thread(_render_wordcloud, tokens))
+    return await asyncio.to_thread(_render_wordcloud, tokens)
+
+
+_REPORT_LOCKS: dict[int, asyncio.Lock] = {}
+
+
+async def build_daily_report(group_info: GroupInfo) -> tuple[str, list[bytes]]:
+    """
+    生成日报，各图表按自身的时间粒度缓存，仅重建时间桶已变化的图表。
+
+    滚动窗口类图表（等级分布、活跃用户、词云）按小时缓存，30天发贴量与吧务操作按天缓存。
+    """
+    lock = _REPORT_LOCKS.setdefault(group_info.fid, asyncio.Lock())
+    async with lock:
+        return await _build_daily_report(group_info)
+
+
+async def _build_daily_report(group_info: GroupInfo) -> tuple[str, list[bytes]]:
+    fid = group_info.fid
+    now = now_with_tz()
+    is_midnight = now.hour == 0
+
+    # ── 24小时对比图 ──────────────────────────────────────────────────
+    end_hour = now.replace(minute=0, second=0, microsecond=0)
+    if is_midnight:
+        end_hour -= timedelta(hours=1)  # 0点触发时回退到昨天23:00，排除空桶
+
+    # ── 30天每日发贴量 ────────────────────────────────────────────────
+    end_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    if is_midnight:
+        end_day -= timedelta(days=1)  # 0点触发时排除当天（数据为0）
+
+    # ── 滚动窗口 ─────────────────────────────────────────────────────
+    # 窗口截止到当前时刻，整点只作为缓存键，同一小时内复用首次生成的图表
+    current_hour = now.replace(minute=0, second=0, microsecond=0)
+    start_24h = now - timedelta(hours=24)
+    start_7d = now - timedelta(days=7)
+    current_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    # ── 组装图表 ─────────────────────────────────────────────────────
+    images: list[bytes] = [
+        await _cached_chart(fid, "hourly", end_hour, lambda: _build_hourly_chart(fid, end_hour)),
+        await _cached_chart(fid, "daily", end_day, lambda: _build_daily_chart(fid, end_day)),
+        await _cached_chart(
+            fid,
+            "level_24h",
+            current_hour,
+            lambda: _build_level_chart(fid, start_24h, now, "近24小时等级分布", "近24小时无等级数据"),
+        ),
+        await _cached_chart(
+            fid,
+            "level_7d",
+            current_hour,
+            lambda: _build_level_chart(fid, start_7d, now, "近7天等级分布", "近7天无等级数据"),
+        ),
+        await _cached_chart(fid, "top_authors", current_hour, lambda: _build_top_authors_chart(fid, start_24h, now)),
+    ]
+
+    # ── 吧务操作 / 词云 ──────────────────────────────────────────────
+    bawu_image, bawu_stats = await _cached_chart(
+        fid,
+        "bawu_ops",
+        current_day,
+        lambda: _build_bawu_ops_chart(group_info.group_id, fid, now),
+        cacheable=lambda result: result[1].error is None,
+    )
+    images.extend((
+        bawu_image,
+        await _cached_chart(fid, "wordcloud", current_hour, lambda: _build_wordcloud(fid, start_24h, now)),
+    ))
 
     header = f"【本吧日报】{group_info.fname}吧\n统计时间：{now.strftime('%Y-%m-%d')}"
     if bawu_stats.error:
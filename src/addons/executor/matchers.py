@@ -28,14 +28,15 @@ async def rule_review_notify_keyword(event: GroupMessageEvent) -> bool:
 
 
 async def rule_review_notify_target(event: GroupMessageEvent) -> bool:
-    if not event.reply:
+    # Rule 中的检查会并发执行，这里先做廉价的关键词判断，避免对每条回复都读取缓存
+    if not event.reply or not await rule_review_notify_keyword(event):
         return False
     payload = await get_review_notify_payload(event.reply.real_id)
     return bool(payload)
 
 
 review_notify_cmd = on_message(
-    rule=Rule(rule_reply, rule_signed, rule_moderator, rule_review_notify_keyword, rule_review_notify_target),
+    rule=Rule(rule_reply, rule_signed, rule_moderator, rule_review_notify_target),
     permission=permission.GROUP,
     priority=9,
     block=True,
@@ -89,6 +90,8 @@ async def handle_review_notify_reply(event: GroupMessageEvent):
     if text in CHECKOUT_KEYWORDS:
         client = await ClientCache.get_bawu_client(event.group_id)
         checkout_msg, checkout_img = await generate_checkout_msg(client, object_dto.author_id)
+        if not checkout_msg:
+            await review_notify_cmd.finish("用户信息获取失败，请稍后重试。")
         await review_notify_cmd.finish(message=MessageSegment.text(checkout_msg) + MessageSegment.image(checkout_img))
 
 
@@ -139,6 +142,8 @@ async def handle_review_notify_reaction(event: NoticeEvent):
     client = await ClientCache.get_bawu_client(group_id)
     if emoji_id == "10068":
         checkout_msg, checkout_img = await generate_checkout_msg(client, object_dto.author_id)
+        if not checkout_msg:
+            await review_notify_reaction.finish(MessageSegment.reply(message_id) + "用户信息获取失败，请稍后重试。")
         await review_notify_reaction.finish(
             message=MessageSegment.reply(message_id)
             + MessageSegment.text(checkout_msg)
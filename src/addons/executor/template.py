@@ -9,7 +9,7 @@ from pydantic import BaseModel
 from tiebameow.models.dto import CommentDTO, PostDTO, ThreadDTO  # noqa: TC002
 from tiebameow.schemas.rules import ReviewRule  # noqa: TC002
 
-from src.common.cache import ClientCache
+from src.common.cache import ClientCache, get_user_info_cached
 from src.utils.renderer import render_content
 
 
@@ -89,7 +89,7 @@ class DefaultTemplate(Template):
             )
             suffix_message_str += f"执行操作：{ban_status}\n"
 
-        user_info = await client.get_user_info(self.dto.author_id)
+        user_info = await get_user_info_cached(client, self.dto.author_id)
         suffix_message_str += f"用户：{user_info.show_name} ({user_info.tieba_uid})\n"
         suffix_message_str += f"https://tieba.baidu.com/p/{self.dto.tid}"
         if isinstance(self.dto, PostDTO):
@@ -163,7 +163,7 @@ class AIReviewTemplate(Template):
             )
             suffix_message_str += f"执行操作：{ban_status}\n"
 
-        user_info = await client.get_user_info(self.dto.author_id)
+        user_info = await get_user_info_cached(client, self.dto.author_id)
         suffix_message_str += f"用户：{user_info.show_name} ({user_info.tieba_uid})\n"
         suffix_message_str += f"链接：https://tieba.baidu.com/p/{self.dto.tid}"
         if isinstance(self.dto, PostDTO):
@@ -72,7 +72,7 @@ async def handle_check_posts_plus(
     if user_info.user_id == 0:
         await check_posts_plus_cmd.finish("用户信息获取失败，请稍后重试。")
 
-    producer = DBProducer(user_info, fids)
+    producer = DBProducer(user_info, fids, event.group_id)
     try:
         await consumer(producer, check_posts_plus_cmd)
     finally:
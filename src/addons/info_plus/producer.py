@@ -3,13 +3,16 @@ from __future__ import annotations
 import asyncio
 from typing import TYPE_CHECKING, NamedTuple
 
-from src.addons.interface.crud.user_posts import get_user_history_mixed
+from src.addons.interface.crud.user_posts import get_user_history_page
+from src.common import JobManager
 from src.common.cache import get_tieba_name
 from src.utils import text_to_image
 
 if TYPE_CHECKING:
     from aiotieba.api.tieba_uid2user_info._classdef import UserInfo_TUid
 
+    from src.common import Job
+
 
 class UserHistoryItem(NamedTuple):
     tieba_name: str
@@ -18,23 +21,24 @@ class UserHistoryItem(NamedTuple):
 
 
 class DBProducer:
-    def __init__(self, user_info: UserInfo_TUid, fids: list[int] | None):
+    def __init__(self, user_info: UserInfo_TUid, fids: list[int] | None, group_id: int | None = None):
         self.queue: asyncio.Queue[bytes | None] = asyncio.Queue(maxsize=4)
         self.buffer: list[dict[str, str]] = []
         self.user_info = user_info
         self.fids = fids
-        self.current_page = 1
+        self.cursor: str | None = None
         self.page_show = 1
         self.batch_size = 50
-        self.producer_task = asyncio.create_task(self._producer())
+        self.job = JobManager.submit("查发言plus", self._producer, group_id=group_id, interactive=True)
+        self.producer_task = self.job.task
 
     async def _fetch_batch(self) -> bool:
         """获取单个批次的数据"""
-        items = await get_user_history_mixed(
-            self.user_info.user_id, self.fids, page=self.current_page, limit=self.batch_size
+        items, self.cursor = await get_user_history_page(
+            self.user_info.user_id, self.fids, cursor=self.cursor, limit=self.batch_size
         )
 
-        has_empty = len(items) == 0
+        has_empty = self.cursor is None
         new_items = []
 
         for item in items:
@@ -72,13 +76,20 @@ class DBProducer:
             footer=f"第 {page} 页",
         )
 
-    async def _producer(self):
+    def _close_queue(self) -> None:
+        """向队列放入结束标记，队列已满时丢弃一项以保证消费者能收到结束标记"""
+        try:
+            self.queue.put_nowait(None)
+        except asyncio.QueueFull:
+            self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+    async def _producer(self, job: Job):
         """生产者主循环"""
         try:
             while True:
                 if len(self.buffer) < 20:
                     has_empty = await self._fetch_batch()
-                    self.current_page += 1
 
                     if has_empty:
                         while self.buffer:
@@ -88,25 +99,25 @@ class DBProducer:
                             self.page_show += 1
                         await self.queue.put(None)
                         return
-
-                    continue
                 else:
                     chunk = self.buffer[:20]
                     self.buffer = self.buffer[20:]
                     await self.queue.put(await self._generate_msg(chunk, self.page_show))
                     self.page_show += 1
+                job.report(f"已生成 {self.page_show - 1} 张图片")
 
-        except asyncio.CancelledError:
-            pass
-        except Exception:
-            try:
-                self.queue.put_nowait(None)
-            except asyncio.QueueFull:
-                pass
+        except (asyncio.CancelledError, Exception):
+            self._close_queue()
 
     async def get(self) -> bytes | None:
-        """获取数据"""
-        return await self.queue.get()
+        """获取数据，任务在排队阶段即被取消时返回 None"""
+        if not self.queue.empty() or not self.producer_task.done():
+            getter = asyncio.ensure_future(self.queue.get())
+            await asyncio.wait((getter, self.producer_task), return_when=asyncio.FIRST_COMPLETED)
+            if getter.done():
+                return getter.result()
+            getter.cancel()
+        return self.queue.get_nowait() if not self.queue.empty() else None
 
     async def stop(self):
         """停止数据获取"""
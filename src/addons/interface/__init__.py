@@ -1,14 +1,25 @@
 from nonebot import get_driver, get_plugin_config
 from redis.asyncio import Redis
 
-from src.common.cache import close_redis_pool, get_redis, init_redis_pool
+from src.common.cache import TieredCache, close_redis_pool, get_redis, init_redis_pool
+from src.db.crud.autoban import subscribe_enabled_bans
 
 from .config import Config
-from .session import close_addon_db, get_addon_session, init_addon_db
+from .session import (
+    close_addon_db,
+    ensure_addon_indexes,
+    get_addon_session,
+    init_addon_db,
+    start_addon_index_build,
+    stop_addon_index_build,
+)
 
 __all__ = [
     "init_addon_db",
     "close_addon_db",
+    "ensure_addon_indexes",
+    "start_addon_index_build",
+    "stop_addon_index_build",
     "get_addon_session",
     "get_redis_client",
 ]
@@ -20,12 +31,18 @@ plugin_config = get_plugin_config(Config)
 @driver.on_startup
 async def init_interface():
     await init_addon_db(str(plugin_config.database_url))
+    if plugin_config.addon_pg_create_indexes:
+        await start_addon_index_build()
     init_redis_pool(str(plugin_config.redis_url))
+    subscribe_enabled_bans()
+    await TieredCache.start()
 
 
 @driver.on_shutdown
 async def close_interface():
+    await stop_addon_index_build()
     await close_addon_db()
+    await TieredCache.stop()
     await close_redis_pool()
 
 
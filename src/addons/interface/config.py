@@ -17,6 +17,7 @@ class Config(BaseModel):
     addon_pg_username: str
     addon_pg_password: str
     addon_pg_db: str
+    addon_pg_create_indexes: bool = False
 
     @model_validator(mode="before")
     @classmethod
@@ -1,13 +1,20 @@
 from __future__ import annotations
 
-from datetime import datetime  # noqa: TC003
-from typing import Literal, NamedTuple
+import base64
+import json
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Literal, NamedTuple
 
-from sqlalchemy import func, literal, select, union_all
+from sqlalchemy import and_, func, literal, or_, select, union_all
 from tiebameow.models.orm import Comment, Post, Thread
 
 from src.addons.interface.session import get_addon_session
 
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+    from sqlalchemy import ColumnElement, Row, Select
+
 
 class UserHistoryItem(NamedTuple):
     type: Literal["thread", "post", "comment"]
@@ -25,16 +32,28 @@ class UserStats(NamedTuple):
     comment_count: int
 
 
-async def get_user_history_mixed(
-    user_id: int,
-    fids: list[int] | None = None,
-    page: int = 1,
-    limit: int = 20,
-) -> list[UserHistoryItem]:
-    """
-    获取用户在所有/指定吧的混合历史记录 (主题帖、回复、楼中楼)
-    """
+class _HistoryCursor(NamedTuple):
+    create_time: datetime
+    type: str
+    id: int
+
+
+def encode_history_cursor(item: UserHistoryItem) -> str:
+    """将历史记录编码为不透明的分页游标"""
+    raw = json.dumps([item.create_time.isoformat(), item.type, item.id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_history_cursor(cursor: str) -> _HistoryCursor:
+    try:
+        create_time, type_, id_ = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return _HistoryCursor(datetime.fromisoformat(create_time), str(type_), int(id_))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"无效的分页游标: {cursor}") from e
 
+
+def _history_selects(user_id: int, fids: list[int] | None) -> list[tuple[str, Select, Any, Any]]:
+    """构造主题帖、回复、楼中楼三个分支的查询，返回 (类型, 查询, 时间列, ID列)"""
     q_thread = select(
         literal("thread").label("type"),
         Thread.tid.label("id"),
@@ -77,61 +96,182 @@ async def get_user_history_mixed(
         q_post = q_post.where(Post.fid.in_(fids))
         q_comment = q_comment.where(Comment.fid.in_(fids))
 
-    combined_query = union_all(q_thread, q_post, q_comment).subquery()
+    return [
+        ("thread", q_thread, Thread.create_time, Thread.tid),
+        ("post", q_post, Post.create_time, Post.pid),
+        ("comment", q_comment, Comment.create_time, Comment.cid),
+    ]
+
+
+def _keyset_filter(kind: str, create_time_col: Any, id_col: Any, cursor: _HistoryCursor) -> ColumnElement[bool]:
+    """
+    生成 (create_time, type, id) < cursor 的条件。
+
+    每个分支的 type 为常量，因此可以化简为只涉及 (create_time, id) 的条件，便于命中 author_id + create_time 索引。
+    """
+    if kind < cursor.type:
+        return create_time_col <= cursor.create_time
+    if kind == cursor.type:
+        return or_(
+            create_time_col < cursor.create_time,
+            and_(create_time_col == cursor.create_time, id_col < cursor.id),
+        )
+    return create_time_col < cursor.create_time
+
+
+def _to_history_item(row: Row) -> UserHistoryItem:
+    return UserHistoryItem(
+        type=row.type,
+        id=row.id,
+        fid=row.fid,
+        title=row.title,
+        text=row.text or "",
+        create_time=row.create_time,
+    )
+
+
+async def get_user_history_mixed(
+    user_id: int,
+    fids: list[int] | None = None,
+    page: int = 1,
+    limit: int = 20,
+) -> list[UserHistoryItem]:
+    """
+    获取用户在所有/指定吧的混合历史记录 (主题帖、回复、楼中楼)
 
-    stmt = select(combined_query).order_by(combined_query.c.create_time.desc()).offset((page - 1) * limit).limit(limit)
+    使用 OFFSET 分页，深翻页开销随页码线性增长，连续翻页请使用 get_user_history_page。
+    """
+    combined_query = union_all(*(stmt for _, stmt, _, _ in _history_selects(user_id, fids))).subquery()
+
+    stmt = (
+        select(combined_query)
+        .order_by(combined_query.c.create_time.desc(), combined_query.c.type.desc(), combined_query.c.id.desc())
+        .offset((page - 1) * limit)
+        .limit(limit)
+    )
 
     async with get_addon_session() as session:
         result = await session.execute(stmt)
+        return [_to_history_item(row) for row in result.all()]
 
-        return [
-            UserHistoryItem(
-                type=row.type,
-                id=row.id,
-                fid=row.fid,
-                title=row.title,
-                text=row.text or "",
-                create_time=row.create_time,
-            )
-            for row in result.all()
-        ]
 
+async def get_user_history_page(
+    user_id: int,
+    fids: list[int] | None = None,
+    cursor: str | None = None,
+    limit: int = 20,
+) -> tuple[list[UserHistoryItem], str | None]:
+    """
+    按 (create_time, type, id) 倒序的键集分页获取用户混合历史记录
 
-async def get_user_stats(user_id: int) -> list[UserStats]:
+    Args:
+        user_id (int): 用户 user_id
+        fids (list[int] | None): 限定的贴吧 fid 列表
+        cursor (str | None): 上一页返回的游标，为 None 时从最新记录开始
+        limit (int): 每页数量
+
+    Returns:
+        tuple[list[UserHistoryItem], str | None]: 本页记录与下一页游标，没有更多记录时游标为 None
     """
-    获取用户在各吧的发言统计 (主题帖、回复、楼中楼数量)
+    decoded = _decode_history_cursor(cursor) if cursor else None
+
+    branches = []
+    for kind, stmt, create_time_col, id_col in _history_selects(user_id, fids):
+        if decoded is not None:
+            stmt = stmt.where(_keyset_filter(kind, create_time_col, id_col, decoded))
+        # 每个分支先各自取 limit 条，合并后只需对至多 3*limit 条排序
+        stmt = stmt.order_by(create_time_col.desc(), id_col.desc()).limit(limit)
+        branches.append(select(stmt.subquery()))
+
+    combined_query = union_all(*branches).subquery()
+    stmt = (
+        select(combined_query)
+        .order_by(combined_query.c.create_time.desc(), combined_query.c.type.desc(), combined_query.c.id.desc())
+        .limit(limit)
+    )
+
+    async with get_addon_session() as session:
+        result = await session.execute(stmt)
+        items = [_to_history_item(row) for row in result.all()]
+
+    next_cursor = encode_history_cursor(items[-1]) if len(items) == limit else None
+    return items, next_cursor
+
+
+async def stream_user_history(
+    user_id: int,
+    fids: list[int] | None = None,
+    batch_size: int = 100,
+) -> AsyncIterator[UserHistoryItem]:
+    """
+    以服务端游标流式读取用户的全部混合历史记录，按时间倒序逐条产出
     """
+    combined_query = union_all(*(stmt for _, stmt, _, _ in _history_selects(user_id, fids))).subquery()
+    stmt = (
+        select(combined_query)
+        .order_by(combined_query.c.create_time.desc(), combined_query.c.type.desc(), combined_query.c.id.desc())
+        .execution_options(yield_per=batch_size)
+    )
+
     async with get_addon_session() as session:
-        # 1. 统计 Thread
-        stmt_thread = select(Thread.fid, func.count(Thread.tid)).where(Thread.author_id == user_id).group_by(Thread.fid)
-        # 2. 统计 Post
-        stmt_post = select(Post.fid, func.count(Post.pid)).where(Post.author_id == user_id).group_by(Post.fid)
-        # 3. 统计 Comment
-        stmt_comment = (
-            select(Comment.fid, func.count(Comment.cid)).where(Comment.author_id == user_id).group_by(Comment.fid)
-        )
+        result = await session.stream(stmt)
+        async for row in result:
+            yield _to_history_item(row)  # noqa: ASYNC119
 
-        res_thread = (await session.execute(stmt_thread)).all()
-        res_post = (await session.execute(stmt_post)).all()
-        res_comment = (await session.execute(stmt_comment)).all()
 
-        from collections import defaultdict
+async def get_user_stats(user_id: int) -> list[UserStats]:
+    """
+    获取用户在各吧的发言统计 (主题帖、回复、楼中楼数量)
 
-        stats = defaultdict(lambda: {"thread": 0, "post": 0, "comment": 0})
+    三张表的分组计数合并为一次查询，配合 (author_id, fid) 索引可走仅索引扫描。
+    """
+    q_thread = (
+        select(
+            Thread.fid.label("fid"),
+            func.count().label("thread_count"),
+            literal(0).label("post_count"),
+            literal(0).label("comment_count"),
+        )
+        .where(Thread.author_id == user_id)
+        .group_by(Thread.fid)
+    )
+    q_post = (
+        select(
+            Post.fid.label("fid"),
+            literal(0).label("thread_count"),
+            func.count().label("post_count"),
+            literal(0).label("comment_count"),
+        )
+        .where(Post.author_id == user_id)
+        .group_by(Post.fid)
+    )
+    q_comment = (
+        select(
+            Comment.fid.label("fid"),
+            literal(0).label("thread_count"),
+            literal(0).label("post_count"),
+            func.count().label("comment_count"),
+        )
+        .where(Comment.author_id == user_id)
+        .group_by(Comment.fid)
+    )
 
-        for fid, count in res_thread:
-            stats[fid]["thread"] = count
-        for fid, count in res_post:
-            stats[fid]["post"] = count
-        for fid, count in res_comment:
-            stats[fid]["comment"] = count
+    combined = union_all(q_thread, q_post, q_comment).subquery()
+    stmt = select(
+        combined.c.fid,
+        func.sum(combined.c.thread_count).label("thread_count"),
+        func.sum(combined.c.post_count).label("post_count"),
+        func.sum(combined.c.comment_count).label("comment_count"),
+    ).group_by(combined.c.fid)
 
+    async with get_addon_session() as session:
+        result = await session.execute(stmt)
         return [
             UserStats(
-                fid=fid,
-                thread_count=data["thread"],
-                post_count=data["post"],
-                comment_count=data["comment"],
+                fid=row.fid,
+                thread_count=int(row.thread_count),
+                post_count=int(row.post_count),
+                comment_count=int(row.comment_count),
             )
-            for fid, data in stats.items()
+            for row in result.all()
         ]
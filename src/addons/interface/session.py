@@ -1,10 +1,15 @@
 from __future__ import annotations
 
+import asyncio
 from contextlib import asynccontextmanager
 from typing import TYPE_CHECKING
 
 from nonebot import get_driver
+from sqlalchemy import Index, MetaData, text
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from tiebameow.models.orm import Comment, Post, Thread
+
+from logger import log
 
 if TYPE_CHECKING:
     from collections.abc import AsyncGenerator
@@ -28,6 +33,73 @@ async def init_addon_db(addon_db_url: str) -> None:
         _addon_sessionmaker = async_sessionmaker(_addon_engine, class_=AsyncSession, expire_on_commit=False)
 
 
+# 用户发言统计 (get_user_stats) 按 author_id 过滤、按 fid 分组，该组合索引可支持仅索引扫描
+# 索引名 -> (表, 列)，在 ensure_addon_indexes 中构建，不挂到 tiebameow 的表元数据上
+ADDON_INDEXES: dict[str, tuple[type[Thread | Post | Comment], tuple[str, ...]]] = {
+    "ix_bot_thread_author_fid": (Thread, ("author_id", "fid")),
+    "ix_bot_post_author_fid": (Post, ("author_id", "fid")),
+    "ix_bot_comment_author_fid": (Comment, ("author_id", "fid")),
+}
+
+_index_task: asyncio.Task | None = None
+
+
+def _build_index(name: str, model: type[Thread | Post | Comment], columns: tuple[str, ...]) -> Index:
+    table = model.__table__.to_metadata(MetaData())
+    return Index(name, *(table.c[column] for column in columns), postgresql_concurrently=True)
+
+
+async def ensure_addon_indexes() -> None:
+    """
+    在高级功能数据库上创建 bot 查询所需的索引。
+
+    已存在且有效的索引会被跳过；CONCURRENTLY 构建中断后留下的无效索引会被删除并重建。
+    """
+    if _addon_engine is None:
+        raise RuntimeError("Addon database is not initialized. Call init_addon_db first.")
+
+    # CREATE INDEX CONCURRENTLY 不能在事务中执行
+    async with _addon_engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        for name, (model, columns) in ADDON_INDEXES.items():
+            index = _build_index(name, model, columns)
+            qualified = f"{index.table.schema}.{name}" if index.table.schema else name
+            try:
+                valid = await conn.scalar(
+                    text("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"),
+                    {"name": qualified},
+                )
+                if valid:
+                    continue
+                if valid is not None:
+                    log.warning(f"Addon index {name} is invalid, rebuilding")
+                    await conn.run_sync(index.drop)
+                await conn.run_sync(index.create)
+            except Exception as e:
+                log.warning(f"Failed to create addon index {name}: {e}")
+            else:
+                log.info(f"Addon index {name} created")
+
+
+async def start_addon_index_build() -> None:
+    """在后台创建索引，构建期间不阻塞启动"""
+    global _index_task
+    if _index_task is None or _index_task.done():
+        _index_task = asyncio.create_task(ensure_addon_indexes())
+
+
+async def stop_addon_index_build() -> None:
+    """取消未完成的索引构建，须在 close_addon_db 之前调用；留下的无效索引在下次构建时重建"""
+    global _index_task
+    if _index_task is not None and not _index_task.done():
+        _index_task.cancel()
+        try:
+            await _index_task
+        except asyncio.CancelledError:
+            pass
+    _index_task = None
+
+
 async def close_addon_db() -> None:
     global _addon_engine, _addon_sessionmaker
 
@@ -5,8 +5,15 @@ from .cache import (
     get_user_threads_cached,
     tieba_uid2user_info_cached,
 )
+from .http_client import HttpClient
+from .jobs import Job, JobManager
+from .ratelimit import TokenBucket
 
 __all__ = [
+    "HttpClient",
+    "Job",
+    "JobManager",
+    "TokenBucket",
     "ClientCache",
     "get_tieba_name",
     "get_user_threads_cached",
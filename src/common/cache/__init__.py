@@ -1,5 +1,6 @@
-from .appeal import del_appeal_id, get_appeal_id, get_appeals, set_appeal_id, set_appeals
+from .appeal import add_appeal, del_appeal_id, get_appeal_id, get_appeals, refresh_appeals, remove_appeal, set_appeal_id
 from .autoban import add_autoban_record, get_autoban_count, get_autoban_records, trim_autoban_records
+from .clear_posts import get_all_clear_posts_records, remove_clear_posts_record, set_clear_posts_record
 from .disk_cache import disk_cache
 from .force_delete import (
     add_force_delete_record,
@@ -7,8 +8,15 @@ from .force_delete import (
     remove_force_delete_record,
     save_force_delete_records,
 )
-from .redis_pool import close_redis_pool, get_redis, init_redis_pool
+from .group_member import (
+    GroupMember,
+    get_group_member,
+    invalidate_group_member,
+    update_group_member_role,
+)
+from .redis_pool import close_redis_pool, get_binary_redis, get_redis, init_redis_pool, is_redis_initialized
 from .review_notify import get_review_notify_payload, set_review_notify_payload
+from .state_store import StateStore, close_state_store, get_state_store
 from .tieba_client import (
     ClientCache,
     get_tieba_name,
@@ -16,11 +24,16 @@ from .tieba_client import (
     get_user_threads_cached,
     tieba_uid2user_info_cached,
 )
+from .tiered_cache import CacheNamespace, TieredCache
+from .user_contents import SlimPage, SlimUserPost, SlimUserPosts, SlimUserThread
+from .user_info import get_user_info_cache_stats, get_user_info_cached, get_user_infos_cached
 
 __all__ = [
     "get_appeals",
     "get_appeal_id",
-    "set_appeals",
+    "add_appeal",
+    "remove_appeal",
+    "refresh_appeals",
     "del_appeal_id",
     "set_appeal_id",
     "get_autoban_records",
@@ -35,11 +48,32 @@ __all__ = [
     "get_user_threads_cached",
     "get_user_posts_cached",
     "tieba_uid2user_info_cached",
+    "SlimPage",
+    "SlimUserPost",
+    "SlimUserPosts",
+    "SlimUserThread",
+    "get_user_info_cached",
+    "get_user_infos_cached",
+    "get_user_info_cache_stats",
     "add_force_delete_record",
     "remove_force_delete_record",
     "get_all_force_delete_records",
     "save_force_delete_records",
+    "get_all_clear_posts_records",
+    "set_clear_posts_record",
+    "remove_clear_posts_record",
+    "GroupMember",
+    "get_group_member",
+    "update_group_member_role",
+    "invalidate_group_member",
     "init_redis_pool",
     "close_redis_pool",
     "get_redis",
+    "get_binary_redis",
+    "is_redis_initialized",
+    "CacheNamespace",
+    "TieredCache",
+    "StateStore",
+    "get_state_store",
+    "close_state_store",
 ]
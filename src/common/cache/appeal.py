@@ -1,18 +1,49 @@
+from itertools import starmap
+
 from .disk_cache import disk_cache
+from .state_store import get_state_store
 
+EXPIRE = 2 * 24 * 3600
+
+_migrated_groups: set[int] = set()
 
-async def get_appeals(group_id: int) -> list[tuple[int, int]]:
-    key = f"appeal:group:{group_id}"
-    appeals = await disk_cache.get(key)
-    if appeals is None:
-        appeals = []
-        await disk_cache.set(key, appeals, expire="2d")
-    return appeals
 
+def _member(appeal_id: int, user_id: int) -> str:
+    return f"{appeal_id}:{user_id}"
 
-async def set_appeals(group_id: int, appeals: list[tuple[int, int]]) -> None:
+
+async def _migrate_legacy_appeals(group_id: int) -> None:
+    """将旧版整体存放在磁盘缓存中的申诉列表迁移到状态存储"""
+    if group_id in _migrated_groups:
+        return
     key = f"appeal:group:{group_id}"
-    await disk_cache.set(key, appeals, expire="2d")
+    if legacy := await disk_cache.get(key):
+        await get_state_store().sadd(key, *starmap(_member, legacy), expire=EXPIRE)
+    await disk_cache.delete(key)
+    _migrated_groups.add(group_id)
+
+
+async def get_appeals(group_id: int) -> list[tuple[int, int]]:
+    """获取已推送的申诉，返回 (appeal_id, user_id) 列表"""
+    await _migrate_legacy_appeals(group_id)
+    members = await get_state_store().smembers(f"appeal:group:{group_id}")
+    return [(int(appeal_id), int(user_id)) for appeal_id, user_id in (member.split(":") for member in members)]
+
+
+async def add_appeal(group_id: int, appeal_id: int, user_id: int) -> None:
+    """记录已推送的申诉"""
+    await _migrate_legacy_appeals(group_id)
+    await get_state_store().sadd(f"appeal:group:{group_id}", _member(appeal_id, user_id), expire=EXPIRE)
+
+
+async def remove_appeal(group_id: int, appeal_id: int, user_id: int) -> None:
+    """移除已处理的申诉记录"""
+    await get_state_store().srem(f"appeal:group:{group_id}", _member(appeal_id, user_id))
+
+
+async def refresh_appeals(group_id: int) -> None:
+    """刷新申诉记录的过期时间"""
+    await get_state_store().expire(f"appeal:group:{group_id}", EXPIRE)
 
 
 async def get_appeal_id(message_id: int) -> tuple[int, int]:
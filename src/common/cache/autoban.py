@@ -6,15 +6,27 @@ from typing import Any
 from tiebameow.utils.time_utils import SHANGHAI_TZ, now_with_tz
 
 from .disk_cache import disk_cache
+from .state_store import get_state_store
 
+EXPIRE = 10 * 24 * 3600
 
-async def get_autoban_records(fid: int) -> list[dict[str, Any]]:
+_migrated_fids: set[int] = set()
+
+
+async def _migrate_legacy_records(fid: int) -> None:
+    """将旧版整体存放在磁盘缓存中的循封记录迁移到状态存储"""
+    if fid in _migrated_fids:
+        return
     key = f"autoban:fid:{fid}"
-    records = await disk_cache.get(key)
-    if records is None:
-        records = []
-        await disk_cache.set(key, records, expire="10d")
-    return records
+    if legacy := await disk_cache.get(key):
+        await get_state_store().rpush(key, *legacy, expire=EXPIRE)
+    await disk_cache.delete(key)
+    _migrated_fids.add(fid)
+
+
+async def get_autoban_records(fid: int) -> list[dict[str, Any]]:
+    await _migrate_legacy_records(fid)
+    return await get_state_store().lrange(f"autoban:fid:{fid}")
 
 
 async def add_autoban_record(fid: int, count: int, at_time: datetime | None = None) -> None:
@@ -24,9 +36,10 @@ async def add_autoban_record(fid: int, count: int, at_time: datetime | None = No
         at_time = now_with_tz()
     elif at_time.tzinfo is None:
         at_time = at_time.replace(tzinfo=SHANGHAI_TZ)
-    records = await get_autoban_records(fid)
-    records.append({"time": at_time.isoformat(), "count": int(count)})
-    await disk_cache.set(f"autoban:fid:{fid}", records, expire="10d")
+    await _migrate_legacy_records(fid)
+    await get_state_store().rpush(
+        f"autoban:fid:{fid}", {"time": at_time.isoformat(), "count": int(count)}, expire=EXPIRE
+    )
 
 
 async def get_autoban_count(fid: int, since: datetime) -> int:
@@ -50,11 +63,10 @@ async def get_autoban_count(fid: int, since: datetime) -> int:
 
 
 async def trim_autoban_records(fid: int, before: datetime) -> None:
+    """丢弃早于 before 的记录，记录按追加顺序存放，只需截掉开头连续的过期部分"""
     records = await get_autoban_records(fid)
-    if not records:
-        return
 
-    keep: list[dict[str, Any]] = []
+    stale = 0
     for record in records:
         raw_time = record.get("time")
         try:
@@ -64,6 +76,7 @@ async def trim_autoban_records(fid: int, before: datetime) -> None:
         if record_time and record_time.tzinfo is None:
             record_time = record_time.replace(tzinfo=SHANGHAI_TZ)
         if record_time and record_time >= before:
-            keep.append(record)
+            break
+        stale += 1
 
-    await disk_cache.set(f"autoban:fid:{fid}", keep, expire="10d")
+    await get_state_store().ltrim(f"autoban:fid:{fid}", stale)
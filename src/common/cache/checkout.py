@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import nonebot
+
+from .disk_cache import disk_cache
+
+config = nonebot.get_driver().config
+CHECKOUT_CACHE_TTL: int = getattr(config, "checkout_cache_ttl", 1800)
+
+
+async def get_follow_forums_cache(user_id: int) -> list[dict[str, int | str]] | None:
+    key = f"co:forums:{user_id}"
+    return await disk_cache.get(key)
+
+
+async def set_follow_forums_cache(user_id: int, forums: list[dict[str, int | str]]) -> None:
+    key = f"co:forums:{user_id}"
+    await disk_cache.set(key, forums, expire=CHECKOUT_CACHE_TTL)
+
+
+async def get_post_fid_counts_cache(user_id: int) -> dict[int, int] | None:
+    key = f"co:fids:{user_id}"
+    return await disk_cache.get(key)
+
+
+async def set_post_fid_counts_cache(user_id: int, counts: dict[int, int]) -> None:
+    key = f"co:fids:{user_id}"
+    await disk_cache.set(key, counts, expire=CHECKOUT_CACHE_TTL)
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from typing import TypedDict
+
+from .state_store import get_state_store
+
+
+class ClearPostsInfo(TypedDict):
+    bot_id: str
+    group_id: int
+    fid: int
+    operator_id: int
+    user_ids: list[int]  # 尚未清理完成的用户
+
+
+KEY = "cp:tasks"
+EXPIRE = 7 * 24 * 3600
+
+
+async def get_all_clear_posts_records() -> dict[str, ClearPostsInfo]:
+    """获取所有未完成的清空发言任务记录"""
+    return await get_state_store().hgetall(KEY)
+
+
+async def set_clear_posts_record(task_id: str, info: ClearPostsInfo) -> None:
+    """添加或更新清空发言任务记录"""
+    await get_state_store().hset(KEY, task_id, info, expire=EXPIRE)
+
+
+async def remove_clear_posts_record(task_id: str) -> None:
+    """移除清空发言任务记录"""
+    await get_state_store().hdel(KEY, task_id)
@@ -0,0 +1,16 @@
+from typing import Any
+
+from .disk_cache import disk_cache
+
+
+async def get_report_chart(fid: int, name: str, bucket: str) -> Any | None:
+    key = f"dr:{fid}:{name}"
+    cached = await disk_cache.get(key)
+    if not cached or cached[0] != bucket:
+        return None
+    return cached[1]
+
+
+async def set_report_chart(fid: int, name: str, bucket: str, value: Any) -> None:
+    key = f"dr:{fid}:{name}"
+    await disk_cache.set(key, (bucket, value), expire="2d")
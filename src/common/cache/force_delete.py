@@ -3,6 +3,7 @@ from __future__ import annotations
 from typing import TypedDict
 
 from .disk_cache import disk_cache
+from .state_store import get_state_store
 
 
 class TaskInfo(TypedDict):
@@ -17,32 +18,32 @@ class TaskInfo(TypedDict):
 
 
 KEY = "fd:tasks"
+EXPIRE = 30 * 24 * 3600
+
+
+async def _migrate_legacy_records() -> None:
+    """将旧版整体存放在磁盘缓存单个键下的任务记录迁移到状态存储"""
+    if tasks := await disk_cache.get(KEY):
+        await save_force_delete_records(tasks)
+        await disk_cache.delete(KEY)
 
 
 async def get_all_force_delete_records() -> dict[str, TaskInfo]:
     """获取所有持久化的任务记录"""
-    tasks = await disk_cache.get(KEY)
-    if tasks is None:
-        tasks = {}
-        await disk_cache.set(KEY, tasks, expire="30d")
-    return tasks
+    await _migrate_legacy_records()
+    return await get_state_store().hgetall(KEY)
 
 
 async def add_force_delete_record(task_id: str, info: TaskInfo) -> None:
-    """添加任务记录到持久化缓存"""
-    tasks = await get_all_force_delete_records()
-    tasks[task_id] = info
-    await disk_cache.set(KEY, tasks, expire="30d")
+    """添加任务记录到持久化存储"""
+    await get_state_store().hset(KEY, task_id, info, expire=EXPIRE)
 
 
 async def remove_force_delete_record(task_id: str) -> None:
-    """从持久化缓存移除任务记录"""
-    tasks = await get_all_force_delete_records()
-    if task_id in tasks:
-        del tasks[task_id]
-        await disk_cache.set(KEY, tasks, expire="30d")
+    """从持久化存储移除任务记录"""
+    await get_state_store().hdel(KEY, task_id)
 
 
 async def save_force_delete_records(tasks: dict[str, TaskInfo]) -> None:
-    """保存所有任务记录到持久化缓存"""
-    await disk_cache.set(KEY, tasks, expire="30d")
+    """批量保存任务记录到持久化存储"""
+    await get_state_store().hset_many(KEY, tasks, expire=EXPIRE)
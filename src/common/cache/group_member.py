@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING
+
+import nonebot
+
+from .tiered_cache import in_memory_cache
+
+if TYPE_CHECKING:
+    from nonebot.adapters import Bot
+
+config = nonebot.get_driver().config
+# 群主转让等变动没有对应的通知事件，依赖过期时间兜底
+GROUP_MEMBER_CACHE_TTL: int = getattr(config, "group_member_cache_ttl", 1800)
+GROUP_MEMBER_NAMESPACE = "gmember"
+
+
+@dataclass(frozen=True, slots=True)
+class GroupMember:
+    """
+    群成员的角色与名称
+
+    Attributes:
+        role (str): owner、admin 或 member
+        name (str): 群名片，为空时为昵称
+    """
+
+    role: str
+    name: str
+
+
+def _key(group_id: int, user_id: int) -> str:
+    return f"{GROUP_MEMBER_NAMESPACE}:{group_id}:{user_id}"
+
+
+async def get_group_member(bot: Bot, group_id: int, user_id: int) -> GroupMember | None:
+    """
+    获取群成员的角色与名称，未缓存时调用 get_group_member_info 并写入缓存。
+
+    Returns:
+        GroupMember | None: 用户不在群中或接口调用失败时为 None
+    """
+    if (member := await in_memory_cache.get(_key(group_id, user_id))) is not None:
+        return member
+
+    try:
+        data = await bot.call_api("get_group_member_info", group_id=group_id, user_id=user_id)
+    except Exception:
+        return None
+    member = GroupMember(role=data.get("role", "member"), name=data.get("card_new", "") or data.get("nickname", ""))
+    await set_group_member(group_id, user_id, member)
+    return member
+
+
+async def set_group_member(group_id: int, user_id: int, member: GroupMember) -> None:
+    await in_memory_cache.set(
+        _key(group_id, user_id), member, ttl=GROUP_MEMBER_CACHE_TTL, namespace=GROUP_MEMBER_NAMESPACE
+    )
+
+
+async def update_group_member_role(group_id: int, user_id: int, role: str) -> None:
+    """群管理员变动时更新已缓存成员的角色，未缓存的成员在下次访问时获取"""
+    if (member := await in_memory_cache.get(_key(group_id, user_id))) is not None:
+        await set_group_member(group_id, user_id, replace(member, role=role))
+
+
+async def invalidate_group_member(group_id: int, user_id: int) -> None:
+    await in_memory_cache.delete(_key(group_id, user_id))
@@ -5,26 +5,40 @@ from redis.asyncio.connection import ConnectionPool
 
 _redis_pool: ConnectionPool | None = None
 _redis_client: Redis | None = None
+_binary_pool: ConnectionPool | None = None
+_binary_client: Redis | None = None
 
 
 def init_redis_pool(url: str, decode_responses: bool = True) -> None:
-    global _redis_pool
+    global _redis_pool, _binary_pool
     if _redis_pool is None:
         _redis_pool = ConnectionPool.from_url(
             url,
             decode_responses=decode_responses,
             max_connections=20,
         )
+    if _binary_pool is None:
+        _binary_pool = ConnectionPool.from_url(url, decode_responses=False, max_connections=20)
 
 
 async def close_redis_pool() -> None:
-    global _redis_pool, _redis_client
+    global _redis_pool, _redis_client, _binary_pool, _binary_client
     if _redis_client:
         await _redis_client.aclose()
         _redis_client = None
     if _redis_pool:
         await _redis_pool.disconnect()
         _redis_pool = None
+    if _binary_client:
+        await _binary_client.aclose()
+        _binary_client = None
+    if _binary_pool:
+        await _binary_pool.disconnect()
+        _binary_pool = None
+
+
+def is_redis_initialized() -> bool:
+    return _redis_pool is not None
 
 
 def get_redis() -> Redis:
@@ -34,3 +48,13 @@ def get_redis() -> Redis:
     if _redis_client is None:
         _redis_client = Redis(connection_pool=_redis_pool)
     return _redis_client
+
+
+def get_binary_redis() -> Redis:
+    """获取不解码响应的 Redis 客户端，用于存取序列化后的二进制数据。"""
+    global _binary_client
+    if _binary_pool is None:
+        raise RuntimeError("Redis pool not initialized. Call init_redis_pool first.")
+    if _binary_client is None:
+        _binary_client = Redis(connection_pool=_binary_pool)
+    return _binary_client
@@ -0,0 +1,297 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any
+
+import aiosqlite
+import nonebot
+from redis.asyncio import Redis
+
+from .disk_cache import CACHE_DIR
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+    from redis.asyncio.client import Pipeline
+
+config = nonebot.get_driver().config
+# 留空时使用本地 SQLite，填写 redis:// 地址时使用 Redis
+STATE_STORE_URL: str = getattr(config, "state_store_url", "")
+STATE_DB_PATH = CACHE_DIR / "state.db"
+
+
+class StateStore(ABC):
+    """
+    状态存储
+
+    提供按元素操作的哈希、列表与集合，每个操作都是原子的，避免整体读改写导致的并发覆盖。
+    哈希与列表的值以 JSON 序列化，集合成员为字符串。expire 为秒数，写入时刷新整个键的过期时间。
+    """
+
+    @abstractmethod
+    async def hset(self, key: str, field: str, value: Any, *, expire: int | None = None) -> None: ...
+
+    @abstractmethod
+    async def hset_many(self, key: str, mapping: Mapping[str, Any], *, expire: int | None = None) -> None: ...
+
+    @abstractmethod
+    async def hget(self, key: str, field: str) -> Any | None: ...
+
+    @abstractmethod
+    async def hgetall(self, key: str) -> dict[str, Any]: ...
+
+    @abstractmethod
+    async def hdel(self, key: str, *fields: str) -> None: ...
+
+    @abstractmethod
+    async def rpush(self, key: str, *values: Any, expire: int | None = None) -> None: ...
+
+    @abstractmethod
+    async def lrange(self, key: str) -> list[Any]: ...
+
+    @abstractmethod
+    async def ltrim(self, key: str, start: int) -> None:
+        """丢弃列表前 start 个元素"""
+
+    @abstractmethod
+    async def sadd(self, key: str, *members: str, expire: int | None = None) -> None: ...
+
+    @abstractmethod
+    async def srem(self, key: str, *members: str) -> None: ...
+
+    @abstractmethod
+    async def sismember(self, key: str, member: str) -> bool: ...
+
+    @abstractmethod
+    async def smembers(self, key: str) -> set[str]: ...
+
+    @abstractmethod
+    async def expire(self, key: str, expire: int) -> None: ...
+
+    @abstractmethod
+    async def close(self) -> None: ...
+
+
+class SQLiteStateStore(StateStore):
+    """基于本地 SQLite 的状态存储，过期的键在下次访问时清理"""
+
+    _SCHEMA = """
+    CREATE TABLE IF NOT EXISTS state_hash (
+        key TEXT NOT NULL, field TEXT NOT NULL, value TEXT NOT NULL, PRIMARY KEY (key, field)
+    ) WITHOUT ROWID;
+    CREATE TABLE IF NOT EXISTS state_list (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT NOT NULL, value TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS ix_state_list_key ON state_list (key, id);
+    CREATE TABLE IF NOT EXISTS state_set (
+        key TEXT NOT NULL, member TEXT NOT NULL, PRIMARY KEY (key, member)
+    ) WITHOUT ROWID;
+    CREATE TABLE IF NOT EXISTS state_expiry (
+        key TEXT PRIMARY KEY, expire_at REAL NOT NULL
+    ) WITHOUT ROWID;
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._conn: aiosqlite.Connection | None = None
+        self._lock = asyncio.Lock()
+
+    async def _connect(self) -> aiosqlite.Connection:
+        if self._conn is None:
+            self._conn = await aiosqlite.connect(self.path)
+            await self._conn.execute("PRAGMA journal_mode=WAL")
+            await self._conn.executescript(self._SCHEMA)
+            await self._conn.commit()
+        return self._conn
+
+    async def _purge_if_expired(self, conn: aiosqlite.Connection, key: str) -> None:
+        async with conn.execute("SELECT expire_at FROM state_expiry WHERE key = ?", (key,)) as cursor:
+            row = await cursor.fetchone()
+        if row is not None and row[0] <= time.time():
+            for table in ("state_hash", "state_list", "state_set", "state_expiry"):
+                await conn.execute(f"DELETE FROM {table} WHERE key = ?", (key,))  # noqa: S608
+
+    async def _set_expire(self, conn: aiosqlite.Connection, key: str, expire: int | None) -> None:
+        if expire is not None:
+            await conn.execute(
+                "INSERT OR REPLACE INTO state_expiry (key, expire_at) VALUES (?, ?)", (key, time.time() + expire)
+            )
+
+    async def _fetchall(self, key: str, sql: str, *params: Any) -> list[aiosqlite.Row]:
+        async with self._lock:
+            conn = await self._connect()
+            await self._purge_if_expired(conn, key)
+            await conn.commit()
+            async with conn.execute(sql, (key, *params)) as cursor:
+                return list(await cursor.fetchall())
+
+    async def _write(self, key: str, sql: str | None, params: list[tuple[Any, ...]], expire: int | None = None) -> None:
+        async with self._lock:
+            conn = await self._connect()
+            try:
+                await self._purge_if_expired(conn, key)
+                if sql is not None and params:
+                    await conn.executemany(sql, params)
+                await self._set_expire(conn, key, expire)
+                await conn.commit()
+            except Exception:
+                await conn.rollback()
+                raise
+
+    async def hset(self, key: str, field: str, value: Any, *, expire: int | None = None) -> None:
+        await self.hset_many(key, {field: value}, expire=expire)
+
+    async def hset_many(self, key: str, mapping: Mapping[str, Any], *, expire: int | None = None) -> None:
+        await self._write(
+            key,
+            "INSERT OR REPLACE INTO state_hash (key, field, value) VALUES (?, ?, ?)",
+            [(key, field, json.dumps(value)) for field, value in mapping.items()],
+            expire,
+        )
+
+    async def hget(self, key: str, field: str) -> Any | None:
+        rows = await self._fetchall(key, "SELECT value FROM state_hash WHERE key = ? AND field = ?", field)
+        return json.loads(rows[0][0]) if rows else None
+
+    async def hgetall(self, key: str) -> dict[str, Any]:
+        rows = await self._fetchall(key, "SELECT field, value FROM state_hash WHERE key = ?")
+        return {field: json.loads(value) for field, value in rows}
+
+    async def hdel(self, key: str, *fields: str) -> None:
+        await self._write(key, "DELETE FROM state_hash WHERE key = ? AND field = ?", [(key, field) for field in fields])
+
+    async def rpush(self, key: str, *values: Any, expire: int | None = None) -> None:
+        await self._write(
+            key,
+            "INSERT INTO state_list (key, value) VALUES (?, ?)",
+            [(key, json.dumps(value)) for value in values],
+            expire,
+        )
+
+    async def lrange(self, key: str) -> list[Any]:
+        rows = await self._fetchall(key, "SELECT value FROM state_list WHERE key = ? ORDER BY id")
+        return [json.loads(row[0]) for row in rows]
+
+    async def ltrim(self, key: str, start: int) -> None:
+        if start <= 0:
+            return
+        await self._write(
+            key,
+            "DELETE FROM state_list WHERE id IN (SELECT id FROM state_list WHERE key = ? ORDER BY id LIMIT ?)",
+            [(key, start)],
+        )
+
+    async def sadd(self, key: str, *members: str, expire: int | None = None) -> None:
+        await self._write(
+            key, "INSERT OR IGNORE INTO state_set (key, member) VALUES (?, ?)", [(key, m) for m in members], expire
+        )
+
+    async def srem(self, key: str, *members: str) -> None:
+        await self._write(key, "DELETE FROM state_set WHERE key = ? AND member = ?", [(key, m) for m in members])
+
+    async def sismember(self, key: str, member: str) -> bool:
+        return bool(await self._fetchall(key, "SELECT 1 FROM state_set WHERE key = ? AND member = ?", member))
+
+    async def smembers(self, key: str) -> set[str]:
+        rows = await self._fetchall(key, "SELECT member FROM state_set WHERE key = ?")
+        return {member for (member,) in rows}
+
+    async def expire(self, key: str, expire: int) -> None:
+        await self._write(key, None, [], expire)
+
+    async def close(self) -> None:
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+
+
+class RedisStateStore(StateStore):
+    """基于 Redis 的状态存储，适合多实例共享状态"""
+
+    def __init__(self, url: str) -> None:
+        self._redis = Redis.from_url(url, decode_responses=True)
+
+    @staticmethod
+    async def _execute(pipe: Pipeline, key: str, expire: int | None) -> None:
+        if expire is not None:
+            pipe.expire(key, expire)
+        await pipe.execute()
+
+    async def hset(self, key: str, field: str, value: Any, *, expire: int | None = None) -> None:
+        await self.hset_many(key, {field: value}, expire=expire)
+
+    async def hset_many(self, key: str, mapping: Mapping[str, Any], *, expire: int | None = None) -> None:
+        if mapping:
+            async with self._redis.pipeline(transaction=True) as pipe:
+                pipe.hset(key, mapping={field: json.dumps(value) for field, value in mapping.items()})
+                await self._execute(pipe, key, expire)
+
+    async def hget(self, key: str, field: str) -> Any | None:
+        value = await self._redis.hget(key, field)
+        return json.loads(value) if value is not None else None
+
+    async def hgetall(self, key: str) -> dict[str, Any]:
+        return {field: json.loads(value) for field, value in (await self._redis.hgetall(key)).items()}
+
+    async def hdel(self, key: str, *fields: str) -> None:
+        if fields:
+            await self._redis.hdel(key, *fields)
+
+    async def rpush(self, key: str, *values: Any, expire: int | None = None) -> None:
+        if values:
+            async with self._redis.pipeline(transaction=True) as pipe:
+                pipe.rpush(key, *(json.dumps(value) for value in values))
+                await self._execute(pipe, key, expire)
+
+    async def lrange(self, key: str) -> list[Any]:
+        return [json.loads(value) for value in await self._redis.lrange(key, 0, -1)]
+
+    async def ltrim(self, key: str, start: int) -> None:
+        if start > 0:
+            await self._redis.ltrim(key, start, -1)
+
+    async def sadd(self, key: str, *members: str, expire: int | None = None) -> None:
+        if members:
+            async with self._redis.pipeline(transaction=True) as pipe:
+                pipe.sadd(key, *members)
+                await self._execute(pipe, key, expire)
+
+    async def srem(self, key: str, *members: str) -> None:
+        if members:
+            await self._redis.srem(key, *members)
+
+    async def sismember(self, key: str, member: str) -> bool:
+        return bool(await self._redis.sismember(key, member))
+
+    async def smembers(self, key: str) -> set[str]:
+        return set(await self._redis.smembers(key))
+
+    async def expire(self, key: str, expire: int) -> None:
+        await self._redis.expire(key, expire)
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+_state_store: StateStore | None = None
+
+
+def get_state_store() -> StateStore:
+    """获取全局状态存储实例，连接在首次操作时建立"""
+    global _state_store
+    if _state_store is None:
+        if STATE_STORE_URL.startswith(("redis://", "rediss://")):
+            _state_store = RedisStateStore(STATE_STORE_URL)
+        else:
+            _state_store = SQLiteStateStore(STATE_STORE_URL or STATE_DB_PATH.as_posix())
+    return _state_store
+
+
+async def close_state_store() -> None:
+    global _state_store
+    if _state_store is not None:
+        await _state_store.close()
+        _state_store = None
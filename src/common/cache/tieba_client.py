@@ -6,16 +6,14 @@ from typing import TYPE_CHECKING
 from aiotieba.api.tieba_uid2user_info._classdef import UserInfo_TUid
 from tiebameow.client import Client
 
-if TYPE_CHECKING:
-    from aiotieba.api.get_user_contents._classdef import UserPostss, UserThreads
-
-
 from src.db.crud import get_group
 
 from .disk_cache import disk_cache
-from .ttl_cache import TTLCache
+from .tiered_cache import FORUM_NAME, TIEBA_UID, USER_POSTS, USER_THREADS, TieredCache, in_memory_cache
+from .user_contents import slim_user_posts, slim_user_threads
 
-in_memory_cache = TTLCache(capacity=1000, default_ttl=300)
+if TYPE_CHECKING:
+    from .user_contents import SlimPage, SlimUserPosts, SlimUserThread
 
 
 class ClientCache:
@@ -162,38 +160,40 @@ class ClientCache:
 
 
 async def tieba_uid2user_info_cached(client: Client, tieba_uid: int) -> UserInfo_TUid:
-    key = f"tieba_uid2user_info_cached:{tieba_uid}"
-    if ret := await in_memory_cache.get(key):
+    if ret := await TieredCache.get(TIEBA_UID, tieba_uid):
         return ret
     try:
         ret = await client.tieba_uid2user_info(tieba_uid)
     except Exception:
         return UserInfo_TUid()
-    await in_memory_cache.set(key, ret, ttl=300)
+    await TieredCache.set(TIEBA_UID, tieba_uid, ret)
     return ret
 
 
-async def get_user_threads_cached(client: Client, user_id: int, pn: int) -> UserThreads:
-    key = f"get_user_threads_cached:{user_id}:{pn}"
-    if ret := await in_memory_cache.get(key):
+async def get_user_threads_cached(client: Client, user_id: int, pn: int) -> SlimPage[SlimUserThread]:
+    """获取用户主题帖历史的一页，缓存中只保存精简投影"""
+    key = f"{user_id}:{pn}"
+    if (ret := await TieredCache.get(USER_THREADS, key)) is not None:
         return ret
-    ret = await client.get_user_threads(user_id, pn=pn)
-    await in_memory_cache.set(key, ret, ttl=180)
+    ret = slim_user_threads(await client.get_user_threads(user_id, pn=pn))
+    if not ret.failed:
+        await TieredCache.set(USER_THREADS, key, ret)
     return ret
 
 
-async def get_user_posts_cached(client: Client, user_id: int, pn: int, rn: int) -> UserPostss:
-    key = f"get_user_posts_cached:{user_id}:{pn}:{rn}"
-    if ret := await in_memory_cache.get(key):
+async def get_user_posts_cached(client: Client, user_id: int, pn: int, rn: int) -> SlimPage[SlimUserPosts]:
+    """获取用户回复历史的一页，缓存中只保存精简投影"""
+    key = f"{user_id}:{pn}:{rn}"
+    if (ret := await TieredCache.get(USER_POSTS, key)) is not None:
         return ret
-    ret = await client.get_user_posts(user_id, pn=pn, rn=rn)
-    await in_memory_cache.set(key, ret, ttl=180)
+    ret = slim_user_posts(await client.get_user_posts(user_id, pn=pn, rn=rn))
+    if not ret.failed:
+        await TieredCache.set(USER_POSTS, key, ret)
     return ret
 
 
 async def get_tieba_name(fid: int) -> str:
-    key = f"tb:fid:{fid}"
-    if name := await disk_cache.get(key):
+    if name := await TieredCache.get(FORUM_NAME, fid):
         return name
 
     err_key = f"tb:err:{fid}"
@@ -204,7 +204,7 @@ async def get_tieba_name(fid: int) -> str:
     name = await client.get_fname(fid)
 
     if name:
-        await disk_cache.set(key, name)
+        await TieredCache.set(FORUM_NAME, fid, name)
     else:
         await disk_cache.set(err_key, 1, expire=5)
 
@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import pickle
+import uuid
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+import nonebot
+
+from logger import log
+
+from .disk_cache import disk_cache
+from .redis_pool import get_binary_redis, get_redis, is_redis_initialized
+from .ttl_cache import TTLCache
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+config = nonebot.get_driver().config
+CACHE_MEMORY_BUDGET_MB: int = getattr(config, "cache_memory_budget_mb", 256)
+CACHE_MAX_ENTRIES: int = getattr(config, "cache_max_entries", 20000)
+
+INVALIDATE_CHANNEL = "tiebabot:cache:invalidate"
+# 区分本实例发出的失效广播
+INSTANCE_ID = uuid.uuid4().hex
+# 失效广播订阅中断后重新订阅的退避时间（秒）
+LISTEN_RETRY_MIN_DELAY = 1
+LISTEN_RETRY_MAX_DELAY = 60
+
+
+@dataclass(frozen=True)
+class CacheNamespace:
+    """
+    缓存命名空间
+
+    Attributes:
+        name (str): 命名空间前缀，完整键为 {name}:{key}
+        ttl (int): 进程内缓存（L1）的过期时间（秒）
+        shared_ttl (int | None): Redis 共享缓存（L2）的过期时间（秒），为 None 时不过期
+        disk (bool): 未启用 Redis 时是否以本地磁盘缓存作为 L2
+        memory_share (float | None): 在 L1 内存预算中所占的最大比例，为 None 时只受总预算限制
+    """
+
+    name: str
+    ttl: int
+    shared_ttl: int | None
+    disk: bool = False
+    memory_share: float | None = None
+
+
+USER_INFO = CacheNamespace("uinfo:uid", ttl=300, shared_ttl=86400, disk=True, memory_share=0.15)
+TIEBA_UID = CacheNamespace("uinfo:tuid", ttl=300, shared_ttl=3600, memory_share=0.05)
+FORUM_NAME = CacheNamespace("tb:fid", ttl=3600, shared_ttl=None, disk=True, memory_share=0.02)
+# 发贴历史只缓存 user_contents 中的精简投影，各级缓存共用同一格式
+USER_THREADS = CacheNamespace("uthreads:slim", ttl=180, shared_ttl=180, memory_share=0.3)
+USER_POSTS = CacheNamespace("uposts:slim", ttl=180, shared_ttl=180, memory_share=0.4)
+NAMESPACES = (USER_INFO, TIEBA_UID, FORUM_NAME, USER_THREADS, USER_POSTS)
+
+_budget = CACHE_MEMORY_BUDGET_MB * 1024 * 1024
+in_memory_cache = TTLCache(
+    capacity=CACHE_MAX_ENTRIES,
+    default_ttl=300,
+    max_bytes=_budget,
+    quotas={ns.name: int(_budget * ns.memory_share) for ns in NAMESPACES if ns.memory_share is not None},
+)
+
+
+class TieredCache:
+    """
+    两级缓存
+
+    L1 为进程内的 TTLCache；启用高级功能并初始化 Redis 后，L2 为各实例共享的 Redis，
+    否则对标记了 disk 的命名空间使用本地磁盘缓存。L2 中的值以 pickle 序列化，取出后仍是原本的 aiotieba 对象。
+    invalidate 会通过 Redis 发布订阅通知其他实例清除各自的 L1；订阅中断时按退避重连，重连后清空 L1。
+    缓存之外的进程内状态可通过 broadcast 与 on_invalidate 复用同一频道同步失效。
+
+    Attributes:
+        _stats (dict[str, dict[str, int]]): 各命名空间的 L1/L2 命中与未命中次数。
+        _listener (asyncio.Task | None): 订阅失效广播的后台任务。
+        _handlers (dict[str, Callable[[str], None]]): 键前缀 -> 收到其他实例失效广播或重新订阅时的回调。
+    """
+
+    _stats: dict[str, dict[str, int]] = {}
+    _listener: asyncio.Task | None = None
+    _handlers: dict[str, Callable[[str], None]] = {}
+
+    @staticmethod
+    def _key(namespace: CacheNamespace, key: str | int) -> str:
+        return f"{namespace.name}:{key}"
+
+    @classmethod
+    def _record(cls, namespace: CacheNamespace, field: str) -> None:
+        stats = cls._stats.setdefault(namespace.name, {"l1_hits": 0, "l2_hits": 0, "misses": 0})
+        stats[field] += 1
+
+    @classmethod
+    async def get(cls, namespace: CacheNamespace, key: str | int) -> Any | None:
+        """依次查询 L1 和 L2，L2 命中时回填 L1。"""
+        full_key = cls._key(namespace, key)
+        if (value := await in_memory_cache.get(full_key)) is not None:
+            cls._record(namespace, "l1_hits")
+            return value
+
+        value = size = None
+        if is_redis_initialized():
+            try:
+                if (raw := await get_binary_redis().get(full_key)) is not None:
+                    value, size = pickle.loads(raw), len(raw)  # noqa: S301
+            except Exception as e:
+                log.warning(f"Failed to read shared cache {full_key}: {e}")
+        elif namespace.disk:
+            value = await disk_cache.get(full_key)
+
+        if value is None:
+            cls._record(namespace, "misses")
+            return None
+        cls._record(namespace, "l2_hits")
+        await in_memory_cache.set(full_key, value, ttl=namespace.ttl, namespace=namespace.name, size=size)
+        return value
+
+    @classmethod
+    async def set(cls, namespace: CacheNamespace, key: str | int, value: Any) -> None:
+        """写入 L1 和 L2。"""
+        full_key = cls._key(namespace, key)
+        if not is_redis_initialized():
+            await in_memory_cache.set(full_key, value, ttl=namespace.ttl, namespace=namespace.name)
+            if namespace.disk:
+                await disk_cache.set(full_key, value, expire=namespace.shared_ttl)
+            return
+
+        # 序列化一次，同时用于 L1 的大小统计和写入 L2
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        await in_memory_cache.set(full_key, value, ttl=namespace.ttl, namespace=namespace.name, size=len(data))
+        try:
+            await get_binary_redis().set(full_key, data, ex=namespace.shared_ttl)
+        except Exception as e:
+            log.warning(f"Failed to write shared cache {full_key}: {e}")
+
+    @classmethod
+    async def invalidate(cls, namespace: CacheNamespace, key: str | int) -> None:
+        """删除各级缓存中的条目，并广播给其他实例。"""
+        full_key = cls._key(namespace, key)
+        await in_memory_cache.delete(full_key)
+        if is_redis_initialized():
+            await get_binary_redis().delete(full_key)
+            await get_redis().publish(INVALIDATE_CHANNEL, json.dumps({"origin": INSTANCE_ID, "key": full_key}))
+        elif namespace.disk:
+            await disk_cache.delete(full_key)
+
+    @classmethod
+    async def broadcast(cls, key: str) -> None:
+        """只通知其他实例键已失效，不修改本实例的缓存；未初始化 Redis 时不做任何事。"""
+        if is_redis_initialized():
+            await get_redis().publish(INVALIDATE_CHANNEL, json.dumps({"origin": INSTANCE_ID, "key": key}))
+
+    @classmethod
+    def on_invalidate(cls, prefix: str, handler: Callable[[str], None]) -> None:
+        """
+        注册回调，收到其他实例发出的以 prefix 开头的键失效广播时调用。
+
+        订阅中断并重新订阅后会以 prefix 本身调用一次，表示中断期间的广播已丢失，该前缀下的状态均应丢弃。
+        """
+        cls._handlers[prefix] = handler
+
+    @classmethod
+    def _notify(cls, key: str) -> None:
+        for prefix, handler in cls._handlers.items():
+            if key.startswith(prefix):
+                try:
+                    handler(key)
+                except Exception as e:
+                    log.warning(f"Failed to handle invalidation of {key}: {e}")
+
+    @classmethod
+    async def _reset_after_gap(cls) -> None:
+        await in_memory_cache.clear()
+        for prefix in cls._handlers:
+            cls._notify(prefix)
+
+    @classmethod
+    async def _listen(cls) -> None:
+        delay = LISTEN_RETRY_MIN_DELAY
+        resubscribe = False
+        while True:
+            pubsub = get_redis().pubsub()
+            try:
+                await pubsub.subscribe(INVALIDATE_CHANNEL)
+                if resubscribe:
+                    # 中断期间其他实例的失效广播已丢失，本实例的 L1 与进程内状态都可能过期
+                    await cls._reset_after_gap()
+                    log.info("Resubscribed to cache invalidation channel, local cache cleared")
+                resubscribe = True
+                delay = LISTEN_RETRY_MIN_DELAY
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    try:
+                        payload = json.loads(message["data"])
+                    except (TypeError, ValueError):
+                        continue
+                    if payload.get("origin") == INSTANCE_ID:
+                        continue
+                    key = payload["key"]
+                    await in_memory_cache.delete(key)
+                    cls._notify(key)
+                log.warning(f"Cache invalidation subscription ended, retrying in {delay}s")
+            except Exception as e:
+                log.warning(f"Cache invalidation subscription failed: {e}, retrying in {delay}s")
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception as e:
+                    log.debug(f"Failed to close cache invalidation subscription: {e}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, LISTEN_RETRY_MAX_DELAY)
+
+    @classmethod
+    async def start(cls) -> None:
+        """Redis 初始化后开始订阅失效广播。"""
+        if is_redis_initialized() and (cls._listener is None or cls._listener.done()):
+            cls._listener = asyncio.create_task(cls._listen())
+            log.info("Tiered cache shared tier enabled")
+
+    @classmethod
+    async def stop(cls) -> None:
+        """停止订阅失效广播，需在关闭 Redis 连接池前调用。"""
+        if cls._listener is not None and not cls._listener.done():
+            cls._listener.cancel()
+            try:
+                await cls._listener
+            except asyncio.CancelledError:
+                pass
+        cls._listener = None
+
+    @classmethod
+    def get_memory_stats(cls) -> dict[str, Any]:
+        """获取 L1 的常驻字节数、各命名空间占用与淘汰次数。"""
+        return in_memory_cache.get_stats()
+
+    @classmethod
+    def get_stats(cls) -> dict[str, dict[str, float]]:
+        """获取各命名空间的命中统计。"""
+        result: dict[str, dict[str, float]] = {}
+        for name, stats in cls._stats.items():
+            total = stats["l1_hits"] + stats["l2_hits"] + stats["misses"]
+            hits = stats["l1_hits"] + stats["l2_hits"]
+            result[name] = {**stats, "total": total, "hit_rate": hits / total if total else 0.0}
+        return result
@@ -1,30 +1,108 @@
 import asyncio
+import pickle
+import sys
 import time
 from collections import OrderedDict
+from dataclasses import dataclass
 from typing import Any
 
 from logger import log
 
+DEFAULT_NAMESPACE = "default"
+
+
+def estimate_size(value: Any) -> int:
+    """以 pickle 序列化后的长度估算对象占用的字节数，无法序列化时退回 sys.getsizeof"""
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+@dataclass
+class _Entry:
+    value: Any
+    expire_time: float
+    size: int
+    namespace: str
+
+
+@dataclass
+class NamespaceUsage:
+    entries: int = 0
+    bytes: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
 
 class TTLCache:
-    def __init__(self, capacity: int, default_ttl: int = 60, cleanup_interval: int = 600):
+    """
+    带过期时间的 LRU 缓存
+
+    除条目数上限外，按估算的字节数限制总内存占用（max_bytes）和各命名空间的占用（quotas），
+    超出时按 LRU 顺序淘汰。超过所属限额的单个条目不会被缓存。
+
+    Attributes:
+        capacity (int): 最大条目数
+        max_bytes (int | None): 总字节数上限，为 None 时不限制
+        quotas (dict[str, int]): 各命名空间的字节数上限
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        default_ttl: int = 60,
+        cleanup_interval: int = 600,
+        max_bytes: int | None = None,
+        quotas: dict[str, int] | None = None,
+    ):
         self.capacity = capacity
         self.default_ttl = default_ttl
         self.cleanup_interval = cleanup_interval
-        self.cache: OrderedDict[str, tuple[Any, float]] = OrderedDict()
+        self.max_bytes = max_bytes
+        self.quotas = quotas or {}
+        self.cache: OrderedDict[str, _Entry] = OrderedDict()
+        # 各命名空间内部的 LRU 顺序，用于按配额淘汰
+        self._namespace_keys: dict[str, OrderedDict[str, None]] = {}
+        self._usage: dict[str, NamespaceUsage] = {}
+        self._resident_bytes = 0
         self._lock = asyncio.Lock()
         self._cleanup_task: asyncio.Task | None = None
         self._started = False
 
+    def _remove(self, key: str, *, reason: str | None = None) -> None:
+        entry = self.cache.pop(key, None)
+        if entry is None:
+            return
+        self._namespace_keys[entry.namespace].pop(key, None)
+        usage = self._usage[entry.namespace]
+        usage.entries -= 1
+        usage.bytes -= entry.size
+        self._resident_bytes -= entry.size
+        if reason == "eviction":
+            usage.evictions += 1
+        elif reason == "expiration":
+            usage.expirations += 1
+
+    def _evict_for(self, namespace: str) -> None:
+        quota = self.quotas.get(namespace)
+        keys = self._namespace_keys[namespace]
+        while quota is not None and self._usage[namespace].bytes > quota and keys:
+            self._remove(next(iter(keys)), reason="eviction")
+        while self.cache and (
+            len(self.cache) > self.capacity or (self.max_bytes is not None and self._resident_bytes > self.max_bytes)
+        ):
+            self._remove(next(iter(self.cache)), reason="eviction")
+
     async def _cleanup_loop(self):
         while True:
             try:
                 await asyncio.sleep(self.cleanup_interval)
                 async with self._lock:
                     current_time = time.time()
-                    keys_to_remove = [key for key, (_, expire_time) in self.cache.items() if current_time > expire_time]
+                    keys_to_remove = [key for key, entry in self.cache.items() if current_time > entry.expire_time]
                     for key in keys_to_remove:
-                        self.cache.pop(key, None)
+                        self._remove(key, reason="expiration")
             except asyncio.CancelledError:
                 break
             except Exception as e:
@@ -51,32 +129,73 @@ class TTLCache:
             if key not in self.cache:
                 return None
 
-            value, expire_time = self.cache[key]
-            if time.time() > expire_time:
-                self.cache.pop(key)
+            entry = self.cache[key]
+            if time.time() > entry.expire_time:
+                self._remove(key, reason="expiration")
                 return None
 
             self.cache.move_to_end(key)
-            return value
-
-    async def set(self, key: str, value: Any, ttl: int | None = None) -> None:
+            self._namespace_keys[entry.namespace].move_to_end(key)
+            return entry.value
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: int | None = None,
+        namespace: str = DEFAULT_NAMESPACE,
+        size: int | None = None,
+    ) -> None:
+        """写入缓存，size 为已知的序列化大小，省略时自动估算"""
         if ttl is None:
             ttl = self.default_ttl
+        if size is None:
+            size = estimate_size(value)
 
         if not self._started:
             await self.start()
 
         async with self._lock:
-            if key in self.cache:
-                self.cache.move_to_end(key)
+            self._remove(key)
+            limit = min(self.quotas.get(namespace, sys.maxsize), self.max_bytes or sys.maxsize)
+            if size > limit:
+                return
+
+            self.cache[key] = _Entry(value, time.time() + ttl, size, namespace)
+            self._namespace_keys.setdefault(namespace, OrderedDict())[key] = None
+            usage = self._usage.setdefault(namespace, NamespaceUsage())
+            usage.entries += 1
+            usage.bytes += size
+            self._resident_bytes += size
+            self._evict_for(namespace)
 
-            self.cache[key] = (value, time.time() + ttl)
-            if len(self.cache) > self.capacity:
-                self.cache.popitem(last=False)
+    async def delete(self, key: str) -> None:
+        async with self._lock:
+            self._remove(key)
 
     async def clear(self):
         async with self._lock:
-            self.cache.clear()
+            for key in list(self.cache):
+                self._remove(key)
+
+    def get_stats(self) -> dict[str, Any]:
+        """获取常驻字节数、条目数与各命名空间的占用、淘汰和过期次数"""
+        return {
+            "entries": len(self.cache),
+            "resident_bytes": self._resident_bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": sum(usage.evictions for usage in self._usage.values()),
+            "namespaces": {
+                namespace: {
+                    "entries": usage.entries,
+                    "bytes": usage.bytes,
+                    "quota": self.quotas.get(namespace),
+                    "evictions": usage.evictions,
+                    "expirations": usage.expirations,
+                }
+                for namespace, usage in self._usage.items()
+            },
+        }
 
     async def close(self):
         if self._cleanup_task and not self._cleanup_task.done():
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from aiotieba.api.get_user_contents._classdef import UserPostss, UserThreads
+
+
+@dataclass(slots=True, frozen=True)
+class SlimUserPost:
+    """用户历史回复的精简投影，只保留查成分、查发言和清空发言用到的字段"""
+
+    fid: int
+    tid: int
+    pid: int
+    author_id: int
+    text: str
+
+
+@dataclass(slots=True, frozen=True)
+class SlimUserPosts:
+    """同一主题帖下的用户历史回复"""
+
+    fid: int
+    tid: int
+    objs: tuple[SlimUserPost, ...]
+
+    def __iter__(self) -> Iterator[SlimUserPost]:
+        return iter(self.objs)
+
+
+@dataclass(slots=True, frozen=True)
+class SlimUserThread:
+    """用户历史主题帖的精简投影，text 包含标题"""
+
+    fid: int
+    tid: int
+    pid: int
+    author_id: int
+    text: str
+
+
+@dataclass(slots=True, frozen=True)
+class SlimPage[T]:
+    """
+    一页用户历史内容
+
+    与 aiotieba 的 Containers 一样支持迭代和 len，空页为假值。
+    failed 为真时表示请求失败，页面为空不代表已无更多内容，这样的页不会被缓存。
+    """
+
+    objs: tuple[T, ...]
+    failed: bool = False
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self.objs)
+
+    def __len__(self) -> int:
+        return len(self.objs)
+
+
+def slim_user_posts(posts: UserPostss) -> SlimPage[SlimUserPosts]:
+    """将 get_user_posts 的结果转换为精简投影，丢弃内容碎片树等不需要的字段"""
+    return SlimPage(
+        tuple(
+            SlimUserPosts(
+                fid=group.fid,
+                tid=group.tid,
+                objs=tuple(
+                    SlimUserPost(fid=post.fid, tid=post.tid, pid=post.pid, author_id=post.author_id, text=post.text)
+                    for post in group.objs
+                ),
+            )
+            for group in posts.objs
+        ),
+        failed=posts.err is not None,
+    )
+
+
+def slim_user_threads(threads: UserThreads) -> SlimPage[SlimUserThread]:
+    """将 get_user_threads 的结果转换为精简投影，丢弃内容碎片树等不需要的字段"""
+    return SlimPage(
+        tuple(
+            SlimUserThread(
+                fid=thread.fid, tid=thread.tid, pid=thread.pid, author_id=thread.user.user_id, text=thread.text
+            )
+            for thread in threads.objs
+        ),
+        failed=threads.err is not None,
+    )
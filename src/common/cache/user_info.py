@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+from logger import log
+
+from .tiered_cache import USER_INFO, TieredCache
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from aiotieba.typing import UserInfo
+    from tiebameow.client import Client
+
+USER_INFO_CONCURRENCY = 8
+
+
+async def get_user_info_cached(client: Client, user_id: int) -> UserInfo:
+    """
+    获取用户信息，依次查询进程内缓存、共享缓存和贴吧接口。
+
+    Args:
+        client (Client): 贴吧客户端
+        user_id (int): 用户 user_id
+
+    Returns:
+        UserInfo: 用户信息，获取失败时 user_id 为 0
+    """
+    if ret := await TieredCache.get(USER_INFO, user_id):
+        return ret
+
+    ret = await client.get_user_info(user_id)
+    if ret.user_id:
+        await TieredCache.set(USER_INFO, user_id, ret)
+    return ret
+
+
+async def get_user_infos_cached(
+    client: Client, user_ids: Iterable[int], concurrency: int = USER_INFO_CONCURRENCY
+) -> dict[int, UserInfo]:
+    """
+    并发批量获取用户信息。
+
+    Args:
+        client (Client): 贴吧客户端
+        user_ids (Iterable[int]): 用户 user_id 列表，重复项会被合并
+        concurrency (int): 最大并发请求数
+
+    Returns:
+        dict[int, UserInfo]: user_id 到用户信息的映射，获取出错的用户不在结果中
+    """
+    unique_ids = list(dict.fromkeys(user_ids))
+    if not unique_ids:
+        return {}
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _fetch(user_id: int) -> UserInfo:
+        async with semaphore:
+            return await get_user_info_cached(client, user_id)
+
+    results = await asyncio.gather(*(_fetch(uid) for uid in unique_ids), return_exceptions=True)
+
+    user_infos: dict[int, UserInfo] = {}
+    for uid, result in zip(unique_ids, results, strict=True):
+        if isinstance(result, BaseException):
+            log.warning(f"Failed to get user info for {uid}: {result}")
+            continue
+        user_infos[uid] = result
+
+    stats = get_user_info_cache_stats()
+    log.debug(
+        f"User info cache: {stats['l1_hits']} L1 hits, {stats['l2_hits']} L2 hits, "
+        f"{stats['misses']} misses, hit rate {stats['hit_rate']:.1%}"
+    )
+    return user_infos
+
+
+def get_user_info_cache_stats() -> dict[str, float]:
+    """获取用户信息缓存的命中统计。"""
+    return TieredCache.get_stats().get(
+        USER_INFO.name, {"l1_hits": 0, "l2_hits": 0, "misses": 0, "total": 0, "hit_rate": 0.0}
+    )
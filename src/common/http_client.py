@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import time
+from dataclasses import dataclass
+from typing import Any
+from urllib.parse import urlsplit
+
+import httpx
+import nonebot
+
+from logger import log
+
+# httpx 仅在安装了 h2 时支持 HTTP/2
+HTTP2_ENABLED = importlib.util.find_spec("h2") is not None
+
+
+@dataclass
+class LatencyStats:
+    count: int = 0
+    errors: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    def record(self, elapsed: float, *, error: bool) -> None:
+        self.count += 1
+        self.total += elapsed
+        self.max = max(self.max, elapsed)
+        if error:
+            self.errors += 1
+
+
+class HttpClient:
+    """
+    出站 HTTP 客户端
+
+    在驱动器启动时读取配置并创建共享的连接池客户端，复用 keep-alive 连接；安装了 h2 时启用 HTTP/2。
+    按 host 限制并发连接数，并记录各 host 的请求延迟。
+
+    Attributes:
+        _timeout (float): 请求超时（秒）。
+        _max_connections (int): 连接池的最大连接数。
+        _max_connections_per_host (int): 每个 host 的最大并发请求数。
+        _clients (dict[bool, httpx.AsyncClient]): 按是否校验证书区分的客户端实例。
+        _host_semaphores (dict[str, asyncio.Semaphore]): 各 host 的并发限制。
+        _latency (dict[str, LatencyStats]): 各 host 的请求延迟统计。
+    """
+
+    _timeout: float = 10
+    _max_connections: int = 50
+    _max_connections_per_host: int = 8
+    _clients: dict[bool, httpx.AsyncClient] = {}
+    _host_semaphores: dict[str, asyncio.Semaphore] = {}
+    _latency: dict[str, LatencyStats] = {}
+
+    @classmethod
+    def _get_client(cls, verify: bool) -> httpx.AsyncClient:
+        if (client := cls._clients.get(verify)) is None or client.is_closed:
+            client = httpx.AsyncClient(
+                verify=verify,
+                timeout=cls._timeout,
+                http2=HTTP2_ENABLED,
+                limits=httpx.Limits(max_connections=cls._max_connections, max_keepalive_connections=20),
+                follow_redirects=True,
+            )
+            cls._clients[verify] = client
+        return client
+
+    @classmethod
+    async def start(cls) -> None:
+        """读取配置并创建默认客户端实例，须在 nonebot.init() 之后调用。"""
+        config = nonebot.get_driver().config
+        cls._timeout = getattr(config, "http_timeout", cls._timeout)
+        cls._max_connections = getattr(config, "http_max_connections", cls._max_connections)
+        cls._max_connections_per_host = getattr(config, "http_max_connections_per_host", cls._max_connections_per_host)
+        cls._get_client(verify=True)
+        log.info(f"HTTP client started, http2={HTTP2_ENABLED}")
+
+    @classmethod
+    async def stop(cls) -> None:
+        """关闭所有客户端实例。"""
+        for client in cls._clients.values():
+            await client.aclose()
+        cls._clients.clear()
+
+    @classmethod
+    async def request(cls, method: str, url: str, *, verify: bool = True, **kwargs: Any) -> httpx.Response:
+        """
+        发送请求。
+
+        Args:
+            method (str): 请求方法
+            url (str): 请求地址
+            verify (bool): 是否校验证书
+            **kwargs: 传递给 httpx.AsyncClient.request 的其他参数
+
+        Returns:
+            httpx.Response: 响应
+        """
+        host = urlsplit(url).netloc
+        semaphore = cls._host_semaphores.setdefault(host, asyncio.Semaphore(cls._max_connections_per_host))
+        stats = cls._latency.setdefault(host, LatencyStats())
+
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                resp = await cls._get_client(verify).request(method, url, **kwargs)
+            except Exception:
+                stats.record(time.perf_counter() - start, error=True)
+                raise
+            stats.record(time.perf_counter() - start, error=resp.is_error)
+        return resp
+
+    @classmethod
+    async def get(cls, url: str, *, verify: bool = True, **kwargs: Any) -> httpx.Response:
+        """发送 GET 请求。"""
+        return await cls.request("GET", url, verify=verify, **kwargs)
+
+    @classmethod
+    def get_latency_stats(cls) -> dict[str, dict[str, float]]:
+        """获取各 host 的请求数、错误数、平均与最大延迟（秒）。"""
+        return {
+            host: {
+                "count": stats.count,
+                "errors": stats.errors,
+                "avg": stats.total / stats.count if stats.count else 0.0,
+                "max": stats.max,
+            }
+            for host, stats in cls._latency.items()
+        }
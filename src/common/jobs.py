@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, field
+from itertools import count
+from typing import TYPE_CHECKING, Any
+
+import nonebot
+
+from logger import log
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Coroutine
+
+config = nonebot.get_driver().config
+JOB_GLOBAL_LIMIT: int = getattr(config, "job_global_limit", 16)
+JOB_GROUP_LIMIT: int = getattr(config, "job_group_limit", 3)
+JOB_DRAIN_TIMEOUT: float = getattr(config, "job_drain_timeout", 10)
+
+
+@dataclass(eq=False)
+class Job:
+    """
+    后台任务
+
+    Attributes:
+        id (int): 任务ID
+        name (str): 任务名称
+        group_id (int | None): 所属群号，为 None 时不受单群并发限制
+        background (bool): 是否为常驻后台循环，常驻任务不占用并发名额，停机时直接取消
+        interactive (bool): 是否为随用户翻页按需运行的交互任务，大部分时间在等待用户，不占用并发名额，停机时直接取消
+        progress (str): 当前进度描述
+        created_at (float): 创建时间戳
+        task (asyncio.Task | None): 实际执行的 asyncio 任务
+    """
+
+    id: int
+    name: str
+    group_id: int | None
+    background: bool = False
+    interactive: bool = False
+    progress: str = "排队中"
+    created_at: float = field(default_factory=time.time)
+    task: asyncio.Task | None = None
+
+    def report(self, progress: str) -> None:
+        """更新进度描述"""
+        self.progress = progress
+
+    def cancel(self) -> bool:
+        """取消任务，返回是否成功发出取消请求"""
+        if self.task is None or self.task.done():
+            return False
+        return self.task.cancel()
+
+
+class JobManager:
+    """
+    后台任务管理器
+
+    为长时间运行的指令提供统一的并发限制、进度查询、取消和停机时的优雅退出。
+    """
+
+    _jobs: dict[int, Job] = {}
+    _ids = count(1)
+    _global_semaphore: asyncio.Semaphore | None = None
+    _group_semaphores: dict[int, asyncio.Semaphore] = {}
+    _draining = False
+
+    @classmethod
+    def submit(
+        cls,
+        name: str,
+        func: Callable[[Job], Coroutine[Any, Any, Any]],
+        *,
+        group_id: int | None = None,
+        background: bool = False,
+        interactive: bool = False,
+    ) -> Job:
+        """
+        提交后台任务。
+
+        Args:
+            name (str): 任务名称
+            func (Callable[[Job], Coroutine]): 任务函数，接收 Job 以便汇报进度
+            group_id (int | None): 所属群号
+            background (bool): 是否为常驻后台循环
+            interactive (bool): 是否为随用户翻页按需运行的交互任务
+
+        Returns:
+            Job: 已提交的任务，可通过 job.task 等待结果
+        """
+        job = Job(id=next(cls._ids), name=name, group_id=group_id, background=background, interactive=interactive)
+        cls._jobs[job.id] = job
+        job.task = asyncio.create_task(cls._run(job, func), name=f"job-{job.id}-{name}")
+        # 异常已在 _run 中记录，这里取回以避免未被等待的任务产生警告
+        job.task.add_done_callback(lambda task: task.cancelled() or task.exception())
+        return job
+
+    @classmethod
+    async def _run(cls, job: Job, func: Callable[[Job], Coroutine[Any, Any, Any]]) -> Any:
+        try:
+            async with AsyncExitStack() as stack:
+                if not job.background and not job.interactive:
+                    if job.group_id is not None:
+                        semaphore = cls._group_semaphores.setdefault(job.group_id, asyncio.Semaphore(JOB_GROUP_LIMIT))
+                        await stack.enter_async_context(semaphore)
+                    if cls._global_semaphore is None:
+                        cls._global_semaphore = asyncio.Semaphore(JOB_GLOBAL_LIMIT)
+                    await stack.enter_async_context(cls._global_semaphore)
+                job.report("运行中")
+                return await func(job)
+        except asyncio.CancelledError:
+            log.info(f"Job {job.id} ({job.name}) cancelled")
+            raise
+        except Exception as e:
+            log.exception(f"Job {job.id} ({job.name}) failed: {e}")
+            raise
+        finally:
+            cls._jobs.pop(job.id, None)
+
+    @classmethod
+    def list_jobs(cls, group_id: int | None = None) -> list[Job]:
+        """列出进行中的任务，指定群号时只返回该群的任务"""
+        return [job for job in cls._jobs.values() if group_id is None or job.group_id == group_id]
+
+    @classmethod
+    def get_job(cls, job_id: int) -> Job | None:
+        return cls._jobs.get(job_id)
+
+    @classmethod
+    def cancel(cls, job_id: int, group_id: int | None = None) -> bool:
+        """
+        取消任务。
+
+        Args:
+            job_id (int): 任务ID
+            group_id (int | None): 指定时只允许取消该群的任务
+
+        Returns:
+            bool: 是否成功发出取消请求
+        """
+        job = cls._jobs.get(job_id)
+        if job is None or (group_id is not None and job.group_id != group_id):
+            return False
+        return job.cancel()
+
+    @classmethod
+    def is_draining(cls) -> bool:
+        """是否正在停机，任务可据此区分停机取消与用户取消"""
+        return cls._draining
+
+    @classmethod
+    async def drain(cls) -> None:
+        """停机时等待普通任务在超时时间内完成，随后取消剩余任务"""
+        cls._draining = True
+        for job in cls.list_jobs():
+            if job.background or job.interactive:
+                job.cancel()
+
+        pending = [job.task for job in cls.list_jobs() if job.task is not None]
+        if not pending:
+            return
+
+        _, still_running = await asyncio.wait(pending, timeout=JOB_DRAIN_TIMEOUT)
+        for task in still_running:
+            task.cancel()
+        if still_running:
+            log.warning(f"Cancelled {len(still_running)} jobs on shutdown")
+            await asyncio.gather(*still_running, return_exceptions=True)
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+
+class TokenBucket:
+    """
+    令牌桶限速器
+
+    以 rate 个/秒的速度补充令牌，最多积攒 capacity 个；acquire 在令牌不足时等待。
+    多个协程共享同一实例时按到达顺序排队。
+
+    Attributes:
+        rate (float): 每秒补充的令牌数
+        capacity (float): 令牌桶容量，即允许的最大突发量
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def set_rate(self, rate: float) -> None:
+        """调整补充速度，已积攒的令牌保留"""
+        self._refill()
+        self.rate = rate
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        """取出令牌，不足时等待补充"""
+        async with self._lock:
+            self._refill()
+            if self._tokens < tokens:
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= tokens
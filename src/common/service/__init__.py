@@ -7,10 +7,18 @@ from .basic import (
     delete_thread,
     delete_thread_no_record,
     delete_threads,
-    generate_checkout_msg,
     unban_user,
     unban_users,
 )
+from .checkout import (
+    count_post_fids,
+    generate_checkout_base,
+    generate_checkout_image,
+    generate_checkout_msg,
+    get_follow_forums,
+    get_post_fid_counts,
+    iter_post_fid_counts,
+)
 
 __all__ = [
     "ban_user",
@@ -21,7 +29,13 @@ __all__ = [
     "delete_thread",
     "delete_thread_no_record",
     "delete_threads",
+    "generate_checkout_base",
+    "generate_checkout_image",
     "generate_checkout_msg",
+    "count_post_fids",
+    "iter_post_fid_counts",
+    "get_follow_forums",
+    "get_post_fid_counts",
     "unban_user",
     "unban_users",
 ]
@@ -1,140 +1,19 @@
 from __future__ import annotations
 
-import asyncio
-import operator
 from typing import TYPE_CHECKING
-from urllib.parse import quote_plus
 
-import httpx
-import nonebot
 from tiebameow.client.tieba_client import RetriableApiError, UnretriableApiError
 
-from src.common.cache import get_tieba_name, get_user_posts_cached, get_user_threads_cached
 from src.db import TextDataModel
 from src.db.crud import add_associated_data
-from src.utils import text_to_image
 
 if TYPE_CHECKING:
     from collections.abc import Iterable, Sequence
 
-    from aiotieba.api.get_user_contents._classdef import UserPostss, UserThreads
     from tiebameow.client import Client
 
     from src.db import GroupInfo
 
-config = nonebot.get_driver().config
-enable_addons = getattr(config, "enable_addons", False)
-
-
-async def generate_checkout_msg(
-    client: Client, uid: int | str, checkout_tieba_config: str | None = None
-) -> tuple[str, bytes]:
-    """
-    生成查成分消息内容。
-
-    Args:
-        client: 已初始化的 Client 实例
-        uid: 要查询的用户的 user_id 或 portrait
-        checkout_tieba_config: 通过第三方接口查询的贴吧名称配置
-
-    Returns:
-        (base_content, image_content)
-    """
-    user_info = await client.get_user_info(uid)
-    nick_name_old = await client.get_nickname_old(user_info.user_id)
-
-    user_tieba_obj = await client.get_follow_forums(user_info.user_id)
-    if user_tieba_obj.objs:
-        user_tieba = [
-            {"tieba_name": forum.fname, "experience": forum.exp, "level": forum.level} for forum in user_tieba_obj.objs
-        ]
-    else:
-        checkout_tieba = checkout_tieba_config
-        if not checkout_tieba:
-            checkout_tieba = (
-                "原神,原神内鬼,崩坏三,崩坏3rd,崩坏星穹铁道,星穹铁道内鬼,mihoyo,新mihoyo,尘白禁区,ml游戏,有男不玩ml,"
-                "千年之旅,有男偷玩,二游笑话,dinner笑话,三度笑话,明日方舟,明日方舟内鬼,明日方舟dl,明日方舟pl,淋日方舟,"
-                "血狼破军,快乐雪花,半壁江山雪之下,碧蓝航线,碧蓝航线2,异色格,赤色中轴,少女前线,少女前线2,少女前线r,"
-                "蔚蓝档案,碧蓝档案,碧蓝档案吐槽,鸣潮,鸣潮内鬼,旧鸣潮内鬼,新鸣潮内鬼,鸣潮爆料,北落野,灵魂潮汐,无期迷途"
-            )
-        try:
-            async with httpx.AsyncClient(verify=False, timeout=5) as session:
-                resp = await session.get(
-                    f"https://tb.anova.me/getLevel?fname={quote_plus(checkout_tieba)}&uid={user_info.tieba_uid}"
-                )
-                resp.raise_for_status()
-                resp_json = resp.json()
-            user_tieba = [
-                {
-                    "tieba_name": item["fname"],
-                    "experience": item["exp"],
-                    "level": item["level"],
-                }
-                for item in resp_json.get("result", [])
-            ]
-            user_tieba = sorted(user_tieba, key=operator.itemgetter("experience"), reverse=True)
-        except Exception:
-            user_tieba = []
-
-    user_posts_count = {}
-
-    tasks = [get_user_threads_cached(client, user_info.user_id, page) for page in range(1, 51)]
-    results_t: Sequence[UserThreads] = await asyncio.gather(*tasks, return_exceptions=False)
-    for result in results_t:
-        if result and result.objs:
-            for thread in result.objs:
-                if thread.fid in user_posts_count:
-                    user_posts_count[thread.fid] += 1
-                else:
-                    user_posts_count[thread.fid] = 1
-
-    tasks = [get_user_posts_cached(client, user_info.user_id, page, rn=50) for page in range(1, 51)]
-    results_p: Sequence[UserPostss] = await asyncio.gather(*tasks, return_exceptions=False)
-    for result in results_p:
-        if result and result.objs:
-            for post in result.objs:
-                if post.fid in user_posts_count:
-                    user_posts_count[post.fid] += 1
-                else:
-                    user_posts_count[post.fid] = 1
-
-    if not user_posts_count and enable_addons:
-        from src.addons.interface import crud
-
-        user_stats = await crud.user_posts.get_user_stats(user_info.user_id)
-        for stat in user_stats:
-            if stat.thread_count + stat.post_count + stat.comment_count > 0:
-                user_posts_count[stat.fid] = stat.thread_count + stat.post_count + stat.comment_count
-
-    sorted_posts_count = sorted(user_posts_count.items(), key=operator.itemgetter(1), reverse=True)
-    sorted_posts_count = sorted_posts_count[:30]
-
-    final_posts_count = [
-        {"tieba_name": str(await get_tieba_name(item[0])), "count": item[1]} for item in sorted_posts_count
-    ]
-
-    user_posts_count_str = "\n".join([f"  - {item['tieba_name']}：{item['count']}" for item in final_posts_count])
-    user_tieba_str = "\n".join([
-        f"  - {forum['tieba_name']}：{forum['experience']}经验值，等级{forum['level']}" for forum in user_tieba
-    ])
-    user_info_str = (
-        f"昵称：{user_info.nick_name_new}\n"
-        f"旧版昵称：{nick_name_old}\n"
-        f"用户名：{user_info.user_name}\n"
-        f"贴吧ID：{user_info.tieba_uid}\n"
-        f"user_id：{user_info.user_id}\n"
-        f"portrait：{user_info.portrait}\n"
-        f"吧龄：{user_info.age}年"
-    )
-
-    base_content = f"基本信息：\n{user_info_str}"
-    image_content = await text_to_image(
-        f"用户 {user_info.show_name}({user_info.tieba_uid}) 关注的贴吧：\n{user_tieba_str}\n\n"
-        f"近期发贴的吧：\n{user_posts_count_str}"
-    )
-
-    return base_content, image_content
-
 
 async def delete_thread_no_record(client: Client, fid: int, tid: int) -> tuple[bool, str]:
     """
@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import asyncio
+import operator
+from collections import Counter
+from typing import TYPE_CHECKING
+from urllib.parse import quote_plus
+
+import nonebot
+from aiotieba.typing import UserInfo
+
+from src.common.cache import get_tieba_name, get_user_posts_cached, get_user_threads_cached
+from src.common.cache.checkout import (
+    get_follow_forums_cache,
+    get_post_fid_counts_cache,
+    set_follow_forums_cache,
+    set_post_fid_counts_cache,
+)
+from src.common.http_client import HttpClient
+from src.utils import text_to_image
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Awaitable, Callable
+
+    from tiebameow.client import Client
+
+    from src.common.cache.user_contents import SlimPage
+
+config = nonebot.get_driver().config
+enable_addons = getattr(config, "enable_addons", False)
+
+DEFAULT_CHECKOUT_TIEBA = (
+    "原神,原神内鬼,崩坏三,崩坏3rd,崩坏星穹铁道,星穹铁道内鬼,mihoyo,新mihoyo,尘白禁区,ml游戏,有男不玩ml,"
+    "千年之旅,有男偷玩,二游笑话,dinner笑话,三度笑话,明日方舟,明日方舟内鬼,明日方舟dl,明日方舟pl,淋日方舟,"
+    "血狼破军,快乐雪花,半壁江山雪之下,碧蓝航线,碧蓝航线2,异色格,赤色中轴,少女前线,少女前线2,少女前线r,"
+    "蔚蓝档案,碧蓝档案,碧蓝档案吐槽,鸣潮,鸣潮内鬼,旧鸣潮内鬼,新鸣潮内鬼,鸣潮爆料,北落野,灵魂潮汐,无期迷途"
+)
+CHECKOUT_TIEBA: str = getattr(config, "checkout_tieba", DEFAULT_CHECKOUT_TIEBA)
+_CHECKOUT_TIEBA_QUERY = quote_plus(CHECKOUT_TIEBA)
+CHECKOUT_MAX_PAGES = 50
+CHECKOUT_INITIAL_WIDTH = 2
+CHECKOUT_MAX_WIDTH = 16
+
+
+class _PageSource:
+    """
+    单个分页数据源的自适应抓取状态。
+
+    每轮并发抓取 width 页，遇到第一个空页即停止；本轮所有页都非空时下一轮并发数翻倍。
+    因请求失败而停止时 failed 为真，此时的统计不完整。
+    """
+
+    def __init__(self, fetch: Callable[[int], Awaitable[SlimPage]], max_pages: int):
+        self.fetch = fetch
+        self.max_pages = max_pages
+        self.next_pn = 1
+        self.width = CHECKOUT_INITIAL_WIDTH
+        self.done = False
+        self.failed = False
+
+    async def step(self, counter: Counter[int]) -> None:
+        last_pn = min(self.next_pn + self.width - 1, self.max_pages)
+        results = await asyncio.gather(*(self.fetch(pn) for pn in range(self.next_pn, last_pn + 1)))
+
+        for result in results:
+            if not result or not result.objs:
+                self.done = True
+                self.failed = result.failed
+                return
+            counter.update(item.fid for item in result.objs)
+
+        self.next_pn = last_pn + 1
+        self.width = min(self.width * 2, CHECKOUT_MAX_WIDTH)
+        if self.next_pn > self.max_pages:
+            self.done = True
+
+
+def _post_sources(client: Client, user_id: int, max_pages: int) -> list[_PageSource]:
+    return [
+        _PageSource(lambda pn: get_user_threads_cached(client, user_id, pn), max_pages),
+        _PageSource(lambda pn: get_user_posts_cached(client, user_id, pn, rn=50), max_pages),
+    ]
+
+
+async def _iter_counts(sources: list[_PageSource]) -> AsyncIterator[dict[int, int]]:
+    counter: Counter[int] = Counter()
+    while active := [source for source in sources if not source.done]:
+        await asyncio.gather(*(source.step(counter) for source in active))
+        yield dict(counter)
+
+
+async def iter_post_fid_counts(
+    client: Client, user_id: int, max_pages: int = CHECKOUT_MAX_PAGES
+) -> AsyncIterator[dict[int, int]]:
+    """
+    自适应抓取用户近期主题帖与回复，按轮产出各吧发言数的累计统计。
+
+    Args:
+        client (Client): 贴吧客户端
+        user_id (int): 用户 user_id
+        max_pages (int): 主题帖与回复各自的最大页数
+
+    Yields:
+        dict[int, int]: 截至当前轮次的 fid 到发言数的映射
+    """
+    async for partial in _iter_counts(_post_sources(client, user_id, max_pages)):
+        yield partial
+
+
+async def count_post_fids(
+    client: Client, user_id: int, max_pages: int = CHECKOUT_MAX_PAGES
+) -> tuple[dict[int, int], bool]:
+    """统计用户近期在各吧的发言数，返回 fid 到发言数的映射，以及是否所有页都抓取成功。"""
+    sources = _post_sources(client, user_id, max_pages)
+    counts: dict[int, int] = {}
+    async for partial in _iter_counts(sources):
+        counts = partial
+    return counts, not any(source.failed for source in sources)
+
+
+async def get_follow_forums(client: Client, user_info: UserInfo) -> list[dict[str, int | str]]:
+    """
+    获取用户关注的贴吧，关注列表隐藏时通过第三方接口查询 checkout_tieba 配置中的贴吧等级。
+
+    结果按 checkout_cache_ttl 缓存到磁盘。
+    """
+    if (cached := await get_follow_forums_cache(user_info.user_id)) is not None:
+        return cached
+
+    user_tieba_obj = await client.get_follow_forums(user_info.user_id)
+    if user_tieba_obj.objs:
+        user_tieba = [
+            {"tieba_name": forum.fname, "experience": forum.exp, "level": forum.level} for forum in user_tieba_obj.objs
+        ]
+    else:
+        try:
+            resp = await HttpClient.get(
+                f"https://tb.anova.me/getLevel?fname={_CHECKOUT_TIEBA_QUERY}&uid={user_info.tieba_uid}",
+                verify=False,
+                timeout=5,
+            )
+            resp.raise_for_status()
+            user_tieba = [
+                {
+                    "tieba_name": item["fname"],
+                    "experience": item["exp"],
+                    "level": item["level"],
+                }
+                for item in resp.json().get("result", [])
+            ]
+            user_tieba = sorted(user_tieba, key=operator.itemgetter("experience"), reverse=True)
+        except Exception:
+            return []
+
+    await set_follow_forums_cache(user_info.user_id, user_tieba)
+    return user_tieba
+
+
+async def get_post_fid_counts(client: Client, user_id: int) -> dict[int, int]:
+    """
+    获取用户近期在各吧的发言数，所有页都抓取成功时结果按 checkout_cache_ttl 缓存到磁盘。
+
+    贴吧接口无数据且启用高级功能时，回退到数据库中的发言统计。
+    """
+    if (cached := await get_post_fid_counts_cache(user_id)) is not None:
+        return cached
+
+    user_posts_count, complete = await count_post_fids(client, user_id)
+
+    if not user_posts_count and enable_addons:
+        from src.addons.interface import crud
+
+        user_stats = await crud.user_posts.get_user_stats(user_id)
+        for stat in user_stats:
+            if stat.thread_count + stat.post_count + stat.comment_count > 0:
+                user_posts_count[stat.fid] = stat.thread_count + stat.post_count + stat.comment_count
+
+    # 有页面请求失败时统计不完整，不缓存以便下次重新抓取
+    if complete:
+        await set_post_fid_counts_cache(user_id, user_posts_count)
+    return user_posts_count
+
+
+async def generate_checkout_base(client: Client, uid: int | str) -> tuple[UserInfo, str]:
+    """
+    生成查成分的基本信息部分。
+
+    Args:
+        client: 已初始化的 Client 实例
+        uid: 要查询的用户的 user_id 或 portrait
+
+    Returns:
+        (user_info, base_content)，用户信息获取失败时 base_content 为空
+    """
+    if not uid:
+        # tieba_uid 等查询失败时 user_id 为 0，无需再请求
+        return UserInfo(), ""
+    user_info = await client.get_user_info(uid)
+    if not user_info.user_id:
+        return user_info, ""
+    nick_name_old = await client.get_nickname_old(user_info.user_id)
+
+    user_info_str = (
+        f"昵称：{user_info.nick_name_new}\n"
+        f"旧版昵称：{nick_name_old}\n"
+        f"用户名：{user_info.user_name}\n"
+        f"贴吧ID：{user_info.tieba_uid}\n"
+        f"user_id：{user_info.user_id}\n"
+        f"portrait：{user_info.portrait}\n"
+        f"吧龄：{user_info.age}年"
+    )
+    return user_info, f"基本信息：\n{user_info_str}"
+
+
+async def generate_checkout_image(client: Client, user_info: UserInfo) -> bytes:
+    """
+    生成查成分的关注贴吧与发贴统计图片。
+
+    Args:
+        client: 已初始化的 Client 实例
+        user_info: 由 generate_checkout_base 获取的用户信息
+
+    Returns:
+        image_content
+    """
+    user_tieba, user_posts_count = await asyncio.gather(
+        get_follow_forums(client, user_info), get_post_fid_counts(client, user_info.user_id)
+    )
+
+    sorted_posts_count = sorted(user_posts_count.items(), key=operator.itemgetter(1), reverse=True)
+    sorted_posts_count = sorted_posts_count[:30]
+
+    final_posts_count = [
+        {"tieba_name": str(await get_tieba_name(item[0])), "count": item[1]} for item in sorted_posts_count
+    ]
+
+    user_posts_count_str = "\n".join([f"  - {item['tieba_name']}：{item['count']}" for item in final_posts_count])
+    user_tieba_str = "\n".join([
+        f"  - {forum['tieba_name']}：{forum['experience']}经验值，等级{forum['level']}" for forum in user_tieba
+    ])
+
+    return await text_to_image(
+        f"用户 {user_info.show_name}({user_info.tieba_uid}) 关注的贴吧：\n{user_tieba_str}\n\n"
+        f"近期发贴的吧：\n{user_posts_count_str}"
+    )
+
+
+async def generate_checkout_msg(client: Client, uid: int | str) -> tuple[str, bytes]:
+    """
+    生成查成分消息内容。
+
+    Args:
+        client: 已初始化的 Client 实例
+        uid: 要查询的用户的 user_id 或 portrait
+
+    Returns:
+        (base_content, image_content)，用户信息获取失败时均为空
+    """
+    user_info, base_content = await generate_checkout_base(client, uid)
+    if not base_content:
+        return "", b""
+    image_content = await generate_checkout_image(client, user_info)
+    return base_content, image_content
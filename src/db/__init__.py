@@ -1,4 +1,4 @@
-from .crud import associated, autoban, group, image
+from .crud import associated, autoban, events, group, image
 from .models import (
     AssociatedList,
     BanList,
@@ -7,13 +7,15 @@ from .models import (
     GroupInfo,
     Image,
     ImgDataModel,
+    ModerationEvent,
     TextDataModel,
 )
-from .session import get_session, init_db
+from .session import UnitOfWorkError, get_session, init_db, unit_of_work
 
 __all__ = [
     "associated",
     "autoban",
+    "events",
     "group",
     "image",
     "AssociatedList",
@@ -23,7 +25,10 @@ __all__ = [
     "GroupInfo",
     "Image",
     "ImgDataModel",
+    "ModerationEvent",
     "TextDataModel",
+    "UnitOfWorkError",
     "get_session",
     "init_db",
+    "unit_of_work",
 ]
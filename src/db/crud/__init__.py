@@ -1,29 +1,36 @@
 from .associated import (
     add_associated_data,
+    delete_associated_events,
     get_associated_data,
+    get_associated_events,
     get_public_associated_data,
-    set_associated_data,
 )
 from .autoban import (
     add_ban,
     get_autoban,
     get_autoban_lists,
     get_ban_status,
+    get_ban_statuses,
+    invalidate_enabled_bans,
+    is_autobanned,
     unban,
     update_autoban,
     update_ban_reason,
 )
 from .group import (
+    GroupRole,
     add_group,
     delete_group,
     get_all_groups,
     get_group,
     get_group_by_fid,
+    get_group_role,
     update_group,
 )
 from .image import (
     delete_image,
     download_and_save_img,
+    download_img,
     get_image_data,
     save_image,
 )
@@ -39,24 +46,31 @@ from .rules import (
 
 __all__ = [
     "add_associated_data",
+    "delete_associated_events",
     "get_associated_data",
+    "get_associated_events",
     "get_public_associated_data",
-    "set_associated_data",
     "add_ban",
     "get_autoban",
     "get_autoban_lists",
     "get_ban_status",
+    "get_ban_statuses",
+    "invalidate_enabled_bans",
+    "is_autobanned",
     "unban",
     "update_autoban",
     "update_ban_reason",
+    "GroupRole",
     "add_group",
     "delete_group",
     "get_all_groups",
     "get_group",
     "get_group_by_fid",
+    "get_group_role",
     "update_group",
     "delete_image",
     "download_and_save_img",
+    "download_img",
     "get_image_data",
     "save_image",
     "add_rule",
@@ -1,11 +1,16 @@
 from typing import TYPE_CHECKING
 
-from sqlalchemy import select
+from sqlalchemy import delete, select
+from sqlalchemy.orm import undefer
 
-from src.db.models import AssociatedList, GroupInfo, ImgDataModel, TextDataModel
+from src.db.models import AssociatedList, GroupInfo, ImgDataModel, ModerationEvent, TextDataModel
 from src.db.session import get_session
 
+from .events import has_legacy_data, migrate_rows
+
 if TYPE_CHECKING:
+    from collections.abc import Iterable
+
     from aiotieba.api.tieba_uid2user_info._classdef import UserInfo_TUid
     from aiotieba.typing import UserInfo
 
@@ -40,11 +45,10 @@ async def add_associated_data(
         if user_info.nick_name and user_info.nick_name not in associated_data.nicknames:
             associated_data.nicknames = [*associated_data.nicknames, user_info.nick_name]
 
-        if text_data:
-            associated_data.text_data = [*associated_data.text_data, *text_data]
-
-        if img_data:
-            associated_data.img_data = [*associated_data.img_data, *img_data]
+        # 关联记录只追加事件行，不重写已有记录
+        session.add_all(
+            ModerationEvent.from_data(user_info.user_id, data) for data in [*(text_data or []), *(img_data or [])]
+        )
 
         try:
             await session.commit()
@@ -55,6 +59,7 @@ async def add_associated_data(
 
 
 async def get_associated_data(user_id: int, fid: int) -> AssociatedList | None:
+    """获取用户的关联信息，关联记录需通过 get_associated_events 获取"""
     async with get_session() as session:
         associated_data = await session.execute(
             select(AssociatedList).where(AssociatedList.user_id == user_id, AssociatedList.fid == fid)
@@ -70,20 +75,64 @@ async def get_public_associated_data(user_id: int) -> list[AssociatedList]:
         return list(associated_data.scalars().all())
 
 
-async def set_associated_data(
-    user_id: int, fid: int, text_data: list[TextDataModel], img_data: list[ImgDataModel]
-) -> bool:
+async def get_associated_events(
+    user_id: int, fid: int, limit: int | None = None, offset: int = 0
+) -> list[ModerationEvent]:
+    """
+    按上传时间顺序获取用户的关联记录。
+
+    若该用户的旧记录尚未被后台迁移，先在本次调用中迁移。
+
+    Args:
+        user_id (int): 用户 ID
+        fid (int): 贴吧 fid
+        limit (int | None): 最多返回的条数，为 None 时不限制
+        offset (int): 跳过的条数
+
+    Returns:
+        list[ModerationEvent]: 关联记录
+    """
     async with get_session() as session:
-        associated_data = await session.execute(
-            select(AssociatedList).where(AssociatedList.user_id == user_id, AssociatedList.fid == fid)
+        legacy = (
+            await session.scalars(
+                select(AssociatedList)
+                .where(
+                    AssociatedList.user_id == user_id,
+                    AssociatedList.fid == fid,
+                    has_legacy_data(session.bind.dialect.name),
+                )
+                .options(undefer(AssociatedList.text_data), undefer(AssociatedList.img_data))
+            )
+        ).all()
+        if legacy:
+            await migrate_rows(session, legacy)
+            await session.commit()
+
+        result = await session.scalars(
+            select(ModerationEvent)
+            .where(ModerationEvent.fid == fid, ModerationEvent.user_id == user_id)
+            .order_by(ModerationEvent.time, ModerationEvent.id)
+            .offset(offset)
+            .limit(limit)
+        )
+        return list(result.all())
+
+
+async def delete_associated_events(user_id: int, fid: int, event_ids: "Iterable[int]") -> bool:
+    """按 ID 删除用户的关联记录，不属于该用户的 ID 会被忽略"""
+    event_ids = list(event_ids)
+    if not event_ids:
+        return True
+    async with get_session() as session:
+        await session.execute(
+            delete(ModerationEvent).where(
+                ModerationEvent.id.in_(event_ids),
+                ModerationEvent.fid == fid,
+                ModerationEvent.user_id == user_id,
+            )
         )
-        associated_data = associated_data.scalar_one_or_none()
-        if associated_data:
-            associated_data.text_data = text_data
-            associated_data.img_data = img_data
-            try:
-                await session.commit()
-                return True
-            except Exception:
-                return False
-    return False
+        try:
+            await session.commit()
+            return True
+        except Exception:
+            return False
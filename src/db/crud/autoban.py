@@ -1,14 +1,115 @@
-from collections.abc import AsyncGenerator
+import asyncio
+from collections.abc import AsyncGenerator, Iterable
 from datetime import timedelta
-from typing import Literal
+from typing import TYPE_CHECKING, Literal
 
-from sqlalchemy import select
+from sqlalchemy import event, select
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 from src.db.models import BanList, BanStatus, ImgDataModel, TextDataModel, now_with_tz
 from src.db.session import get_session
 
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+type BanState = Literal["not", "banned", "unbanned"]
+
+# fid -> 已启用循封的 user_id，按贴吧首次查询时加载，此后由 add_ban、unban 在事务提交后同步。
+# 名单只在本进程内，变更提交后经 TieredCache 的失效广播通知其他实例丢弃对应贴吧的名单并重新加载；
+# 未初始化 Redis 时不广播，多实例部署须启用 Redis
+_ENABLED_BANS: dict[int, set[int]] = {}
+# 加载中的贴吧 -> 加载期间提交的变更，加载完成后按顺序重放；None 表示加载期间名单已失效
+_PENDING_CHANGES: dict[int, list[tuple[int, bool] | None]] = {}
+_LOAD_LOCK = asyncio.Lock()
+ENABLED_BANS_KEY_PREFIX = "autoban:enabled:"
+_broadcast_tasks: set[asyncio.Task] = set()
+
+
+async def _enabled_bans(fid: int) -> set[int]:
+    if (enabled := _ENABLED_BANS.get(fid)) is not None:
+        return enabled
+    async with _LOAD_LOCK:
+        if (enabled := _ENABLED_BANS.get(fid)) is not None:
+            return enabled
+        _PENDING_CHANGES[fid] = pending = []
+        try:
+            async with get_session() as session:
+                result = await session.scalars(
+                    select(BanList.user_id).where(BanList.fid == fid, BanList.enable.is_(True))
+                )
+                enabled = set(result.all())
+        finally:
+            del _PENDING_CHANGES[fid]
+        if None in pending:
+            # 加载结果可能早于其他实例的变更，本次使用但不保留
+            return enabled
+        _ENABLED_BANS[fid] = enabled
+        for change in pending:
+            if change is not None:
+                _apply_enabled_ban(fid, *change)
+        return enabled
+
+
+def _apply_enabled_ban(fid: int, user_id: int, enable: bool) -> None:
+    if (pending := _PENDING_CHANGES.get(fid)) is not None:
+        pending.append((user_id, enable))
+    elif (enabled := _ENABLED_BANS.get(fid)) is not None:
+        if enable:
+            enabled.add(user_id)
+        else:
+            enabled.discard(user_id)
+
+
+def _drop_enabled_bans(fid: int) -> None:
+    _ENABLED_BANS.pop(fid, None)
+    if (pending := _PENDING_CHANGES.get(fid)) is not None:
+        pending.append(None)
+
+
+def _broadcast_enabled_bans(fid: int) -> None:
+    from src.common.cache import TieredCache
+
+    task = asyncio.get_running_loop().create_task(TieredCache.broadcast(f"{ENABLED_BANS_KEY_PREFIX}{fid}"))
+    _broadcast_tasks.add(task)
+    task.add_done_callback(_broadcast_tasks.discard)
+
+
+def _on_enabled_bans_invalidated(key: str) -> None:
+    if key == ENABLED_BANS_KEY_PREFIX:
+        # 重新订阅失效广播，中断期间的变更已丢失
+        for fid in [*_ENABLED_BANS, *_PENDING_CHANGES]:
+            _drop_enabled_bans(fid)
+        return
+    _drop_enabled_bans(int(key.removeprefix(ENABLED_BANS_KEY_PREFIX)))
+
+
+def _sync_enabled_ban_on_commit(session: "AsyncSession", fid: int, user_id: int, enable: bool) -> None:
+    def sync(_session) -> None:
+        _apply_enabled_ban(fid, user_id, enable)
+        _broadcast_enabled_bans(fid)
+
+    # 处于工作单元中时 commit 只 flush，须等事务真正提交后再同步
+    event.listen(session.sync_session, "after_commit", sync, once=True)
+
+
+def subscribe_enabled_bans() -> None:
+    """订阅其他实例的循封名单变更，须在 TieredCache.start 之前调用"""
+    from src.common.cache import TieredCache
+
+    TieredCache.on_invalidate(ENABLED_BANS_KEY_PREFIX, _on_enabled_bans_invalidated)
+
+
+def invalidate_enabled_bans(fid: int) -> None:
+    """绕过 add_ban、unban 批量修改循封名单后调用，本实例与其他实例均在下次查询时重新加载"""
+    _drop_enabled_bans(fid)
+    _broadcast_enabled_bans(fid)
+
+
+async def is_autobanned(fid: int, user_id: int) -> bool:
+    """用户是否在贴吧的循封名单中且循封已启用，不查询数据库"""
+    return user_id in await _enabled_bans(fid)
+
 
 async def add_ban(fid: int, group_id: int, ban_list: BanList) -> bool:
     async with get_session() as session:
@@ -51,6 +152,8 @@ async def add_ban(fid: int, group_id: int, ban_list: BanList) -> bool:
         )
         await session.execute(stmt)
 
+        _sync_enabled_ban_on_commit(session, ban_list.fid, ban_list.user_id, True)
+
         try:
             await session.commit()
             return True
@@ -72,6 +175,7 @@ async def unban(fid: int, operator: int, user_id: int) -> bool:
         ban_list.enable = False
         ban_list.unban_time = now_with_tz()
         ban_list.unban_operator_id = operator
+        _sync_enabled_ban_on_commit(session, fid, user_id, False)
         try:
             await session.commit()
             return True
@@ -80,7 +184,7 @@ async def unban(fid: int, operator: int, user_id: int) -> bool:
             return False
 
 
-async def get_ban_status(fid: int, user_id: int) -> tuple[Literal["not", "banned", "unbanned"], BanList | None]:
+async def get_ban_status(fid: int, user_id: int) -> tuple[BanState, BanList | None]:
     async with get_session() as session:
         ban_list = await session.execute(select(BanList).where(BanList.fid == fid, BanList.user_id == user_id))
         ban_list = ban_list.scalar_one_or_none()
@@ -92,6 +196,29 @@ async def get_ban_status(fid: int, user_id: int) -> tuple[Literal["not", "banned
         return "unbanned", ban_list
 
 
+async def get_ban_statuses(fid: int, user_ids: Iterable[int]) -> dict[int, BanState]:
+    """
+    批量查询用户的循封状态，只查询 user_id 与 enable 两列。
+
+    Args:
+        fid (int): 贴吧 fid
+        user_ids (Iterable[int]): 用户 ID
+
+    Returns:
+        dict[int, BanState]: 每个传入用户的循封状态
+    """
+    statuses: dict[int, BanState] = dict.fromkeys(user_ids, "not")
+    if not statuses:
+        return statuses
+    async with get_session() as session:
+        result = await session.execute(
+            select(BanList.user_id, BanList.enable).where(BanList.fid == fid, BanList.user_id.in_(statuses))
+        )
+        for user_id, enable in result:
+            statuses[user_id] = "banned" if enable else "unbanned"
+    return statuses
+
+
 async def update_ban_reason(
     fid: int,
     user_id: int,
@@ -0,0 +1,322 @@
+from __future__ import annotations
+
+import asyncio
+import csv
+import io
+import json
+from datetime import datetime  # noqa: TC003 pydantic 需要在运行时解析注解
+from typing import TYPE_CHECKING, Any, Literal
+
+from pydantic import BaseModel, Field, field_validator
+from sqlalchemy import delete, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import undefer
+
+from src.db.models import (
+    AssociatedList,
+    BanList,
+    BanStatus,
+    ImgDataModel,
+    ModerationEvent,
+    TextDataModel,
+    now_with_tz,
+)
+from src.db.session import get_session
+
+from .autoban import invalidate_enabled_bans
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Awaitable, Callable, Iterable, Iterator
+    from typing import IO
+
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+BulkFormat = Literal["csv", "jsonl"]
+
+BULK_BATCH_SIZE = 1000
+# 导出时每次从数据库取回的行数
+BULK_FETCH_SIZE = 500
+
+
+class _BulkRecord(BaseModel):
+    # CSV 中的列表列以 JSON 字符串存储，空单元格视为未填写
+    @field_validator("*", mode="before")
+    @classmethod
+    def _parse_csv_cell(cls, value: Any, info: Any) -> Any:
+        if not isinstance(value, str):
+            return value
+        if value == "":
+            return cls.model_fields[info.field_name].get_default(call_default_factory=True)
+        if cls.model_fields[info.field_name].annotation is not str and value[:1] in "[{":
+            return json.loads(value)
+        return value
+
+
+class BanListRecord(_BulkRecord):
+    """循封名单导入导出的单行记录，fid 由导入目标决定"""
+
+    user_id: int
+    portrait: str
+    operator_id: int
+    enable: bool = True
+    ban_time: datetime = Field(default_factory=now_with_tz)
+    unban_time: datetime | None = None
+    unban_operator_id: int | None = None
+    text_reason: list[TextDataModel] = Field(default_factory=list)
+    img_reason: list[ImgDataModel] = Field(default_factory=list)
+
+
+class AssociatedRecord(_BulkRecord):
+    """关联信息导入导出的单行记录，fid 由导入目标决定"""
+
+    user_id: int
+    tieba_uid: int
+    portrait: str
+    creater_id: int
+    user_name: list[str] = Field(default_factory=list)
+    nicknames: list[str] = Field(default_factory=list)
+    is_public: bool = False
+    text_data: list[TextDataModel] = Field(default_factory=list)
+    img_data: list[ImgDataModel] = Field(default_factory=list)
+
+
+def iter_records[T: _BulkRecord](file: IO[str], fmt: BulkFormat, model: type[T]) -> Iterator[T]:
+    """
+    逐行解析 CSV（首行为表头）或 JSONL 文件。
+
+    Raises:
+        ValueError: 某行无法解析，异常信息包含行号
+    """
+    rows: Iterable[Any] = csv.DictReader(file) if fmt == "csv" else (line for line in file if line.strip())
+    for line_no, row in enumerate(rows, start=2 if fmt == "csv" else 1):
+        try:
+            yield model.model_validate(row) if fmt == "csv" else model.model_validate_json(row)
+        except ValueError as e:
+            raise ValueError(f"第 {line_no} 行格式错误：{e}") from e
+
+
+async def format_records(records: AsyncIterator[_BulkRecord], fmt: BulkFormat) -> AsyncIterator[str]:
+    """将记录格式化为 CSV 或 JSONL 文本，每 BULK_FETCH_SIZE 行产出一段，便于流式响应"""
+    buffer = io.StringIO()
+    writer: csv.DictWriter | None = None
+    rows = 0
+    async for record in records:
+        if fmt == "jsonl":
+            buffer.write(record.model_dump_json() + "\n")
+        else:
+            row = {
+                key: json.dumps(value, ensure_ascii=False) if isinstance(value, list) else value
+                for key, value in record.model_dump(mode="json").items()
+            }
+            if writer is None:
+                writer = csv.DictWriter(buffer, fieldnames=list(row))
+                writer.writeheader()
+            writer.writerow(row)
+        rows += 1
+        if rows % BULK_FETCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _batched[T](records: Iterable[T], size: int) -> Iterator[list[T]]:
+    batch: list[T] = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _insert(session: AsyncSession, model: type[BanList | AssociatedList]):
+    return pg_insert(model) if session.bind.dialect.name == "postgresql" else sqlite_insert(model)
+
+
+async def _bulk_upsert(
+    stmt: Any,
+    rows: Iterable[dict[str, Any]],
+    on_progress: Callable[[int], None] | None,
+    batch_size: int,
+    before_batch: Callable[[AsyncSession, list[dict[str, Any]]], Awaitable[None]] | None = None,
+) -> int:
+    total = 0
+    async with get_session() as session:
+        for batch in _batched(rows, batch_size):
+            if before_batch is not None:
+                await before_batch(session, batch)
+            # executemany：SQLite 在单个事务内批量执行，asyncpg 使用批量 VALUES
+            await session.execute(stmt, batch)
+            await session.commit()
+            total += len(batch)
+            if on_progress is not None:
+                on_progress(total)
+            # 解析下一批是同步操作，让出事件循环
+            await asyncio.sleep(0)
+    return total
+
+
+async def import_ban_list(
+    fid: int,
+    group_id: int,
+    records: Iterable[BanListRecord],
+    on_progress: Callable[[int], None] | None = None,
+    batch_size: int = BULK_BATCH_SIZE,
+) -> int:
+    """
+    批量导入循封名单，已存在的用户按导入内容覆盖。
+
+    Args:
+        fid (int): 目标贴吧 fid
+        group_id (int): 所属群号，贴吧尚无循封状态时用于创建
+        records (Iterable[BanListRecord]): 记录，可以是 iter_records 返回的惰性迭代器
+        on_progress (Callable[[int], None] | None): 每提交一批后以累计行数回调
+        batch_size (int): 每批行数
+
+    Returns:
+        int: 导入的行数
+    """
+    async with get_session() as session:
+        if not await session.get(BanStatus, fid):
+            session.add(BanStatus(fid=fid, group_id=group_id))
+            await session.commit()
+        stmt = _insert(session, BanList)
+
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["fid", "user_id"],
+        set_={
+            column: stmt.excluded[column]
+            for column in (
+                "portrait",
+                "ban_time",
+                "operator_id",
+                "enable",
+                "unban_time",
+                "unban_operator_id",
+                "text_reason",
+                "img_reason",
+            )
+        }
+        | {"last_update": now_with_tz()},
+    )
+    rows = ({"fid": fid, "last_update": now_with_tz(), **dict(record)} for record in records)
+    try:
+        return await _bulk_upsert(stmt, rows, on_progress, batch_size)
+    finally:
+        # 导入可能在中途失败，已提交的批次同样需要生效
+        invalidate_enabled_bans(fid)
+
+
+async def import_associated_list(
+    fid: int,
+    records: Iterable[AssociatedRecord],
+    on_progress: Callable[[int], None] | None = None,
+    batch_size: int = BULK_BATCH_SIZE,
+) -> int:
+    """
+    批量导入关联信息，已存在的用户按导入内容覆盖。
+
+    Args:
+        fid (int): 目标贴吧 fid
+        records (Iterable[AssociatedRecord]): 记录，可以是 iter_records 返回的惰性迭代器
+        on_progress (Callable[[int], None] | None): 每提交一批后以累计行数回调
+        batch_size (int): 每批行数
+
+    Returns:
+        int: 导入的行数
+    """
+    async with get_session() as session:
+        stmt = _insert(session, AssociatedList)
+
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "fid"],
+        set_={
+            column: stmt.excluded[column]
+            for column in (
+                "tieba_uid",
+                "portrait",
+                "user_name",
+                "nicknames",
+                "creater_id",
+                "is_public",
+                "text_data",
+                "img_data",
+            )
+        }
+        | {"last_update": now_with_tz()},
+    )
+    rows = ({"fid": fid, "last_update": now_with_tz(), **dict(record)} for record in records)
+
+    async def replace_events(session: AsyncSession, batch: list[dict[str, Any]]) -> None:
+        # 关联记录存放在 moderation_events 中，覆盖导入时先删除这些用户已有的记录
+        await session.execute(
+            delete(ModerationEvent).where(
+                ModerationEvent.fid == fid, ModerationEvent.user_id.in_([row["user_id"] for row in batch])
+            )
+        )
+        events = [
+            _event_row(fid, row["user_id"], data) for row in batch for data in [*row["text_data"], *row["img_data"]]
+        ]
+        if events:
+            await session.execute(insert(ModerationEvent), events)
+        for row in batch:
+            row["text_data"] = row["img_data"] = []
+
+    return await _bulk_upsert(stmt, rows, on_progress, batch_size, before_batch=replace_events)
+
+
+def _event_row(fid: int, user_id: int, data: TextDataModel | ImgDataModel) -> dict[str, Any]:
+    row = {"fid": fid, "user_id": user_id, "time": data.upload_time, "uploader_id": data.uploader_id}
+    if isinstance(data, ImgDataModel):
+        return row | {"text": None, "image_id": data.image_id, "note": data.note}
+    return row | {"text": data.text, "image_id": None, "note": ""}
+
+
+async def _load_events(fid: int, user_ids: list[int]) -> dict[int, list[ModerationEvent]]:
+    async with get_session() as session:
+        result = await session.scalars(
+            select(ModerationEvent)
+            .where(ModerationEvent.fid == fid, ModerationEvent.user_id.in_(user_ids))
+            .order_by(ModerationEvent.user_id, ModerationEvent.time, ModerationEvent.id)
+        )
+        events: dict[int, list[ModerationEvent]] = {}
+        for event in result:
+            events.setdefault(event.user_id, []).append(event)
+        return events
+
+
+async def export_ban_list(fid: int) -> AsyncIterator[BanListRecord]:
+    """按 id 顺序流式导出贴吧的循封名单"""
+    async with get_session() as session:
+        result = await session.stream_scalars(
+            select(BanList).where(BanList.fid == fid).order_by(BanList.id).execution_options(yield_per=BULK_FETCH_SIZE)
+        )
+        async for ban in result:
+            yield BanListRecord.model_validate(ban, from_attributes=True)  # noqa: ASYNC119
+
+
+async def export_associated_list(fid: int) -> AsyncIterator[AssociatedRecord]:
+    """按 id 顺序流式导出贴吧的关联信息，关联记录按旧格式合并到 text_data/img_data"""
+    async with get_session() as session:
+        result = await session.stream_scalars(
+            select(AssociatedList)
+            .where(AssociatedList.fid == fid)
+            .order_by(AssociatedList.id)
+            .options(undefer(AssociatedList.text_data), undefer(AssociatedList.img_data))
+            .execution_options(yield_per=BULK_FETCH_SIZE)
+        )
+        async for rows in result.partitions():
+            events = await _load_events(fid, [row.user_id for row in rows])
+            for row in rows:
+                record = AssociatedRecord.model_validate(row, from_attributes=True)
+                for event in events.get(row.user_id, ()):
+                    data = event.to_data()
+                    if isinstance(data, ImgDataModel):
+                        record.img_data.append(data)
+                    else:
+                        record.text_data.append(data)
+                yield record  # noqa: ASYNC119
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+from sqlalchemy import func, or_, select, text, update
+from sqlalchemy.orm import undefer
+
+from logger import log
+from src.db.models import AssociatedList, ModerationEvent
+from src.db.session import get_session
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.sql.elements import ColumnElement
+
+# 每个事务迁移的 associated_list 行数
+MIGRATION_BATCH_SIZE = 200
+COMPAT_VIEW = "associated_list_compat"
+
+_SQLITE_COMPAT_VIEW = f"""
+CREATE VIEW IF NOT EXISTS {COMPAT_VIEW} AS
+SELECT
+    a.id, a.user_id, a.fid, a.tieba_uid, a.portrait, a.user_name, a.nicknames, a.creater_id, a.is_public,
+    (
+        SELECT json_group_array(json(item)) FROM (
+            SELECT value AS item, 0 AS src, NULL AS t, key AS k FROM json_each(a.text_data)
+            UNION ALL
+            SELECT json_object(
+                'uploader_id', e.uploader_id, 'fid', e.fid, 'upload_time', e.time, 'text', e.text
+            ), 1, e.time, e.id
+            FROM moderation_events e
+            WHERE e.fid = a.fid AND e.user_id = a.user_id AND e.image_id IS NULL
+            ORDER BY src, t, k
+        )
+    ) AS text_data,
+    (
+        SELECT json_group_array(json(item)) FROM (
+            SELECT value AS item, 0 AS src, NULL AS t, key AS k FROM json_each(a.img_data)
+            UNION ALL
+            SELECT json_object(
+                'uploader_id', e.uploader_id, 'fid', e.fid, 'upload_time', e.time,
+                'image_id', e.image_id, 'note', e.note
+            ), 1, e.time, e.id
+            FROM moderation_events e
+            WHERE e.fid = a.fid AND e.user_id = a.user_id AND e.image_id IS NOT NULL
+            ORDER BY src, t, k
+        )
+    ) AS img_data,
+    a.last_update
+FROM associated_list a
+"""
+
+_PG_COMPAT_VIEW = f"""
+CREATE OR REPLACE VIEW {COMPAT_VIEW} AS
+SELECT
+    a.id, a.user_id, a.fid, a.tieba_uid, a.portrait, a.user_name, a.nicknames, a.creater_id, a.is_public,
+    a.text_data || COALESCE((
+        SELECT jsonb_agg(jsonb_build_object(
+            'uploader_id', e.uploader_id, 'fid', e.fid, 'upload_time', e.time, 'text', e.text
+        ) ORDER BY e.time, e.id)
+        FROM moderation_events e
+        WHERE e.fid = a.fid AND e.user_id = a.user_id AND e.image_id IS NULL
+    ), '[]'::jsonb) AS text_data,
+    a.img_data || COALESCE((
+        SELECT jsonb_agg(jsonb_build_object(
+            'uploader_id', e.uploader_id, 'fid', e.fid, 'upload_time', e.time,
+            'image_id', e.image_id, 'note', e.note
+        ) ORDER BY e.time, e.id)
+        FROM moderation_events e
+        WHERE e.fid = a.fid AND e.user_id = a.user_id AND e.image_id IS NOT NULL
+    ), '[]'::jsonb) AS img_data,
+    a.last_update
+FROM associated_list a
+"""
+
+_migration_task: asyncio.Task | None = None
+
+
+def has_legacy_data(dialect_name: str) -> ColumnElement[bool]:
+    """associated_list 行中仍有未迁移的 text_data/img_data"""
+    length = func.jsonb_array_length if dialect_name == "postgresql" else func.json_array_length
+    return or_(length(AssociatedList.text_data) > 0, length(AssociatedList.img_data) > 0)
+
+
+async def migrate_rows(session: AsyncSession, rows: Sequence[AssociatedList]) -> int:
+    """
+    将 associated_list 行中的旧记录转写为事件并清空原数组，需由调用方提交。
+
+    text_data/img_data 只会从非空变为空，清空时再次检查条件，已被其他事务迁移的行会跳过。
+
+    Args:
+        session (AsyncSession): 数据库会话
+        rows (Sequence[AssociatedList]): 已加载 text_data/img_data 的行
+
+    Returns:
+        int: 本次迁移的行数
+    """
+    dialect_name = session.bind.dialect.name
+    migrated = 0
+    for row in rows:
+        result = await session.execute(
+            update(AssociatedList)
+            .where(AssociatedList.id == row.id, has_legacy_data(dialect_name))
+            .values(text_data=[], img_data=[])
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:  # type: ignore[attr-defined]
+            continue
+        session.add_all(ModerationEvent.from_data(row.user_id, data) for data in [*row.text_data, *row.img_data])
+        migrated += 1
+    return migrated
+
+
+async def migrate_legacy_events(batch_size: int = MIGRATION_BATCH_SIZE) -> int:
+    """
+    分批把所有旧记录迁移到 moderation_events，每批一个事务，可随时中断并在下次启动时继续。
+
+    Returns:
+        int: 迁移的行数
+    """
+    total = 0
+    while True:
+        async with get_session() as session:
+            rows = (
+                await session.scalars(
+                    select(AssociatedList)
+                    .where(has_legacy_data(session.bind.dialect.name))
+                    .order_by(AssociatedList.id)
+                    .limit(batch_size)
+                    .options(undefer(AssociatedList.text_data), undefer(AssociatedList.img_data))
+                )
+            ).all()
+            if not rows:
+                return total
+            total += await migrate_rows(session, rows)
+            await session.commit()
+        await asyncio.sleep(0)
+
+
+async def create_compat_view() -> None:
+    """创建兼容视图，按旧的 associated_list 结构合并旧数组与事件，供直接查询数据库的外部工具使用"""
+    async with get_session() as session:
+        ddl = _PG_COMPAT_VIEW if session.bind.dialect.name == "postgresql" else _SQLITE_COMPAT_VIEW
+        await session.execute(text(ddl))
+        await session.commit()
+
+
+async def _run_migration() -> None:
+    try:
+        if migrated := await migrate_legacy_events():
+            log.info(f"Migrated {migrated} associated_list rows to moderation_events")
+    except Exception as e:
+        log.warning(f"Failed to migrate associated_list rows to moderation_events: {e}")
+
+
+async def start_event_migration() -> None:
+    """创建兼容视图并在后台迁移旧记录，须在 init_db 之后调用"""
+    global _migration_task
+    await create_compat_view()
+    if _migration_task is None or _migration_task.done():
+        _migration_task = asyncio.create_task(_run_migration())
+
+
+async def stop_event_migration() -> None:
+    global _migration_task
+    if _migration_task is not None and not _migration_task.done():
+        _migration_task.cancel()
+        try:
+            await _migration_task
+        except asyncio.CancelledError:
+            pass
+    _migration_task = None
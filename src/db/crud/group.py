@@ -1,7 +1,10 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Any
+from dataclasses import dataclass, field
+from enum import IntEnum
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any
 
 from sqlalchemy import select
 from sqlalchemy import update as sa_update
@@ -9,97 +12,194 @@ from sqlalchemy import update as sa_update
 from src.db.models import GroupInfo
 from src.db.session import get_session
 
-_GROUP_CACHE: dict[int, GroupInfo] = {}
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+
+    from sqlalchemy.orm import InstrumentedAttribute
+
+
+class GroupRole(IntEnum):
+    """群内权限等级，高等级包含低等级的权限"""
+
+    NONE = 0
+    MODERATOR = 1
+    ADMIN = 2
+    MASTER = 3
+
+
+@dataclass(frozen=True, slots=True)
+class GroupEntry:
+    """
+    单个群的只读快照
+
+    Attributes:
+        info (GroupInfo): 群信息，视为只读，修改须通过 update_group
+        admins (frozenset[int]): admin 权限组
+        moderators (frozenset[int]): moderator 权限组
+        roles (Mapping[int, GroupRole]): 用户到权限等级的映射，不含普通成员
+    """
+
+    info: GroupInfo
+    admins: frozenset[int]
+    moderators: frozenset[int]
+    roles: Mapping[int, GroupRole]
+
+    @classmethod
+    def build(cls, info: GroupInfo) -> GroupEntry:
+        admins = frozenset(info.admins)
+        moderators = frozenset(info.moderators)
+        # 按权限从低到高写入，同一用户取最高权限
+        roles = dict.fromkeys(moderators, GroupRole.MODERATOR)
+        roles.update(dict.fromkeys(admins, GroupRole.ADMIN))
+        roles[info.master] = GroupRole.MASTER
+        return cls(info=info, admins=admins, moderators=moderators, roles=MappingProxyType(roles))
+
+    def role_of(self, user_id: int) -> GroupRole:
+        return self.roles.get(user_id, GroupRole.NONE)
+
+
+@dataclass(frozen=True, slots=True)
+class GroupRegistry:
+    """
+    群信息注册表快照
+
+    快照创建后不再修改，写操作总是构建新快照后整体替换，读取方无需加锁。
+
+    Attributes:
+        by_group_id (Mapping[int, GroupEntry]): 群号索引
+        by_fid (Mapping[int, GroupEntry]): 贴吧 fid 索引
+        members (frozenset[int]): 在任意群中拥有权限的用户
+    """
+
+    by_group_id: Mapping[int, GroupEntry] = field(default_factory=lambda: MappingProxyType({}))
+    by_fid: Mapping[int, GroupEntry] = field(default_factory=lambda: MappingProxyType({}))
+    members: frozenset[int] = frozenset()
+
+    @classmethod
+    def build(cls, groups: Iterable[GroupInfo]) -> GroupRegistry:
+        entries = {group.group_id: GroupEntry.build(group) for group in groups}
+        return cls(
+            by_group_id=MappingProxyType(entries),
+            by_fid=MappingProxyType({entry.info.fid: entry for entry in entries.values()}),
+            members=frozenset(user_id for entry in entries.values() for user_id in entry.roles),
+        )
+
+    def replace(self, group: GroupInfo) -> GroupRegistry:
+        """返回替换（或加入）单个群后的新快照"""
+        groups = {group_id: entry.info for group_id, entry in self.by_group_id.items()}
+        groups[group.group_id] = group
+        return GroupRegistry.build(groups.values())
+
+    def remove(self, group_id: int) -> GroupRegistry:
+        """返回移除单个群后的新快照"""
+        return GroupRegistry.build(entry.info for entry in self.by_group_id.values() if entry.info.group_id != group_id)
+
+
+# 首次访问时从数据库整体加载，此后本模块的写操作同步更新快照。
+# get_group、get_group_by_fid 未命中时回查数据库，以接收绕过本模块写入的群；
+# get_group_entry、get_group_role 在每条消息的规则检查中调用，只读快照
+_REGISTRY: GroupRegistry | None = None
+# 串行化写操作与未命中时的回查，命中快照的读取不加锁
 _LOCK = asyncio.Lock()
 
 
 async def load_groups() -> None:
+    global _REGISTRY
     async with _LOCK:
         async with get_session() as session:
             result = await session.execute(select(GroupInfo))
-            groups = result.scalars().all()
-            _GROUP_CACHE.clear()
-            _GROUP_CACHE.update({g.group_id: g for g in groups})
+            _REGISTRY = GroupRegistry.build(result.scalars().all())
 
 
-async def get_group(group_id: int) -> GroupInfo:
-    if group_id in _GROUP_CACHE:
-        return _GROUP_CACHE[group_id]
+async def get_registry() -> GroupRegistry:
+    """获取当前的注册表快照，未加载时先从数据库加载"""
+    if _REGISTRY is None:
+        await load_groups()
+    assert _REGISTRY is not None
+    return _REGISTRY
 
-    async with _LOCK:
-        if group_id in _GROUP_CACHE:
-            return _GROUP_CACHE[group_id]
 
+async def _reload_group(column: InstrumentedAttribute[int], value: int) -> GroupEntry | None:
+    """快照未命中时从数据库读取单个群，存在则换入新快照，调用前快照须已加载"""
+    global _REGISTRY
+    async with _LOCK:
+        assert _REGISTRY is not None
+        # 等待锁期间可能已由其他写操作加入
+        index = _REGISTRY.by_group_id if column is GroupInfo.group_id else _REGISTRY.by_fid
+        if (entry := index.get(value)) is not None:
+            return entry
         async with get_session() as session:
-            group = await session.get(GroupInfo, group_id)
-            if not group:
-                raise KeyError(f"群 {group_id} 不存在。")
-            _GROUP_CACHE[group_id] = group
-            return group
+            group = (await session.execute(select(GroupInfo).where(column == value))).scalar_one_or_none()
+        if group is None:
+            return None
+        _REGISTRY = _REGISTRY.replace(group)
+        return _REGISTRY.by_group_id[group.group_id]
 
 
-async def get_group_by_fid(fid: int) -> GroupInfo:
-    for group in _GROUP_CACHE.values():
-        if group.fid == fid:
-            return group
+async def get_group_entry(group_id: int) -> GroupEntry | None:
+    return (await get_registry()).by_group_id.get(group_id)
 
-    async with _LOCK:
-        for group in _GROUP_CACHE.values():
-            if group.fid == fid:
-                return group
 
-        async with get_session() as session:
-            result = await session.execute(select(GroupInfo).where(GroupInfo.fid == fid))
-            group = result.scalars().first()
-            if not group:
-                raise KeyError(f"贴吧 {fid} 对应的群不存在。")
-            _GROUP_CACHE[group.group_id] = group
-            return group
+async def get_group_role(group_id: int, user_id: int) -> GroupRole:
+    """获取用户在群内的权限等级，群未初始化时为 GroupRole.NONE"""
+    entry = (await get_registry()).by_group_id.get(group_id)
+    return entry.role_of(user_id) if entry is not None else GroupRole.NONE
+
+
+async def get_group(group_id: int) -> GroupInfo:
+    if (entry := (await get_registry()).by_group_id.get(group_id)) is None and (
+        entry := await _reload_group(GroupInfo.group_id, group_id)
+    ) is None:
+        raise KeyError(f"群 {group_id} 不存在。")
+    return entry.info
+
+
+async def get_group_by_fid(fid: int) -> GroupInfo:
+    if (entry := (await get_registry()).by_fid.get(fid)) is None and (
+        entry := await _reload_group(GroupInfo.fid, fid)
+    ) is None:
+        raise KeyError(f"贴吧 {fid} 对应的群不存在。")
+    return entry.info
 
 
 async def add_group(group: GroupInfo) -> None:
+    global _REGISTRY
+    registry = await get_registry()
     async with _LOCK:
         async with get_session() as session:
             session.add(group)
             await session.commit()
             await session.refresh(group)
-            _GROUP_CACHE[group.group_id] = group
+        _REGISTRY = (_REGISTRY or registry).replace(group)
 
 
 async def update_group(group_id: int, **kwargs: Any) -> None:
+    global _REGISTRY
+    registry = await get_registry()
     async with _LOCK:
-        if group_id not in _GROUP_CACHE:
-            async with get_session() as session:
-                group = await session.get(GroupInfo, group_id)
-                if not group:
-                    raise KeyError(f"群 {group_id} 不存在。")
-                _GROUP_CACHE[group_id] = group
-
         async with get_session() as session:
             stmt = sa_update(GroupInfo).where(GroupInfo.group_id == group_id).values(**kwargs)
             await session.execute(stmt)
             await session.commit()
-
-            obj = _GROUP_CACHE[group_id]
-            for k, v in kwargs.items():
-                setattr(obj, k, v)
+            # 重新读取得到新对象，旧快照中的对象保持不变
+            group = await session.get(GroupInfo, group_id, populate_existing=True)
+            if not group:
+                raise KeyError(f"群 {group_id} 不存在。")
+        _REGISTRY = (_REGISTRY or registry).replace(group)
 
 
 async def delete_group(group_id: int) -> None:
+    global _REGISTRY
+    registry = await get_registry()
     async with _LOCK:
-        if group_id in _GROUP_CACHE:
-            del _GROUP_CACHE[group_id]
-
         async with get_session() as session:
             group = await session.get(GroupInfo, group_id)
-            if group:
-                await session.delete(group)
-                await session.commit()
-            else:
+            if not group:
                 raise KeyError(f"群 {group_id} 不存在。")
+            await session.delete(group)
+            await session.commit()
+        _REGISTRY = (_REGISTRY or registry).remove(group_id)
 
 
 async def get_all_groups() -> list[GroupInfo]:
-    if not _GROUP_CACHE:
-        await load_groups()
-    return list(_GROUP_CACHE.values())
+    return [entry.info for entry in (await get_registry()).by_group_id.values()]
@@ -1,21 +1,30 @@
 from typing import Literal
 
-from tiebameow.client import HTTPXClient
-
 from src.db.models import Image, ImgDataModel
 from src.db.session import get_session
 
 
-async def download_and_save_img(url: str, uploader_id: int, fid: int, note: str = "") -> ImgDataModel | Literal[-1, -2]:
+async def download_img(url: str) -> bytes | Literal[-1, -2]:
+    """下载图片，失败时返回 -1，超过 10MB 时返回 -2"""
+    # 延迟导入，避免 src.common 与 src.db 之间的循环导入
+    from src.common.http_client import HttpClient
+
     try:
-        resp = await HTTPXClient.get(url, follow_redirects=True)
-        if resp is None:
-            return -1
+        resp = await HttpClient.get(url)
+        resp.raise_for_status()
+    except Exception:
+        return -1
+    if len(resp.content) > 10 * 1024 * 1024:
+        return -2
+    return resp.content
 
-        if len(resp.content) > 10 * 1024 * 1024:
-            return -2
 
-        return await save_image(uploader_id, fid, resp.content, note)
+async def download_and_save_img(url: str, uploader_id: int, fid: int, note: str = "") -> ImgDataModel | Literal[-1, -2]:
+    content = await download_img(url)
+    if isinstance(content, int):
+        return content
+    try:
+        return await save_image(uploader_id, fid, content, note)
     except Exception:
         return -1
 
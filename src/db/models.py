@@ -1,10 +1,11 @@
 from __future__ import annotations
 
+import functools
 from datetime import datetime
 from typing import TYPE_CHECKING, Any
 from zoneinfo import ZoneInfo
 
-from pydantic import BaseModel, Field, TypeAdapter, ValidationError, field_validator
+from pydantic import BaseModel, Field, TypeAdapter, field_validator
 from sqlalchemy import (
     BigInteger,
     Boolean,
@@ -24,6 +25,8 @@ from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 from sqlalchemy.types import TypeDecorator, TypeEngine
 
 if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
     from sqlalchemy.engine.interfaces import Dialect
 
 __all__ = [
@@ -36,6 +39,7 @@ __all__ = [
     "BanStatus",
     "BanList",
     "AssociatedList",
+    "ModerationEvent",
 ]
 
 SHANGHAI_TZ = ZoneInfo("Asia/Shanghai")
@@ -64,15 +68,99 @@ def json_type():
     return JSON().with_variant(JSONB, "postgresql")
 
 
+class LazyModelList[T: BaseModel](MutableList[T]):
+    """
+    延迟校验的 Pydantic 模型列表。
+
+    从数据库读出时列表中仍是原始 dict，首次在 Python 中访问元素时才用 TypeAdapter(list[T]) 一次性校验，
+    只读取同一行其他列（如 enable、portrait）时不产生校验开销。
+    Pydantic 校验等直接读取列表存储的 C 代码在校验前看到的是原始 dict，结果与模型一致。
+    写回时未访问过的列表原样写回原始 dict，已访问的列表整体序列化一次。
+    """
+
+    def __init__(self, iterable: Iterable[T] = ()):
+        super().__init__(iterable)
+        self._adapter: TypeAdapter[list[T]] | None = None
+
+    @classmethod
+    def from_raw(cls, raw: list[dict[str, Any]], adapter: TypeAdapter[list[T]]) -> LazyModelList[T]:
+        lazy = cls()
+        list.extend(lazy, raw)
+        lazy._adapter = adapter
+        return lazy
+
+    @property
+    def validated(self) -> bool:
+        return self._adapter is None
+
+    def _validate(self) -> None:
+        if self._adapter is None:
+            return
+        adapter, self._adapter = self._adapter, None
+        list.__setitem__(self, slice(None), adapter.validate_python(list.copy(self)))
+
+    def dump(self, adapter: TypeAdapter[list[T]]) -> list[dict[str, Any]]:
+        if self._adapter is not None:
+            return list.copy(self)
+        return adapter.dump_python(list.copy(self), mode="json")
+
+
+def _validating(name: str) -> Callable[..., Any]:
+    method = getattr(MutableList, name)
+
+    @functools.wraps(method)
+    def wrapper(self: LazyModelList, *args: Any, **kwargs: Any) -> Any:
+        self._validate()
+        return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+# 所有会读取或修改元素的方法都先完成校验
+for _name in (
+    "__iter__",
+    "__len__",
+    "__getitem__",
+    "__contains__",
+    "__reversed__",
+    "__eq__",
+    "__ne__",
+    "__lt__",
+    "__le__",
+    "__gt__",
+    "__ge__",
+    "__repr__",
+    "__add__",
+    "__mul__",
+    "__rmul__",
+    "__setitem__",
+    "__delitem__",
+    "__iadd__",
+    "__imul__",
+    "index",
+    "count",
+    "copy",
+    "append",
+    "extend",
+    "insert",
+    "pop",
+    "remove",
+    "clear",
+    "sort",
+    "reverse",
+):
+    setattr(LazyModelList, _name, _validating(_name))
+
+
 class PydanticList[T: BaseModel](TypeDecorator[list[T]]):
-    """用于存储 Pydantic 模型列表的 JSON/JSONB 列类型。"""
+    """用于存储 Pydantic 模型列表的 JSON/JSONB 列类型，读出的值为 LazyModelList。"""
 
     impl = JSON
     cache_ok = True
 
     def __init__(self, model_type: type[T] = BaseModel, *args: object, **kwargs: object):
         super().__init__(*args, **kwargs)
-        self.adapter: TypeAdapter[T] = TypeAdapter(model_type)
+        self.list_adapter: TypeAdapter[list[T]] = TypeAdapter(list[model_type])
 
     def load_dialect_impl(self, dialect: Dialect) -> TypeEngine[Any]:
         if dialect.name == "postgresql":
@@ -82,19 +170,12 @@ class PydanticList[T: BaseModel](TypeDecorator[list[T]]):
     def process_bind_param(self, value: list[T] | None, dialect: Dialect) -> list[dict[str, Any]]:
         if value is None:
             return []
-        return [self.adapter.dump_python(item, mode="json") for item in value]
+        if isinstance(value, LazyModelList):
+            return value.dump(self.list_adapter)
+        return self.list_adapter.dump_python(list(value), mode="json")
 
     def process_result_value(self, value: list[dict[str, Any]] | None, dialect: Dialect) -> list[T]:
-        if value is None:
-            return []
-
-        result: list[T] = []
-        for item in value:
-            try:
-                result.append(self.adapter.validate_python(item))
-            except ValidationError as exc:
-                raise exc
-        return result
+        return LazyModelList.from_raw(value or [], self.list_adapter)
 
     @property
     def python_type(self) -> type[list[T]]:  # type: ignore[override]
@@ -102,16 +183,17 @@ class PydanticList[T: BaseModel](TypeDecorator[list[T]]):
 
 
 def pydantic_list_column(model_type: type[BaseModel]):
-    """创建“可变 + Pydantic 列表”列类型，使对列表的原地修改触发 UPDATE。"""
+    """创建“可变 + 延迟校验的 Pydantic 列表”列类型，使对列表的原地修改触发 UPDATE。"""
 
-    return MutableList.as_mutable(PydanticList(model_type))
+    return LazyModelList.as_mutable(PydanticList(model_type))
 
 
 def _ensure_datetime(value: datetime | str | None) -> datetime:
     """将来自 DB/JSON 的时间值规范为带Asia/Shanghai时区的 datetime。"""
 
     if isinstance(value, datetime):
-        dt = value
+        # SQLite 不保存时区，读出的是上海时区的本地时间
+        dt = value if value.tzinfo is not None else value.replace(tzinfo=SHANGHAI_TZ)
     elif isinstance(value, str):
         try:
             dt = datetime.fromisoformat(value)
@@ -247,6 +329,8 @@ class BanStatus(TimestampMixin, Base):
     group_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
     last_autoban: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=now_with_tz, nullable=False)
 
+    __table_args__ = (Index("ix_ban_status_last_autoban", "last_autoban"),)
+
 
 class BanList(TimestampMixin, Base):
     """循封名单模型。
@@ -290,7 +374,10 @@ class BanList(TimestampMixin, Base):
         nullable=False,
     )
 
-    __table_args__ = (UniqueConstraint("fid", "user_id", name="uq_ban_list_fid_user"),)
+    __table_args__ = (
+        UniqueConstraint("fid", "user_id", name="uq_ban_list_fid_user"),
+        Index("ix_ban_list_fid_enable", "fid", "enable"),
+    )
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -314,9 +401,11 @@ class AssociatedList(TimestampMixin, Base):
         nicknames (list[str]): 曾用昵称列表。
         creater_id (int): 创建者 ID。
         is_public (bool): 是否公开。
-        text_data (list[TextDataModel]): 文字关联记录列表。
-        img_data (list[ImgDataModel]): 图片关联记录列表。
+        text_data (list[TextDataModel]): 尚未迁移到 moderation_events 的旧文字关联记录。
+        img_data (list[ImgDataModel]): 尚未迁移到 moderation_events 的旧图片关联记录。
         last_update (datetime): 最后更新时间。
+
+    新的关联记录写入 ModerationEvent，text_data/img_data 只在迁移期间保留旧数据，默认不随行加载。
     """
 
     __tablename__ = "associated_list"
@@ -335,11 +424,13 @@ class AssociatedList(TimestampMixin, Base):
         pydantic_list_column(TextDataModel),
         default=list,
         nullable=False,
+        deferred=True,
     )
     img_data: Mapped[list[ImgDataModel]] = mapped_column(
         pydantic_list_column(ImgDataModel),
         default=list,
         nullable=False,
+        deferred=True,
     )
 
     __table_args__ = (
@@ -357,3 +448,61 @@ class AssociatedList(TimestampMixin, Base):
             self.user_name = []
         if self.nicknames is None:
             self.nicknames = []
+
+
+class ModerationEvent(Base):
+    """关联记录事件模型。
+
+    以追加方式存储用户的关联记录（文字或图片），一条记录一行，按 (fid, user_id, time) 索引。
+
+    Attributes:
+        id (int): 事件 ID (自增主键)。
+        fid (int): 贴吧 Forum ID。
+        user_id (int): 用户 ID。
+        time (datetime): 上传时间。
+        uploader_id (int): 上传者 QQ。
+        text (str | None): 文本内容，图片记录为 None。
+        image_id (int | None): 图片表主键，文字记录为 None。
+        note (str): 图片注释。
+    """
+
+    __tablename__ = "moderation_events"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    fid: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    user_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    time: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=now_with_tz, nullable=False)
+    uploader_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    text: Mapped[str | None] = mapped_column(Text, nullable=True)
+    image_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    note: Mapped[str] = mapped_column(Text, default="", nullable=False)
+
+    __table_args__ = (Index("ix_moderation_events_fid_user_time", "fid", "user_id", "time"),)
+
+    @property
+    def is_image(self) -> bool:
+        return self.image_id is not None
+
+    @classmethod
+    def from_data(cls, user_id: int, data: TextDataModel | ImgDataModel) -> ModerationEvent:
+        if isinstance(data, ImgDataModel):
+            return cls(
+                fid=data.fid,
+                user_id=user_id,
+                time=data.upload_time,
+                uploader_id=data.uploader_id,
+                image_id=data.image_id,
+                note=data.note,
+            )
+        return cls(fid=data.fid, user_id=user_id, time=data.upload_time, uploader_id=data.uploader_id, text=data.text)
+
+    def to_data(self) -> TextDataModel | ImgDataModel:
+        if self.image_id is not None:
+            return ImgDataModel(
+                uploader_id=self.uploader_id,
+                fid=self.fid,
+                upload_time=self.time,
+                image_id=self.image_id,
+                note=self.note,
+            )
+        return TextDataModel(uploader_id=self.uploader_id, fid=self.fid, upload_time=self.time, text=self.text or "")
@@ -1,8 +1,15 @@
-from collections.abc import AsyncGenerator
+from __future__ import annotations
+
+import asyncio
 from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
 from pathlib import Path
+from typing import TYPE_CHECKING, Any
 
 import nonebot
+from sqlalchemy import event, inspect
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from tiebameow.models.orm import RuleBase
 
@@ -10,6 +17,11 @@ from logger import log
 
 from .models import Base
 
+if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator
+
+    from sqlalchemy import Connection, MetaData
+
 _engine: AsyncEngine | None = None
 _sessionmaker: async_sessionmaker[AsyncSession] | None = None
 
@@ -21,12 +33,96 @@ db_path = data_dir / "tiebabot.db"
 db_url = f"sqlite+aiosqlite:///{db_path.as_posix()}"
 
 
+@dataclass(frozen=True)
+class DBProfile:
+    """
+    数据库性能参数
+
+    Attributes:
+        pool_size (int): PostgreSQL 连接池常驻连接数
+        max_overflow (int): PostgreSQL 连接池允许额外创建的连接数
+        pool_recycle (int): PostgreSQL 连接的最长复用时间（秒），-1 为不限制
+        pool_pre_ping (bool): 取出连接前是否检测连接可用
+        statement_cache_size (int): asyncpg 预编译语句缓存大小，使用 PgBouncer 等事务级连接池时需设为 0
+        sqlite_synchronous (str): SQLite synchronous 模式，WAL 模式下 NORMAL 即可保证一致性
+        sqlite_mmap_size (int): SQLite 内存映射读取的字节数
+        sqlite_busy_timeout (int): SQLite 等待写锁的毫秒数
+    """
+
+    pool_size: int = 10
+    max_overflow: int = 20
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = True
+    statement_cache_size: int = 100
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_busy_timeout: int = 5000
+
+    @classmethod
+    def from_config(cls, config: Any) -> DBProfile:
+        defaults = cls()
+        return cls(
+            pool_size=getattr(config, "db_pool_size", defaults.pool_size),
+            max_overflow=getattr(config, "db_max_overflow", defaults.max_overflow),
+            pool_recycle=getattr(config, "db_pool_recycle", defaults.pool_recycle),
+            pool_pre_ping=getattr(config, "db_pool_pre_ping", defaults.pool_pre_ping),
+            statement_cache_size=getattr(config, "db_statement_cache_size", defaults.statement_cache_size),
+            sqlite_synchronous=str(getattr(config, "db_sqlite_synchronous", defaults.sqlite_synchronous)).upper(),
+            sqlite_mmap_size=getattr(config, "db_sqlite_mmap_size", defaults.sqlite_mmap_size),
+            sqlite_busy_timeout=getattr(config, "db_sqlite_busy_timeout", defaults.sqlite_busy_timeout),
+        )
+
+    def pg_engine_options(self) -> dict[str, Any]:
+        return {
+            "pool_size": self.pool_size,
+            "max_overflow": self.max_overflow,
+            "pool_recycle": self.pool_recycle,
+            "pool_pre_ping": self.pool_pre_ping,
+            "connect_args": {"prepared_statement_cache_size": self.statement_cache_size},
+        }
+
+    def apply_sqlite_pragmas(self, engine: AsyncEngine) -> None:
+        """在每个新建的 SQLite 连接上设置 WAL 等参数"""
+        if self.sqlite_synchronous not in {"OFF", "NORMAL", "FULL", "EXTRA"}:
+            raise ValueError(f"Invalid DB_SQLITE_SYNCHRONOUS: {self.sqlite_synchronous}")
+        pragmas = (
+            "PRAGMA journal_mode=WAL",
+            f"PRAGMA synchronous={self.sqlite_synchronous}",
+            f"PRAGMA mmap_size={int(self.sqlite_mmap_size)}",
+            f"PRAGMA busy_timeout={int(self.sqlite_busy_timeout)}",
+        )
+
+        @event.listens_for(engine.sync_engine, "connect")
+        def _on_connect(dbapi_connection: Any, _connection_record: Any) -> None:
+            cursor = dbapi_connection.cursor()
+            try:
+                for pragma in pragmas:
+                    cursor.execute(pragma)
+            finally:
+                cursor.close()
+
+
+def _create_missing_indexes(connection: Connection, metadata: MetaData) -> None:
+    """create_all 不会为已存在的表补建索引，在此逐个检查并创建新增的索引"""
+    inspector = inspect(connection)
+    for table in metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(connection)
+                log.info(f"Created index {index.name} on {table.name}")
+
+
 async def init_db() -> None:
     global _engine, _sessionmaker, db_url
 
+    profile = DBProfile()
     # 尝试从配置中读取 PostgreSQL 连接信息
     try:
         config = nonebot.get_driver().config
+        profile = DBProfile.from_config(config)
         pg_host = getattr(config, "pg_host", None)
         if pg_host:
             pg_port = getattr(config, "pg_port", 5432)
@@ -37,15 +133,22 @@ async def init_db() -> None:
             if pg_user and pg_password and pg_db:
                 pg_url = f"postgresql+asyncpg://{pg_user}:{pg_password}@{pg_host}:{pg_port}/{pg_db}"
                 try:
-                    engine = create_async_engine(pg_url, echo=False, future=True)
+                    engine = create_async_engine(pg_url, echo=False, future=True, **profile.pg_engine_options())
                     async with engine.begin() as conn:
                         await conn.run_sync(Base.metadata.create_all)
+                        await conn.run_sync(_create_missing_indexes, Base.metadata)
                         enable_addons = getattr(config, "enable_addons", False)
                         if enable_addons:
                             await conn.run_sync(RuleBase.metadata.create_all)
+                            await conn.run_sync(_create_missing_indexes, RuleBase.metadata)
                     _engine = engine
                     db_url = pg_url
-                    log.info(f"Connected to PostgreSQL: {pg_host}:{pg_port}/{pg_db}")
+                    log.info(
+                        f"Connected to PostgreSQL: {pg_host}:{pg_port}/{pg_db} "
+                        f"(pool_size={profile.pool_size}, max_overflow={profile.max_overflow}, "
+                        f"pool_recycle={profile.pool_recycle}, pre_ping={profile.pool_pre_ping}, "
+                        f"statement_cache_size={profile.statement_cache_size})"
+                    )
                 except Exception as e:
                     log.warning(f"Failed to connect to PostgreSQL: {e}. Fallback to SQLite.")
                     if _engine:
@@ -56,10 +159,15 @@ async def init_db() -> None:
 
     if _engine is None:
         _engine = create_async_engine(db_url, echo=False, future=True)
+        profile.apply_sqlite_pragmas(_engine)
         _sessionmaker = async_sessionmaker(_engine, class_=AsyncSession, expire_on_commit=False)
         async with _engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
-        log.info(f"Connected to SQLite: {db_path}")
+            await conn.run_sync(_create_missing_indexes, Base.metadata)
+        log.info(
+            f"Connected to SQLite: {db_path} (journal_mode=WAL, synchronous={profile.sqlite_synchronous}, "
+            f"mmap_size={profile.sqlite_mmap_size}, busy_timeout={profile.sqlite_busy_timeout}ms)"
+        )
     else:
         _sessionmaker = async_sessionmaker(_engine, class_=AsyncSession, expire_on_commit=False)
 
@@ -72,8 +180,94 @@ async def close_db() -> None:
     _sessionmaker = None
 
 
+class UnitOfWorkError(SQLAlchemyError):
+    """工作单元内已写入的数据被回滚，工作单元无法提交"""
+
+
+class _UnitOfWorkSession(AsyncSession):
+    """工作单元内共享的会话，CRUD 函数中的 commit 只 flush，由工作单元结束时统一提交"""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.has_writes = False
+        self.failed = False
+
+    async def commit(self) -> None:
+        # CRUD 函数只在写入后调用 commit，据此判断事务中是否已有写入
+        self.has_writes = True
+        await self.flush()
+
+    async def rollback(self) -> None:
+        # 回滚会撤销整个事务，包括此前其他 CRUD 函数已成功的写入
+        if self.has_writes:
+            self.failed = True
+        await super().rollback()
+
+    async def commit_unit(self) -> None:
+        if self.failed:
+            raise UnitOfWorkError("Unit of work was rolled back by an inner operation")
+        await super().commit()
+
+
+@dataclass(frozen=True)
+class _UnitOfWork:
+    session: _UnitOfWorkSession
+    owner: asyncio.Task | None
+
+
+_current_unit: ContextVar[_UnitOfWork | None] = ContextVar("db_unit_of_work", default=None)
+
+
+def _active_unit() -> _UnitOfWork | None:
+    unit = _current_unit.get()
+    # create_task、gather 创建的任务会继承上下文，但不能与创建者并发使用同一个会话
+    if unit is None or unit.owner is not asyncio.current_task():
+        return None
+    return unit
+
+
+@asynccontextmanager
+async def unit_of_work() -> AsyncGenerator[AsyncSession, None]:
+    """
+    工作单元
+
+    块内调用的 CRUD 函数共享同一个会话与事务，块正常结束时统一提交，抛出异常时整体回滚。
+    嵌套使用时加入外层工作单元。只对创建它的任务生效，块内启动的并发任务仍使用各自的会话。
+    事务在第一条 SQL 执行时才开始，应避免在块内等待网络请求等耗时操作；使用 SQLite 时其他写入会等待本事务提交。
+
+    块内 CRUD 函数在已有写入后回滚时（如写入失败），整个事务已被撤销，即使该函数只返回 False，
+    块结束时也会抛出 UnitOfWorkError，调用方据此判断整体失败；只有读取的工作单元不受影响。
+    """
+    if (unit := _active_unit()) is not None:
+        yield unit.session
+        return
+    if _engine is None:
+        raise RuntimeError("Database is not initialized. Call init_db first.")
+
+    session = _UnitOfWorkSession(_engine, expire_on_commit=False)
+    token = _current_unit.set(_UnitOfWork(session, asyncio.current_task()))
+    try:
+        yield session
+        await session.commit_unit()
+    except BaseException:
+        await session.rollback()
+        raise
+    finally:
+        _current_unit.reset(token)
+        await session.close()
+
+
 @asynccontextmanager
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
+    """获取数据库会话，处于工作单元中时返回工作单元的会话"""
+    if (unit := _active_unit()) is not None:
+        try:
+            yield unit.session
+        except SQLAlchemyError:
+            await unit.session.rollback()
+            raise
+        return
+
     if _sessionmaker is None:
         raise RuntimeError("Database is not initialized. Call init_db first.")
     async with _sessionmaker() as session:
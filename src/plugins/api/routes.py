@@ -1,15 +1,29 @@
 import base64
+import io
 from itertools import count
-from typing import Annotated
+from typing import Annotated, Literal
 
-from fastapi import Depends, FastAPI, HTTPException, status
+from fastapi import Depends, FastAPI, HTTPException, UploadFile, status
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from nonebot import get_app, get_bot, get_plugin_config
 from pydantic import BaseModel
 
-from src.common.cache import ClientCache, tieba_uid2user_info_cached
-from src.common.service.basic import ban_user, delete_thread, generate_checkout_msg
+from src.common import HttpClient, Job, JobManager
+from src.common.cache import ClientCache, TieredCache, tieba_uid2user_info_cached
+from src.common.service import ban_user, delete_thread, generate_checkout_msg
 from src.db.crud import get_group
+from src.db.crud.bulk import (
+    AssociatedRecord,
+    BanListRecord,
+    BulkFormat,
+    export_associated_list,
+    export_ban_list,
+    format_records,
+    import_associated_list,
+    import_ban_list,
+    iter_records,
+)
 
 from .config import Config
 
@@ -34,6 +48,9 @@ async def require_token(credentials: Annotated[HTTPAuthorizationCredentials | No
     return credentials.credentials
 
 
+BulkTable = Literal["ban_list", "associated_list"]
+
+
 class BaseBody(BaseModel):
     user_id: int
     group_id: int
@@ -58,6 +75,8 @@ async def checkout(body: Checkout, _: Annotated[str | None, Depends(require_toke
     client = await ClientCache.get_bawu_client(body.group_id)
     user_info_t = await tieba_uid2user_info_cached(client, body.tieba_uid)
     base_content, image_bytes = await generate_checkout_msg(client, user_info_t.user_id)
+    if not base_content:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     img_b64 = base64.b64encode(image_bytes).decode()
     message = [
         {"type": "text", "data": {"text": base_content}},
@@ -94,3 +113,66 @@ async def ban(body: Ban, _: Annotated[str | None, Depends(require_token)]):
         message=[{"type": "text", "data": {"text": f"{'封禁成功' if result else f'封禁失败：{err}'}。"}}],
     )
     return {"status": "ok"}
+
+
+@app.get("/api/metrics/cache", status_code=status.HTTP_200_OK)
+async def cache_metrics(_: Annotated[str | None, Depends(require_token)]):
+    return {"memory": TieredCache.get_memory_stats(), "hits": TieredCache.get_stats()}
+
+
+@app.get("/api/metrics/http", status_code=status.HTTP_200_OK)
+async def http_metrics(_: Annotated[str | None, Depends(require_token)]):
+    return {"latency": HttpClient.get_latency_stats()}
+
+
+async def _get_group_or_404(group_id: int):
+    try:
+        return await get_group(group_id)
+    except KeyError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Group not found") from e
+
+
+@app.get("/api/bulk/{table}/export", status_code=status.HTTP_200_OK)
+async def bulk_export(
+    table: BulkTable, group_id: int, _: Annotated[str | None, Depends(require_token)], fmt: BulkFormat = "jsonl"
+):
+    group_info = await _get_group_or_404(group_id)
+    records = export_ban_list(group_info.fid) if table == "ban_list" else export_associated_list(group_info.fid)
+    return StreamingResponse(
+        format_records(records, fmt),
+        media_type="text/csv" if fmt == "csv" else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{table}_{group_info.fid}.{fmt}"'},
+    )
+
+
+@app.post("/api/bulk/{table}/import", status_code=status.HTTP_200_OK)
+async def bulk_import(
+    table: BulkTable,
+    group_id: int,
+    file: UploadFile,
+    _: Annotated[str | None, Depends(require_token)],
+    fmt: BulkFormat = "jsonl",
+):
+    group_info = await _get_group_or_404(group_id)
+    text = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+
+    async def run(job: Job) -> int:
+        def report(imported: int) -> None:
+            job.report(f"已导入 {imported} 行")
+
+        if table == "ban_list":
+            records = iter_records(text, fmt, BanListRecord)
+            return await import_ban_list(group_info.fid, group_id, records, on_progress=report)
+        return await import_associated_list(
+            group_info.fid, iter_records(text, fmt, AssociatedRecord), on_progress=report
+        )
+
+    # 作为后台任务运行，导入进度可通过任务列表查看
+    job = JobManager.submit(f"导入{table}", run, group_id=group_id)
+    try:
+        imported = await job.task
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)) from e
+    finally:
+        text.detach()
+    return {"status": "ok", "imported": imported}
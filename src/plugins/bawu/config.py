@@ -5,9 +5,13 @@ from pydantic import BaseModel
 class Config(BaseModel):
     # 执行任务的最长时间（分钟）
     force_delete_max_duration: int = 120
-    # 每秒尝试删除的次数（整数）
+    # 每个吧每秒最多尝试删除的次数，遇到频率限制时自动降低
     force_delete_rps: int = 4
-    # 每次批处理任务的最大等待时间（秒）
+    # 同一帖子两次尝试之间的基础间隔（秒）
+    force_delete_interval: float = 1
+    # 超时或频率限制时指数退避的最大间隔（秒）
+    force_delete_max_backoff: float = 60
+    # 单次删除请求的最大等待时间（秒）
     force_delete_max_wait_time: float = 5
 
 
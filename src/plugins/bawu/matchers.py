@@ -5,6 +5,7 @@ from nonebot.adapters.onebot.v11 import Bot, GroupMessageEvent, permission
 from nonebot.rule import Rule
 from nonebot_plugin_alconna import AlconnaQuery, Field, Match, Query, on_alconna
 
+from src.common import JobManager
 from src.common.cache import ClientCache
 from src.db.crud import get_group
 from src.utils import (
@@ -422,3 +423,52 @@ async def query_force_del_handle(thread_url: Match[str], event: GroupMessageEven
     manager = await get_force_delete_manager()
     status = manager.get_task_info(event.group_id, tid)
     await query_force_del_cmd.finish(f"帖子 {tid} 的状态：{status}")
+
+
+list_jobs_alc = Alconna("list_jobs")
+
+list_jobs_cmd = on_alconna(
+    command=list_jobs_alc,
+    aliases={"任务列表"},
+    comp_config={"lite": True},
+    use_cmd_start=True,
+    use_cmd_sep=True,
+    rule=Rule(rule_signed, rule_moderator),
+    permission=permission.GROUP,
+    priority=5,
+    block=True,
+)
+
+
+@list_jobs_cmd.handle()
+async def list_jobs_handle(event: GroupMessageEvent):
+    jobs = JobManager.list_jobs(event.group_id)
+    if not jobs:
+        await list_jobs_cmd.finish("本群暂无进行中的后台任务。")
+    lines = [f"[{job.id}] {job.name}：{job.progress}" for job in jobs]
+    await list_jobs_cmd.finish("本群进行中的后台任务：\n" + "\n".join(lines))
+
+
+cancel_job_alc = Alconna(
+    "cancel_job",
+    Args["job_id", int, Field(completion=lambda: "请输入任务ID")],
+)
+
+cancel_job_cmd = on_alconna(
+    command=cancel_job_alc,
+    aliases={"取消任务"},
+    comp_config={"lite": True},
+    use_cmd_start=True,
+    use_cmd_sep=True,
+    rule=Rule(rule_signed, rule_moderator),
+    permission=permission.GROUP,
+    priority=5,
+    block=True,
+)
+
+
+@cancel_job_cmd.handle()
+async def cancel_job_handle(event: GroupMessageEvent, job_id: Match[int]):
+    if JobManager.cancel(job_id.result, group_id=event.group_id):
+        await cancel_job_cmd.finish(f"已取消任务 {job_id.result}。")
+    await cancel_job_cmd.finish(f"未找到本群进行中的任务 {job_id.result}。")
@@ -1,15 +1,19 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
+import heapq
+import random
 import time
+from itertools import count
 from typing import TYPE_CHECKING, TypedDict
 
 from aiotieba import PostSortType
 from nonebot import get_bot, logger
 from nonebot.adapters.onebot.v11 import MessageSegment
-from tiebameow.client.tieba_client import AiotiebaError, ErrorHandler, UnretriableApiError
+from tiebameow.client.tieba_client import AiotiebaError, ErrorHandler, RetriableApiError, UnretriableApiError
 
-from src.common import tieba_uid2user_info_cached
+from src.common import JobManager, TokenBucket, tieba_uid2user_info_cached
 from src.common.cache import (
     ClientCache,
     add_force_delete_record,
@@ -23,10 +27,11 @@ from src.db.crud import add_associated_data
 from .config import config
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable, Iterator
+    from collections.abc import Iterable
 
     from tiebameow.client import Client
 
+    from src.common import Job
     from src.db import GroupInfo
 
 
@@ -44,10 +49,21 @@ class ForceDeleteTask(TypedDict):
 
 
 FORCE_DELETE_ALLOW_CODES = frozenset((*ErrorHandler.RETRIABLE_CODES, 224009, 302)) - {300000}
+# 触发频率限制的错误码，遇到时降低该吧的删除速率并对任务指数退避
+FORCE_DELETE_THROTTLE_CODES = frozenset((11, 429, 4011, 220034, 230871))
+# 吧级速率的下限与每次成功后的恢复量（次/秒）
+FORCE_DELETE_MIN_RPS = 0.2
+FORCE_DELETE_RPS_STEP = 0.5
 
 
 class ForceDeleteManager:
-    """强制删帖任务管理器"""
+    """
+    强制删帖任务管理器
+
+    任务按下次尝试时间存放在最小堆中，Worker 只在最早的任务到期时被唤醒；
+    同一吧的删除请求共享一个令牌桶，遇到频率限制时减半速率、成功后逐步恢复。
+    重试间隔带随机抖动，避免大量任务同时到期。
+    """
 
     _instance: ForceDeleteManager | None = None
     _lock = asyncio.Lock()
@@ -55,6 +71,14 @@ class ForceDeleteManager:
     def __init__(self) -> None:
         self._tasks: dict[str, ForceDeleteTask] = {}
         self._worker_task: asyncio.Task | None = None
+        # (下次尝试时间, 序号, 任务ID)，序号与 _schedule_seq 不一致的条目已失效
+        self._heap: list[tuple[float, int, str]] = []
+        self._schedule_seq: dict[str, int] = {}
+        self._seq = count()
+        self._wakeup = asyncio.Event()
+        self._running: set[asyncio.Task] = set()
+        self._buckets: dict[int, TokenBucket] = {}
+        self._failures: dict[str, int] = {}
 
     @classmethod
     async def get_instance(cls) -> ForceDeleteManager:
@@ -79,6 +103,7 @@ class ForceDeleteManager:
         for task_id, info in tasks.items():
             if info["expire_time"] > now:
                 self._tasks[task_id] = info
+                self._schedule(task_id, random.uniform(0, config.force_delete_interval))
                 count += 1
             else:
                 await remove_force_delete_record(task_id)
@@ -130,6 +155,7 @@ class ForceDeleteManager:
             }
             await add_force_delete_record(task_id, task_info)
             self._tasks[task_id] = task_info
+            self._schedule(task_id, 0)
 
         self._ensure_worker_running()
         return True, f"已启动强制删帖任务，将在后台持续尝试删除{config.force_delete_max_duration}分钟。"
@@ -138,8 +164,7 @@ class ForceDeleteManager:
         """取消任务"""
         task_id = self._make_task_id(group_id, tid)
         async with self._lock:
-            if task_id in self._tasks:
-                del self._tasks[task_id]
+            if self._drop_task(task_id):
                 await remove_force_delete_record(task_id)
                 return f"已取消对帖子 tid={tid} 的强制删除任务。"
         await remove_force_delete_record(task_id)
@@ -159,17 +184,43 @@ class ForceDeleteManager:
         async with self._lock:
             await save_force_delete_records(self._tasks)
 
-        if self._worker_task and not self._worker_task.done():
-            self._worker_task.cancel()
-            try:
-                await self._worker_task
-            except asyncio.CancelledError:
-                pass
+        pending = [task for task in (self._worker_task, *self._running) if task and not task.done()]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
 
     def _ensure_worker_running(self) -> None:
         """确保 Worker 正在运行"""
         if self._worker_task is None or self._worker_task.done():
-            self._worker_task = asyncio.create_task(self._worker_loop())
+            self._worker_task = JobManager.submit("强制删帖", self._worker_loop, background=True).task
+
+    def _schedule(self, task_id: str, delay: float) -> None:
+        """安排任务在 delay 秒后执行，覆盖此前的安排"""
+        seq = next(self._seq)
+        self._schedule_seq[task_id] = seq
+        heapq.heappush(self._heap, (time.time() + delay, seq, task_id))
+        self._wakeup.set()
+
+    def _drop_task(self, task_id: str) -> bool:
+        """从内存中移除任务，堆中的条目在出堆时丢弃"""
+        self._schedule_seq.pop(task_id, None)
+        self._failures.pop(task_id, None)
+        return self._tasks.pop(task_id, None) is not None
+
+    def _get_bucket(self, fid: int) -> TokenBucket:
+        if (bucket := self._buckets.get(fid)) is None:
+            bucket = self._buckets[fid] = TokenBucket(config.force_delete_rps)
+        return bucket
+
+    def _retry_delay(self, task_id: str, *, backoff: bool) -> float:
+        """计算下次重试的间隔，backoff 为真时按连续失败次数指数退避，结果附带 ±20% 抖动"""
+        if backoff:
+            failures = self._failures[task_id] = self._failures.get(task_id, 0) + 1
+            delay = min(config.force_delete_interval * 2**failures, config.force_delete_max_backoff)
+        else:
+            self._failures.pop(task_id, None)
+            delay = config.force_delete_interval
+        return delay * random.uniform(0.8, 1.2)
 
     async def _send_feedback(self, task_info: ForceDeleteTask, message: str) -> bool:
         """发送反馈消息到群组"""
@@ -189,102 +240,102 @@ class ForceDeleteManager:
             logger.error(f"[ForceDelete] 发送反馈消息失败: {e}")
             return False
 
-    async def _execute_task(self, task_id: str, task_info: ForceDeleteTask) -> None:
-        """执行单个删除任务"""
-        if task_id not in self._tasks:
-            return
+    async def _finish_task(self, task_id: str, task_info: ForceDeleteTask, message: str) -> None:
+        """结束任务并反馈结果"""
+        if self._drop_task(task_id):
+            await remove_force_delete_record(task_id)
+            await self._send_feedback(task_info, message)
 
+    async def _execute_task(self, task_id: str, task_info: ForceDeleteTask) -> None:
+        """执行单次删除尝试，未结束的任务按结果重新排期"""
         thread_id = task_info["thread_id"]
+        bucket = self._get_bucket(task_info["fid"])
+        backoff = False
 
         try:
-            task_info["attempts"] += 1
-            client = await self.get_client(task_info["group_id"])
-            success = await client.del_thread(task_info["fid"], thread_id)
-
+            await bucket.acquire()
             if task_id not in self._tasks:
                 return
+            task_info["attempts"] += 1
+            client = await self.get_client(task_info["group_id"])
+            success = await asyncio.wait_for(
+                client.del_thread(task_info["fid"], thread_id), timeout=config.force_delete_max_wait_time
+            )
+            bucket.set_rate(min(bucket.rate + FORCE_DELETE_RPS_STEP, config.force_delete_rps))
 
             if success:
-                async with self._lock:
-                    if task_id in self._tasks:
-                        del self._tasks[task_id]
-                        await remove_force_delete_record(task_id)
                 logger.info(f"[ForceDelete] 删帖成功: tid={thread_id}")
-                await self._send_feedback(task_info, f"强制删帖任务已成功删除帖子 tid={thread_id}。")
-
-        except AiotiebaError as e:
-            if task_id not in self._tasks:
+                await self._finish_task(task_id, task_info, f"强制删帖任务已成功删除帖子 tid={thread_id}。")
                 return
 
+        except TimeoutError:
+            backoff = True
+        except AiotiebaError as e:
             if e.code not in FORCE_DELETE_ALLOW_CODES:
                 error_msg = "权限不足" if e.code == 300000 else str(e)
                 logger.warning(f"[ForceDelete] 删除失败 tid={thread_id}: {e}，将终止任务")
-                async with self._lock:
-                    if task_id in self._tasks:
-                        del self._tasks[task_id]
-                        await remove_force_delete_record(task_id)
-                await self._send_feedback(
-                    task_info, f"强制删帖任务删除帖子 tid={thread_id} 失败: {error_msg}，已终止任务。"
+                await self._finish_task(
+                    task_id, task_info, f"强制删帖任务删除帖子 tid={thread_id} 失败: {error_msg}，已终止任务。"
                 )
-        except Exception as e:
-            if task_id not in self._tasks:
                 return
+            if e.code in FORCE_DELETE_THROTTLE_CODES:
+                bucket.set_rate(max(bucket.rate / 2, FORCE_DELETE_MIN_RPS))
+                logger.debug(f"[ForceDelete] fid={task_info['fid']} 触发频率限制，速率降至 {bucket.rate:.2f}/s")
+            backoff = e.code in FORCE_DELETE_THROTTLE_CODES or isinstance(e, RetriableApiError)
+        except Exception as e:
             logger.error(f"[ForceDelete] 删除任务异常 tid={thread_id}: {e}，将终止任务")
-            async with self._lock:
-                if task_id in self._tasks:
-                    del self._tasks[task_id]
-                    await remove_force_delete_record(task_id)
-            await self._send_feedback(task_info, f"强制删帖任务删除帖子 tid={thread_id} 时发生错误: {e}，已终止任务。")
-
-    def _task_iterator(self) -> Iterator[tuple[str, ForceDeleteTask]]:
-        """获取当前任务的迭代器"""
-        while True:
-            yield from self._tasks.items()
-
-    async def _worker_loop(self) -> None:
-        """强制删除任务循环执行器"""
+            await self._finish_task(
+                task_id, task_info, f"强制删帖任务删除帖子 tid={thread_id} 时发生错误: {e}，已终止任务。"
+            )
+            return
+
+        if task_id in self._tasks:
+            self._schedule(task_id, self._retry_delay(task_id, backoff=backoff))
+
+    async def _worker_loop(self, job: Job) -> None:
+        """强制删除任务调度器，按到期时间从堆中取出任务执行"""
         logger.debug("[ForceDelete] Worker 启动")
-        task_iterator = self._task_iterator()
-
-        while True:
-            async with self._lock:
-                tasks_to_process = list(self._tasks.items())
-                if not tasks_to_process:
-                    logger.info("[ForceDelete] Worker 停止，任务队列为空")
-                    break
-
-                now = time.time()
-                expired_tasks = []
-                for task_id, task in tasks_to_process:
-                    if now > task["expire_time"]:
-                        expired_tasks.append((task_id, task))
-
-                for task_id, task in expired_tasks:
-                    del self._tasks[task_id]
-                    await remove_force_delete_record(task_id)
-                    logger.info(f"[ForceDelete] 任务超时: tid={task['thread_id']}")
-                    await self._send_feedback(task, f"强制删帖任务已超时，未能成功删除帖子 tid={task['thread_id']}。")
-
-            if not self._tasks:
-                break
-
-            task_list = []
-            for _ in range(config.force_delete_rps):
-                try:
-                    task_id, task_info = next(task_iterator)
-                    task_list.append(self._execute_task(task_id, task_info))
-                except StopIteration:
-                    break
-
-            if task_list:
-                try:
-                    await asyncio.wait_for(
-                        asyncio.gather(*task_list, return_exceptions=True), timeout=config.force_delete_max_wait_time
-                    )
-                except TimeoutError:
-                    logger.warning("[ForceDelete] 任务批处理超时")
 
-            await asyncio.sleep(1)
+        while self._tasks or self._running:
+            job.report(f"{len(self._tasks)} 个删帖任务进行中")
+            if not self._heap:
+                # 仅剩执行中的任务，等待其重新排期或结束
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            due_time, seq, task_id = self._heap[0]
+            if self._schedule_seq.get(task_id) != seq:
+                heapq.heappop(self._heap)
+                continue
+
+            now = time.time()
+            if due_time > now:
+                self._wakeup.clear()
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=due_time - now)
+                continue
+
+            heapq.heappop(self._heap)
+            del self._schedule_seq[task_id]
+            task_info = self._tasks[task_id]
+
+            if now > task_info["expire_time"]:
+                logger.info(f"[ForceDelete] 任务超时: tid={task_info['thread_id']}")
+                await self._finish_task(
+                    task_id, task_info, f"强制删帖任务已超时，未能成功删除帖子 tid={task_info['thread_id']}。"
+                )
+                continue
+
+            running = asyncio.create_task(self._execute_task(task_id, task_info))
+            self._running.add(running)
+            running.add_done_callback(self._on_execute_done)
+
+        logger.info("[ForceDelete] Worker 停止，任务队列为空")
+
+    def _on_execute_done(self, task: asyncio.Task) -> None:
+        self._running.discard(task)
+        self._wakeup.set()
 
 
 async def delete_threads(
@@ -21,15 +21,18 @@ from nonebot_plugin_alconna import (
 )
 
 from src.common.cache import ClientCache, tieba_uid2user_info_cached
-from src.db import ImgDataModel, TextDataModel
+from src.common.service import generate_checkout_base, generate_checkout_image, generate_checkout_msg
+from src.db import ImgDataModel, TextDataModel, unit_of_work
 from src.db.crud import (
     add_associated_data,
     download_and_save_img,
     get_associated_data,
+    get_associated_events,
     get_group,
     get_image_data,
 )
 from src.utils import (
+    TIEBA_URL_MARK,
     handle_post_url,
     handle_thread_url,
     handle_tieba_uid,
@@ -86,17 +89,22 @@ async def checkout_handle(event: GroupMessageEvent, tieba_id_str: Match[str]):
     await checkout_cmd.send("正在查询...")
 
     client = await ClientCache.get_bawu_client(event.group_id)
-    base_content, image_content = await service.generate_checkout_msg(client, tieba_id, plugin_config.checkout_tieba)
+    user_info_t = await tieba_uid2user_info_cached(client, tieba_id)
+    user_info, base_content = await generate_checkout_base(client, user_info_t.user_id)
     if not base_content:
         await checkout_cmd.finish("用户信息获取失败，请稍后重试。")
 
-    await checkout_cmd.finish(message=MessageSegment.text(base_content) + MessageSegment.image(image_content))
+    await checkout_cmd.send(base_content)
+    image_content = await generate_checkout_image(client, user_info)
+    await checkout_cmd.finish(MessageSegment.image(image_content))
 
 
 async def consumer(producer: Producer, check_posts_cmd: type[AlconnaMatcher]):
     specific_posts = await producer.get()
     if specific_posts is None:
-        if producer.fids is not None:
+        if producer.stopped_idle:
+            await check_posts_cmd.send(f"最近 {producer.pages_fetched} 页发言中没有该用户在指定吧的发言，已停止搜索。")
+        elif producer.fids is not None:
             await check_posts_cmd.send("未能查询到该用户在指定吧的发言。")
         else:
             await check_posts_cmd.send("未能查询到该用户发言，可能该用户已隐藏发言。")
@@ -107,7 +115,12 @@ async def consumer(producer: Producer, check_posts_cmd: type[AlconnaMatcher]):
         next_specific_posts = await producer.get()
         specific_posts_img = MessageSegment.image(specific_posts)
         if next_specific_posts is None:
-            specific_posts_suffix = MessageSegment.text(f"第 {display_pn} 页，已无更多内容，结束查询。")
+            if producer.stopped_idle:
+                specific_posts_suffix = MessageSegment.text(
+                    f"第 {display_pn} 页，连续 {producer.idle_pages} 页没有指定吧的发言，已停止搜索。"
+                )
+            else:
+                specific_posts_suffix = MessageSegment.text(f"第 {display_pn} 页，已无更多内容，结束查询。")
             await check_posts_cmd.send(specific_posts_img + specific_posts_suffix)
             await producer.stop()
             return
@@ -169,7 +182,7 @@ async def check_posts_handle(
         await check_posts_cmd.finish("用户信息获取失败，请稍后重试。")
 
     await check_posts_cmd.send("正在查询...")
-    producer = Producer(client, user_info, fids)
+    producer = Producer(client, user_info, fids, event.group_id, plugin_config.check_posts_max_idle_pages)
     try:
         await consumer(producer, check_posts_cmd)
     finally:
@@ -305,31 +318,33 @@ async def get_associate_data_handle(event: GroupMessageEvent, state: T_State, ti
         await get_associate_data_cmd.finish("未查询到该用户的关联信息。")
     state["associated_data"] = associated_data
 
-    text_datas = list(enumerate(associated_data.text_data, 1))
+    events = await get_associated_events(user_info.user_id, group_info.fid)
+    text_datas = list(enumerate((e for e in events if not e.is_image), 1))
     state["text_datas"] = text_datas
     text_datas_list = [
-        f"{index}. [{text_data.upload_time.strftime('%Y-%m-%d %H:%M:%S')}] {text_data.text}"
-        for index, text_data in text_datas
+        f"{index}. [{text_data.time.strftime('%Y-%m-%d %H:%M:%S')}] {text_data.text}" for index, text_data in text_datas
     ]
     img_enum_start = len(text_datas_list) + 1
-    img_datas = list(enumerate(associated_data.img_data, img_enum_start))
+    img_datas = list(enumerate((e for e in events if e.is_image), img_enum_start))
     state["img_datas"] = img_datas
     img_datas_list = []
 
-    for index, img in img_datas:
-        img_data = await get_image_data(img.image_id)
-        if not img_data:
-            img_datas_list.append(
-                MessageSegment.text(
-                    f"{index}. [{img.upload_time.strftime('%Y-%m-%d %H:%M:%S')}] 图片获取失败" + f"注释：{img.note}"
+    # 所有图片共用一个数据库会话读取
+    async with unit_of_work():
+        for index, img in img_datas:
+            img_data = await get_image_data(img.image_id)
+            if not img_data:
+                img_datas_list.append(
+                    MessageSegment.text(
+                        f"{index}. [{img.time.strftime('%Y-%m-%d %H:%M:%S')}] 图片获取失败" + f"注释：{img.note}"
+                    )
                 )
+                continue
+            img_datas_list.append(
+                f"{index}. [{img.time.strftime('%Y-%m-%d %H:%M:%S')}]"
+                + MessageSegment.image(img_data)
+                + f"注释：{img.note}"
             )
-            continue
-        img_datas_list.append(
-            f"{index}. [{img.upload_time.strftime('%Y-%m-%d %H:%M:%S')}]"
-            + MessageSegment.image(img_data)
-            + f"注释：{img.note}"
-        )
 
     await get_associate_data_cmd.send(
         f"查询到用户 {user_info.nick_name}({user_info.tieba_uid}) 的以下关联信息：\n" + "\n".join(text_datas_list)
@@ -393,9 +408,10 @@ async def get_last_replier_handle(event: GroupMessageEvent, thread_url: Match[st
     user_info_dict, msg = await service.get_last_replier(client, group_info.fname, thread_id)
     if user_info_dict:
         await get_last_replier_cmd.send(msg)
-        checkout_msg, checkout_img = await service.generate_checkout_msg(
-            client, user_info_dict["tieba_uid"], plugin_config.checkout_tieba
-        )
+        user_info_t = await tieba_uid2user_info_cached(client, user_info_dict["tieba_uid"])
+        checkout_msg, checkout_img = await generate_checkout_msg(client, user_info_t.user_id)
+        if not checkout_msg:
+            await get_last_replier_cmd.finish("用户信息获取失败，请稍后重试。")
         await get_last_replier_cmd.finish(
             message=MessageSegment.text(checkout_msg) + MessageSegment.image(checkout_img)
         )
@@ -473,11 +489,11 @@ async def check_delete_handle(event: GroupMessageEvent, tieba_id_str: Match[str]
     await check_delete_cmd.send("\n".join(logs))
 
 
+_ignore_users = frozenset(plugin_config.ignore_users)
+
+
 async def has_tieba_url(event: GroupMessageEvent) -> bool:
-    raw_message = event.raw_message
-    if "tieba.baidu.com/p/" in raw_message and event.user_id not in plugin_config.ignore_users:
-        return True
-    return False
+    return TIEBA_URL_MARK in event.raw_message and event.user_id not in _ignore_users
 
 
 tieba_url_message = on_message(
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 import asyncio
+import math
 from typing import TYPE_CHECKING
 
-from src.common import get_user_posts_cached
+from src.common import JobManager, get_user_posts_cached
 from src.common.cache import get_tieba_name
 from src.utils import text_to_image
 
@@ -11,48 +12,94 @@ if TYPE_CHECKING:
     from aiotieba.api.tieba_uid2user_info._classdef import UserInfo_TUid
     from tiebameow.client import Client
 
+    from src.common import Job
+
+
+ITEMS_PER_IMAGE = 20
+MIN_BATCH_SIZE = 2
+MAX_BATCH_SIZE = 16
+
 
 class Producer:
-    def __init__(self, client: Client, user_info: UserInfo_TUid, fids: list[int] | None):
-        self.queue: asyncio.Queue[bytes | None] = asyncio.Queue(maxsize=4)
+    """
+    查发言的数据生产者
+
+    根据已观测到的每页有效条数自适应调整每批抓取的页数，并提前渲染好下一页图片放入队列。
+    指定贴吧时，连续 max_idle_pages 页没有匹配的发言即停止翻页并设置 stopped_idle，此时发言历史可能尚未到底。
+    """
+
+    def __init__(
+        self,
+        client: Client,
+        user_info: UserInfo_TUid,
+        fids: list[int] | None,
+        group_id: int | None = None,
+        max_idle_pages: int = 0,
+    ):
+        self.queue: asyncio.Queue[bytes | None] = asyncio.Queue(maxsize=2)
         self.buffer: list[dict[str, str]] = []
         self.user_info = user_info
         self.fids = set(fids) if fids else None
         self.client = client
         self.current_page = 1
         self.page_show = 1
-        self.batch_size = 10 if fids else 4
-        self.producer_task = asyncio.create_task(self._producer())
+        self.batch_size = 4
+        self.pages_fetched = 0
+        self.items_matched = 0
+        self.idle_pages = 0
+        self.max_idle_pages = max_idle_pages
+        self.stopped_idle = False
+        self.job = JobManager.submit("查发言", self._producer, group_id=group_id, interactive=True)
+        self.producer_task = self.job.task
+
+    def _next_batch_size(self) -> int:
+        """按已观测的每页有效条数估算凑满一张图片所需的页数"""
+        if self.items_matched == 0:
+            return min(self.batch_size * 2, MAX_BATCH_SIZE) if self.pages_fetched else self.batch_size
+        items_per_page = self.items_matched / self.pages_fetched
+        needed = max(ITEMS_PER_IMAGE - len(self.buffer), 1)
+        return max(MIN_BATCH_SIZE, min(MAX_BATCH_SIZE, math.ceil(needed / items_per_page)))
 
     async def _fetch_batch(self) -> bool:
-        """获取单个批次的数据"""
+        """获取单个批次的数据，返回是否已没有更多数据"""
+        self.batch_size = self._next_batch_size()
         tasks = [
             get_user_posts_cached(self.client, self.user_info.user_id, pn=page, rn=50)
             for page in range(self.current_page, self.current_page + self.batch_size)
         ]
         results = await asyncio.gather(*tasks)
-        has_empty = False
+        self.current_page += self.batch_size
+        exhausted = False
         new_items = []
 
         for result in results:
             if not result.objs:
-                has_empty = True
+                exhausted = True
                 break
 
+            self.pages_fetched += 1
+            page_matched = 0
             for post in result.objs:
                 if self.fids is not None and post.fid not in self.fids:
                     continue
 
+                page_matched += 1
                 tieba_name = str(await get_tieba_name(post.fid)) + "吧"
-                post_content = "\n".join([("  - " + obj.contents.text.replace("\\n", " ")) for obj in post.objs])
+                post_content = "\n".join([("  - " + obj.text.replace("\\n", " ")) for obj in post.objs])
 
                 new_items.append({
                     "tieba_name": tieba_name,
                     "post_content": post_content,
                 })
 
+            self.items_matched += page_matched
+            self.idle_pages = 0 if page_matched else self.idle_pages + 1
+            if self.max_idle_pages and self.idle_pages >= self.max_idle_pages:
+                self.stopped_idle = exhausted = True
+                break
+
         self.buffer.extend(new_items)
-        return has_empty
+        return exhausted
 
     async def _generate_msg(self, posts: list[dict[str, str]], page: int) -> bytes:
         """生成消息"""
@@ -63,39 +110,48 @@ class Producer:
             footer=f"第 {page} 页",
         )
 
-    async def _producer(self):
+    def _close_queue(self) -> None:
+        """向队列放入结束标记，队列已满时丢弃一项以保证消费者能收到结束标记"""
+        try:
+            self.queue.put_nowait(None)
+        except asyncio.QueueFull:
+            self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+    async def _producer(self, job: Job):
         """生产者主循环"""
         try:
             while True:
-                if len(self.buffer) < 20:
-                    has_empty = await self._fetch_batch()
-                    self.current_page += self.batch_size
+                if len(self.buffer) < ITEMS_PER_IMAGE:
+                    exhausted = await self._fetch_batch()
 
-                    if has_empty:
+                    if exhausted:
                         while self.buffer:
-                            chunk = self.buffer[:20]
-                            self.buffer = self.buffer[20:]
+                            chunk = self.buffer[:ITEMS_PER_IMAGE]
+                            self.buffer = self.buffer[ITEMS_PER_IMAGE:]
                             await self.queue.put(await self._generate_msg(chunk, self.page_show))
                             self.page_show += 1
                         await self.queue.put(None)
                         return
                 else:
-                    chunk = self.buffer[:20]
-                    self.buffer = self.buffer[20:]
+                    chunk = self.buffer[:ITEMS_PER_IMAGE]
+                    self.buffer = self.buffer[ITEMS_PER_IMAGE:]
                     await self.queue.put(await self._generate_msg(chunk, self.page_show))
                     self.page_show += 1
+                job.report(f"已扫描 {self.current_page - 1} 页，已生成 {self.page_show - 1} 张图片")
 
-        except asyncio.CancelledError:
-            pass
-        except Exception:
-            try:
-                self.queue.put_nowait(None)
-            except asyncio.QueueFull:
-                pass
+        except (asyncio.CancelledError, Exception):
+            self._close_queue()
 
     async def get(self) -> bytes | None:
-        """获取数据"""
-        return await self.queue.get()
+        """获取数据，任务在排队阶段即被取消时返回 None"""
+        if not self.queue.empty() or not self.producer_task.done():
+            getter = asyncio.ensure_future(self.queue.get())
+            await asyncio.wait((getter, self.producer_task), return_when=asyncio.FIRST_COMPLETED)
+            if getter.done():
+                return getter.result()
+            getter.cancel()
+        return self.queue.get_nowait() if not self.queue.empty() else None
 
     async def stop(self):
         if not self.producer_task.done():
@@ -110,11 +166,3 @@ class Producer:
             except asyncio.QueueEmpty:
                 break
         self.buffer.clear()
-
-    def __del__(self):
-        try:
-            asyncio.get_running_loop()
-        except RuntimeError:
-            return
-        if hasattr(self, "producer_task") and self.producer_task and not self.producer_task.done():
-            self.producer_task.cancel()
@@ -1,123 +1,17 @@
 from __future__ import annotations
 
-import asyncio
-import operator
 from datetime import datetime, timedelta
 from typing import TYPE_CHECKING
-from urllib.parse import quote_plus
 
-import httpx
-
-from src.common import get_user_posts_cached, get_user_threads_cached, tieba_uid2user_info_cached
-from src.common.cache import get_tieba_name
-from src.db.crud import set_associated_data
-from src.utils import (
-    render_thread,
-    text_to_image,
-)
+from src.common import tieba_uid2user_info_cached
+from src.db.crud import delete_associated_events
+from src.utils import render_thread
 
 if TYPE_CHECKING:
-    from collections.abc import Sequence
-
-    from aiotieba.api.get_user_contents._classdef import UserPostss, UserThreads
     from aiotieba.api.tieba_uid2user_info._classdef import UserInfo_TUid
     from tiebameow.client import Client
 
-    from src.db import GroupInfo, ImgDataModel, TextDataModel
-
-
-async def generate_checkout_msg(client: Client, tieba_id: int, checkout_tieba_config: str) -> tuple[str, bytes]:
-    """
-    生成查成分消息内容。
-
-    Args:
-        client: 已初始化的 Client 实例
-        tieba_id: 贴吧UID
-        checkout_tieba_config: 通过第三方接口查询的贴吧名称配置
-
-    Returns:
-        (base_content, image_content)
-    """
-    user_info = await tieba_uid2user_info_cached(client, tieba_id)
-    if user_info.user_id == 0:
-        return "", b""
-    nick_name_old = await client.get_nickname_old(user_info.user_id)
-
-    user_tieba_obj = await client.get_follow_forums(user_info.user_id)
-    if user_tieba_obj.objs:
-        user_tieba = [
-            {"tieba_name": forum.fname, "experience": forum.exp, "level": forum.level} for forum in user_tieba_obj.objs
-        ]
-    else:
-        try:
-            async with httpx.AsyncClient(verify=False, timeout=5) as session:
-                resp = await session.get(
-                    f"https://tb.anova.me/getLevel?fname={quote_plus(checkout_tieba_config)}&uid={tieba_id}"
-                )
-                resp.raise_for_status()
-                resp_json = resp.json()
-            user_tieba = [
-                {
-                    "tieba_name": item["fname"],
-                    "experience": item["exp"],
-                    "level": item["level"],
-                }
-                for item in resp_json.get("result", [])
-            ]
-            user_tieba = sorted(user_tieba, key=operator.itemgetter("experience"), reverse=True)
-        except Exception:
-            user_tieba = []
-
-    user_posts_count = {}
-
-    tasks = [get_user_threads_cached(client, user_info.user_id, page) for page in range(1, 51)]
-    results_t: Sequence[UserThreads] = await asyncio.gather(*tasks, return_exceptions=False)
-    for result in results_t:
-        if result and result.objs:
-            for thread in result.objs:
-                if thread.fid in user_posts_count:
-                    user_posts_count[thread.fid] += 1
-                else:
-                    user_posts_count[thread.fid] = 1
-
-    tasks = [get_user_posts_cached(client, user_info.user_id, page, rn=50) for page in range(1, 51)]
-    results_p: Sequence[UserPostss] = await asyncio.gather(*tasks, return_exceptions=False)
-    for result in results_p:
-        if result and result.objs:
-            for post in result.objs:
-                if post.fid in user_posts_count:
-                    user_posts_count[post.fid] += 1
-                else:
-                    user_posts_count[post.fid] = 1
-
-    sorted_posts_count = sorted(user_posts_count.items(), key=operator.itemgetter(1), reverse=True)
-    sorted_posts_count = sorted_posts_count[:30]
-
-    final_posts_count = [
-        {"tieba_name": str(await get_tieba_name(item[0])), "count": item[1]} for item in sorted_posts_count
-    ]
-
-    user_posts_count_str = "\n".join([f"  - {item['tieba_name']}：{item['count']}" for item in final_posts_count])
-    user_tieba_str = "\n".join([
-        f"  - {forum['tieba_name']}：{forum['experience']}经验值，等级{forum['level']}" for forum in user_tieba
-    ])
-    user_info_str = (
-        f"昵称：{user_info.nick_name_new}\n"
-        f"旧版昵称：{nick_name_old}\n"
-        f"用户名：{user_info.user_name}\n"
-        f"贴吧ID：{user_info.tieba_uid}\n"
-        f"user_id：{user_info.user_id}\n"
-        f"portrait：{user_info.portrait}\n"
-        f"吧龄：{user_info.age}年"
-    )
-
-    base_content = f"基本信息：\n{user_info_str}"
-    image_content = await text_to_image(
-        f"用户 {user_info.show_name}({user_info.tieba_uid}) 关注的贴吧：\n{user_tieba_str}\n\n"
-        f"近期发贴的吧：\n{user_posts_count_str}"
-    )
-
-    return base_content, image_content
+    from src.db import GroupInfo, ModerationEvent
 
 
 async def delete_associated_data(
@@ -125,8 +19,8 @@ async def delete_associated_data(
     group_info: GroupInfo,
     ids: list[int],
     uploader_id: int,
-    text_datas: list[tuple[int, TextDataModel]],
-    img_datas: list[tuple[int, ImgDataModel]],
+    text_datas: list[tuple[int, ModerationEvent]],
+    img_datas: list[tuple[int, ModerationEvent]],
 ) -> bool:
     """
     删除关联数据。
@@ -134,31 +28,21 @@ async def delete_associated_data(
     Args:
         user_info: 用户信息
         group_info: 贴吧信息
-        ids: 需要删除的关联数据ID列表
+        ids: 需要删除的关联数据序号列表
         uploader_id: 操作者的用户ID
-        text_datas: 带索引的当前用户的文本数据列表
-        img_datas: 带索引的当前用户的图片数据列表
+        text_datas: 带序号的当前用户的文本记录列表
+        img_datas: 带序号的当前用户的图片记录列表
 
     Returns:
         是否成功删除关联数据
     """
-    for delete_id in ids:
-        text = next((text_data for index, text_data in text_datas if index == delete_id), None)
-        if text:
-            if text.uploader_id != uploader_id and text.uploader_id != group_info.master:
-                continue
-            text_datas = list(filter(lambda x: x[0] != delete_id, text_datas))
-            continue
-        img = next((img_data for index, img_data in img_datas if index == delete_id), None)
-        if img:
-            if img.uploader_id != uploader_id and img.uploader_id != group_info.master:
-                continue
-            img_datas = list(filter(lambda x: x[0] != delete_id, img_datas))
-            continue
-
-    text_datas_final = [text_data for _, text_data in text_datas]
-    img_datas_final = [img_data for _, img_data in img_datas]
-    return await set_associated_data(user_info.user_id, group_info.fid, text_datas_final, img_datas_final)
+    events = dict(text_datas + img_datas)
+    event_ids = [
+        event.id
+        for delete_id in ids
+        if (event := events.get(delete_id)) and event.uploader_id in (uploader_id, group_info.master)
+    ]
+    return await delete_associated_events(user_info.user_id, group_info.fid, event_ids)
 
 
 async def get_last_replier(client: Client, fname: str, tid: int) -> tuple[dict | None, str]:
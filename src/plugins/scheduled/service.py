@@ -5,15 +5,28 @@ from datetime import timedelta
 from typing import TYPE_CHECKING, NamedTuple
 
 from logger import log
-from src.common.cache import ClientCache, add_autoban_record, get_tieba_name, trim_autoban_records
-from src.common.cache.appeal import del_appeal_id, get_appeals, set_appeal_id, set_appeals
+from src.common.cache import (
+    ClientCache,
+    add_autoban_record,
+    get_tieba_name,
+    get_user_infos_cached,
+    trim_autoban_records,
+)
+from src.common.cache.appeal import (
+    add_appeal,
+    del_appeal_id,
+    get_appeals,
+    refresh_appeals,
+    remove_appeal,
+    set_appeal_id,
+)
 from src.db import TextDataModel
 from src.db.crud import (
     add_associated_data,
     get_autoban,
     get_autoban_lists,
-    get_ban_status,
     get_group,
+    is_autobanned,
     update_autoban,
     update_group,
 )
@@ -90,14 +103,14 @@ async def process_appeals_for_group(group_info: GroupInfo) -> AppealNotification
 
     client = await ClientCache.get_bawu_client(group_info.group_id)
     appeals = await client.get_unblock_appeals(group_info.fid, rn=20)
-    cached_appeals = await get_appeals(group_info.group_id)
+    cached_appeals = set(await get_appeals(group_info.group_id))
+    user_infos = await get_user_infos_cached(client, [appeal.user_id for appeal in appeals.objs])
 
     for appeal in appeals.objs:
-        user_info = await client.get_user_info(appeal.user_id)
-        banlist, _ = await get_ban_status(group_info.fid, user_info.user_id)
-
+        if (user_info := user_infos.get(appeal.user_id)) is None:
+            continue
         # 自动拒绝已循封用户的申诉
-        if banlist == "banned":
+        if await is_autobanned(group_info.fid, user_info.user_id):
             await client.handle_unblock_appeals(
                 group_info.fid,
                 appeal_ids=[appeal.appeal_id],
@@ -132,7 +145,7 @@ async def process_appeals_for_group(group_info: GroupInfo) -> AppealNotification
                         )
                     )
                 if (appeal.appeal_id, user_info.user_id) in cached_appeals:
-                    cached_appeals.remove((appeal.appeal_id, user_info.user_id))
+                    await remove_appeal(group_info.group_id, appeal.appeal_id, user_info.user_id)
                 continue
 
         # 推送新申诉
@@ -145,7 +158,7 @@ async def process_appeals_for_group(group_info: GroupInfo) -> AppealNotification
                 )
             )
 
-    await set_appeals(group_info.group_id, cached_appeals)
+    await refresh_appeals(group_info.group_id)
 
     return notifications
 
@@ -161,9 +174,7 @@ async def update_appeal_cache(group_id: int, message_id: int, appeal_id: int, us
         user_id (int): 用户ID
     """
     await set_appeal_id(message_id, (appeal_id, user_id))
-    cached_appeals = await get_appeals(group_id)
-    cached_appeals.append((appeal_id, user_id))
-    await set_appeals(group_id, cached_appeals)
+    await add_appeal(group_id, appeal_id, user_id)
 
 
 async def update_group_args(group_id: int, key: str, value: bool):
@@ -176,8 +187,7 @@ async def update_group_args(group_id: int, key: str, value: bool):
     """
     group_info = await get_group(group_id)
     if group_info:
-        group_args = group_info.group_args
-        group_args.update({key: value})
+        group_args = {**group_info.group_args, key: value}
         await update_group(group_id, group_args=group_args)
 
 
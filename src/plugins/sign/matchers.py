@@ -1,8 +1,11 @@
 from arclet.alconna import Alconna, Args, MultiVar
-from nonebot import on_request
+from nonebot import on_notice, on_request
 from nonebot.adapters.onebot.v11 import (
     Bot,
     FriendRequestEvent,
+    GroupAdminNoticeEvent,
+    GroupDecreaseNoticeEvent,
+    GroupIncreaseNoticeEvent,
     GroupMessageEvent,
     PrivateMessageEvent,
     permission,
@@ -11,6 +14,7 @@ from nonebot.params import Received
 from nonebot.rule import Rule
 from nonebot_plugin_alconna import AlconnaQuery, Arparma, At, Field, Match, Query, UniMessage, on_alconna
 
+from src.common.cache import invalidate_group_member, update_group_member_role
 from src.utils import (
     rule_master,
     rule_member,
@@ -341,3 +345,16 @@ friend_request = on_request(
 @friend_request.handle()
 async def handle_friend_request(bot: Bot, event: FriendRequestEvent):
     await event.approve(bot)
+
+
+group_member_notice = on_notice(priority=1, block=False)
+
+
+@group_member_notice.handle()
+async def handle_group_member_notice(
+    event: GroupAdminNoticeEvent | GroupIncreaseNoticeEvent | GroupDecreaseNoticeEvent,
+):
+    if isinstance(event, GroupAdminNoticeEvent):
+        await update_group_member_role(event.group_id, event.user_id, "admin" if event.sub_type == "set" else "member")
+    else:
+        await invalidate_group_member(event.group_id, event.user_id)
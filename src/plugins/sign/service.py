@@ -100,6 +100,9 @@ async def set_admin(
     group_info = await get_group(group_id)
     if group_info is None:
         raise ValueError("Group not initialized")
+    # 快照中的群信息只读，在副本上修改
+    admins = list(group_info.admins)
+    moderators = list(group_info.moderators)
 
     succeeded = []
     failed = []
@@ -108,20 +111,20 @@ async def set_admin(
 
     for admin_user_id in users:
         user_name = await get_user_name(bot, group_id, admin_user_id)
-        if admin_user_id in group_info.admins:
+        if admin_user_id in admins:
             failed.append((user_name, admin_user_id, "已位于admin权限组中"))
         elif admin_user_id == group_info.master:
             failed.append((user_name, admin_user_id, "已拥有吧主权限"))
-        elif admin_user_id in group_info.moderators:
-            group_info.moderators.remove(admin_user_id)
-            group_info.admins.append(admin_user_id)
+        elif admin_user_id in moderators:
+            moderators.remove(admin_user_id)
+            admins.append(admin_user_id)
             succeeded.append((user_name, admin_user_id, "已从moderator权限组提升至admin权限组"))
         else:
-            group_info.admins.append(admin_user_id)
+            admins.append(admin_user_id)
             succeeded.append((user_name, admin_user_id, "已添加至admin权限组"))
 
     try:
-        await update_group(group_id, admins=group_info.admins, moderators=group_info.moderators)
+        await update_group(group_id, admins=admins, moderators=moderators)
     except Exception as e:
         log.info(f"群聊 {group_id} 添加admin权限失败：{e}")
         raise e
@@ -146,20 +149,21 @@ async def remove_admin(
     group_info = await get_group(group_id)
     if group_info is None:
         raise ValueError("Group not initialized")
+    admins = list(group_info.admins)
 
     succeeded = []
     failed = []
 
     for admin_user_id in users:
         user_name = await get_user_name(bot, group_id, admin_user_id)
-        if admin_user_id not in group_info.admins:
+        if admin_user_id not in admins:
             failed.append((user_name, admin_user_id))
         else:
-            group_info.admins.remove(admin_user_id)
+            admins.remove(admin_user_id)
             succeeded.append((user_name, admin_user_id))
 
     try:
-        await update_group(group_id, admins=group_info.admins)
+        await update_group(group_id, admins=admins)
     except Exception as e:
         log.info(f"群聊 {group_id} 移除admin权限失败：{e}")
         raise e
@@ -184,6 +188,8 @@ async def set_moderator(
     group_info = await get_group(group_id)
     if group_info is None:
         raise ValueError("Group not initialized")
+    admins = list(group_info.admins)
+    moderators = list(group_info.moderators)
 
     succeeded = []
     failed = []
@@ -192,20 +198,20 @@ async def set_moderator(
 
     for moderator_user_id in users:
         user_name = await get_user_name(bot, group_id, moderator_user_id)
-        if moderator_user_id in group_info.moderators:
+        if moderator_user_id in moderators:
             failed.append((user_name, moderator_user_id, "已位于moderator权限组中"))
         elif moderator_user_id == group_info.master:
             failed.append((user_name, moderator_user_id, "已拥有吧主权限"))
-        elif moderator_user_id in group_info.admins:
-            group_info.admins.remove(moderator_user_id)
-            group_info.moderators.append(moderator_user_id)
+        elif moderator_user_id in admins:
+            admins.remove(moderator_user_id)
+            moderators.append(moderator_user_id)
             succeeded.append((user_name, moderator_user_id, "已从admin权限组降级至moderator权限组"))
         else:
-            group_info.moderators.append(moderator_user_id)
+            moderators.append(moderator_user_id)
             succeeded.append((user_name, moderator_user_id, "已添加至moderator权限组"))
 
     try:
-        await update_group(group_id, admins=group_info.admins, moderators=group_info.moderators)
+        await update_group(group_id, admins=admins, moderators=moderators)
     except Exception as e:
         log.info(f"群聊 {group_id} 添加moderator权限失败：{e}")
         raise e
@@ -230,20 +236,21 @@ async def remove_moderator(
     group_info = await get_group(group_id)
     if group_info is None:
         raise ValueError("Group not initialized")
+    moderators = list(group_info.moderators)
 
     succeeded = []
     failed = []
 
     for moderator_user_id in users:
         user_name = await get_user_name(bot, group_id, moderator_user_id)
-        if moderator_user_id not in group_info.moderators:
+        if moderator_user_id not in moderators:
             failed.append((user_name, moderator_user_id))
         else:
-            group_info.moderators.remove(moderator_user_id)
+            moderators.remove(moderator_user_id)
             succeeded.append((user_name, moderator_user_id))
 
     try:
-        await update_group(group_id, moderators=group_info.moderators)
+        await update_group(group_id, moderators=moderators)
     except Exception as e:
         log.info(f"群聊 {group_id} 移除moderator权限失败：{e}")
         raise e
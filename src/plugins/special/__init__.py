@@ -1,9 +1,20 @@
+from nonebot import get_driver
+from nonebot.adapters import Bot
 from nonebot.plugin import PluginMetadata
 
-from . import matchers
+from . import matchers, service
 
 __plugin_meta__ = PluginMetadata(
     name="special",
     description="",
     usage="",
 )
+
+
+driver = get_driver()
+
+
+@driver.on_bot_connect
+async def _(bot: Bot):
+    # 恢复上次停机时未完成的清空发言任务，须等发起任务的机器人连接后才能发送反馈
+    await service.resume_clear_posts_tasks(bot.self_id)
@@ -0,0 +1,14 @@
+from nonebot import get_plugin_config
+from pydantic import BaseModel
+
+
+class Config(BaseModel):
+    # 清空发言时每秒最多发出的删除请求数
+    clear_posts_rps: float = 5
+    # 清空发言时并发执行删除的协程数
+    clear_posts_workers: int = 3
+    # 清空发言时每轮并发抓取的发贴历史页数
+    clear_posts_page_batch: int = 5
+
+
+config = get_plugin_config(Config)
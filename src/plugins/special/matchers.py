@@ -1,7 +1,7 @@
 from typing import TYPE_CHECKING, Literal
 
 from arclet.alconna import Alconna, Args, MultiVar
-from nonebot.adapters.onebot.v11 import GroupMessageEvent, MessageSegment, permission
+from nonebot.adapters.onebot.v11 import Bot, GroupMessageEvent, MessageSegment, permission
 from nonebot.params import Received
 from nonebot.rule import Rule
 from nonebot.typing import T_State
@@ -9,8 +9,8 @@ from nonebot_plugin_alconna import AlconnaQuery, Field, Match, Query, on_alconna
 
 from logger import log
 from src.common.cache import ClientCache, get_tieba_name, tieba_uid2user_info_cached
-from src.db.crud import associated, autoban, group, image
-from src.db.models import GroupInfo, ImgDataModel, TextDataModel
+from src.db import unit_of_work
+from src.db.crud import autoban, group, image
 from src.utils import (
     handle_tieba_uid,
     handle_tieba_uids,
@@ -26,6 +26,8 @@ from . import service
 if TYPE_CHECKING:
     from aiotieba.typing import UserInfo
 
+    from src.db.models import GroupInfo, ImgDataModel, TextDataModel
+
 clear_posts_alc = Alconna(
     "clear_posts",
     Args["mode", Literal["方式1", "方式2"], "方式1"],
@@ -48,7 +50,10 @@ clear_posts_cmd = on_alconna(
 @clear_posts_cmd.handle()
 @require_slave_bduss
 async def clear_posts_handle(
-    event: GroupMessageEvent, mode: Match[str], tieba_uid_strs: Query[tuple[str, ...]] = AlconnaQuery("tieba_uids", ())
+    bot: Bot,
+    event: GroupMessageEvent,
+    mode: Match[str],
+    tieba_uid_strs: Query[tuple[str, ...]] = AlconnaQuery("tieba_uids", ()),
 ):
     group_info = await group.get_group(event.group_id)
 
@@ -69,23 +74,16 @@ async def clear_posts_handle(
         )
         if not confirm or confirm.extract_plain_text() != "确认":
             await clear_posts_cmd.finish("操作已取消。")
-        await clear_posts_cmd.send("已创建清理任务。")
-        for user_id in user_ids:
-            if user_id == (await client.get_self_info()).user_id:
-                break
-            posts_deleted, threads_deleted = await service.del_posts_from_user_posts(client, group_info.fid, user_id)
-            user_info = await client.get_user_info(user_id)
-            await associated.add_associated_data(
-                user_info,
-                group_info,
-                text_data=[
-                    TextDataModel(uploader_id=event.user_id, fid=group_info.fid, text="[自动添加]清空发言（方式1）")
-                ],
-            )
-            await clear_posts_cmd.send(
-                f"用户 {user_info.nick_name}({user_info.tieba_uid}) 在本吧的发言清理完成，"
-                f"共删除 {posts_deleted} 条回复和 {threads_deleted} 个主题贴。"
-            )
+        job = await service.submit_clear_posts({
+            "bot_id": bot.self_id,
+            "group_id": group_info.group_id,
+            "fid": group_info.fid,
+            "operator_id": event.user_id,
+            "user_ids": user_ids,
+        })
+        await clear_posts_cmd.finish(
+            f"已创建清理任务（任务ID：{job.id}），可发送“任务列表”查看进度，发送“取消任务 {job.id}”取消。"
+        )
     elif mode.result == "方式2":
         await clear_posts_cmd.finish("方式2暂未实现。")
     else:
@@ -213,18 +211,13 @@ async def add_autoban_input(state: T_State, input_: GroupMessageEvent = Received
 
         client = await ClientCache.get_bawu_client(group_info.group_id)
         db_success, tieba_success = await service.add_ban_and_block(
-            client, group_info.fid, group_info.group_id, current_user, input_.user_id, text_reasons, img_reasons
+            client, group_info, current_user, input_.user_id, text_reasons, img_reasons
         )
 
         if not db_success:
             await add_autoban_cmd.send(f"用户 {current_user.nick_name}({current_user.tieba_uid}) 添加至循封列表失败。")
         else:
             await add_autoban_cmd.send(f"已将用户 {current_user.nick_name}({current_user.tieba_uid}) 添加至循封列表。")
-            await associated.add_associated_data(
-                current_user,
-                group_info,
-                text_data=[TextDataModel(uploader_id=input_.user_id, fid=group_info.fid, text="[自动添加]循封")],
-            )
             if not tieba_success:
                 log.warning(
                     f"Failed to block user {current_user.nick_name}({current_user.tieba_uid}) in "
@@ -369,12 +362,14 @@ async def delete_ban_reason_handle(event: GroupMessageEvent, state: T_State, tie
     state["img_reasons"] = list(img_reasons)
     img_reasons_list = []
 
-    for i, img in img_reasons:
-        img_data = await image.get_image_data(img.image_id)
-        if img_data is None:
-            img_reasons_list.append(MessageSegment.text(f"{i}. 图片数据获取失败" + f"注释：{img.note}"))
-        else:
-            img_reasons_list.append(f"{i}. " + MessageSegment.image(img_data) + f"注释：{img.note}")
+    # 所有图片共用一个数据库会话读取
+    async with unit_of_work():
+        for i, img in img_reasons:
+            img_data = await image.get_image_data(img.image_id)
+            if img_data is None:
+                img_reasons_list.append(MessageSegment.text(f"{i}. 图片数据获取失败" + f"注释：{img.note}"))
+            else:
+                img_reasons_list.append(f"{i}. " + MessageSegment.image(img_data) + f"注释：{img.note}")
     await delete_ban_reason_cmd.send(
         f"用户 {user_info.nick_name}({user_info.tieba_uid}) 的循封原因：\n" + "\n".join(text_reasons_list)
     )
@@ -568,15 +563,17 @@ async def get_ban_reason_handle(event: GroupMessageEvent, tieba_uid_str: Match[s
     img_reasons = list(enumerate(ban_reason.img_reason, start=img_enum_start))
     img_reasons_list = []
 
-    for i, img in img_reasons:
-        img_data = await image.get_image_data(img.image_id)
-        if img_data is None:
-            failed_img_text = f"{i}. 图片数据获取失败" + (f"注释：{img.note}" if img.note else "")
-            img_reasons_list.append(MessageSegment.text(failed_img_text))
-        else:
-            img_reasons_list.append(
-                f"{i}. " + MessageSegment.image(img_data) + (f"注释：{img.note}" if img.note else "")
-            )
+    # 所有图片共用一个数据库会话读取
+    async with unit_of_work():
+        for i, img in img_reasons:
+            img_data = await image.get_image_data(img.image_id)
+            if img_data is None:
+                failed_img_text = f"{i}. 图片数据获取失败" + (f"注释：{img.note}" if img.note else "")
+                img_reasons_list.append(MessageSegment.text(failed_img_text))
+            else:
+                img_reasons_list.append(
+                    f"{i}. " + MessageSegment.image(img_data) + (f"注释：{img.note}" if img.note else "")
+                )
 
     if img_reasons_list:
         img_msg = MessageSegment.text("\n").join(img_reasons_list)
@@ -1,83 +1,270 @@
 from __future__ import annotations
 
 import asyncio
-from typing import TYPE_CHECKING
-
-from src.db.crud import associated, autoban, image
+import time
+from functools import partial
+from typing import TYPE_CHECKING, NamedTuple
+
+from nonebot import get_bot
+from sqlalchemy.exc import SQLAlchemyError
+
+from logger import log
+from src.common import JobManager, TokenBucket
+from src.common.cache import (
+    ClientCache,
+    get_all_clear_posts_records,
+    remove_clear_posts_record,
+    set_clear_posts_record,
+)
+from src.db import UnitOfWorkError, unit_of_work
+from src.db.crud import associated, autoban, group, image
 from src.db.models import BanList, GroupInfo, ImgDataModel, TextDataModel
 
+from .config import config
+
 if TYPE_CHECKING:
+    from collections.abc import Callable
+
     from aiotieba.api.tieba_uid2user_info._classdef import UserInfo_TUid
     from aiotieba.typing import UserInfo
     from nonebot.adapters.onebot.v11 import Message
     from tiebameow.client import Client
 
+    from src.common import Job
+    from src.common.cache.clear_posts import ClearPostsInfo
 
-async def del_posts_from_user_posts(client: Client, fid: int, user_id: int) -> tuple[int, int]:
-    """
-    通过遍历用户发贴历史删除用户在指定吧的所有主题贴和回复。
 
-    Args:
-        client: 已登录的 Tieba Client 实例。
-        fid: 指定贴吧的 fid。
-        user_id: 目标用户 user_id。
+# 本进程中已提交、尚未结束的清空发言任务，避免机器人重连时重复恢复
+_active_clear_posts: set[str] = set()
 
-    Returns:
-        tuple: (posts_deleted, threads_deleted)
-    """
-    self_info = await client.get_self_info()
-    self_id = self_info.user_id
-    posts_deleted = 0
-    threads_deleted = 0
-    current_page = 1
-    batch_size = 10
-    has_empty = False
-    while not has_empty:
-        tasks = [
-            client.get_user_posts(user_id, pn=page, rn=50) for page in range(current_page, current_page + batch_size)
-        ]
-        results = await asyncio.gather(*tasks)
+
+class _DeleteOp(NamedTuple):
+    """待删除的单条发言，pid 为 0 时表示删除主题贴"""
+
+    tid: int
+    pid: int = 0
+
+
+# 删除会使后续发贴历史前移，单轮遍历可能遗漏，删除过内容时需要再次遍历
+CLEAR_POSTS_MAX_PASSES = 3
+
+
+async def _produce_post_ops(
+    client: Client, fid: int, user_id: int, self_id: int, queue: asyncio.Queue[_DeleteOp]
+) -> None:
+    """分批并发抓取用户回复历史，筛选出指定吧的回复放入删除队列"""
+    pn = 1
+    while True:
+        results = await asyncio.gather(
+            *(client.get_user_posts(user_id, pn=page, rn=50) for page in range(pn, pn + config.clear_posts_page_batch))
+        )
         for result in results:
             if not result.objs:
-                has_empty = True
-                break
+                return
             for posts in result.objs:
                 for post in posts.objs:
                     if post.author_id == self_id:  # 保险栓
                         break
                     if post.fid == fid:
-                        if await client.del_post(fid, tid=post.tid, pid=post.pid):
-                            posts_deleted += 1
-        current_page += batch_size
-    current_page = 1
-    has_empty = False
-    while not has_empty:
-        tasks = [client.get_user_threads(user_id, pn=page) for page in range(current_page, current_page + batch_size)]
-        results = await asyncio.gather(*tasks)
+                        await queue.put(_DeleteOp(post.tid, post.pid))
+        pn += config.clear_posts_page_batch
+
+
+async def _produce_thread_ops(
+    client: Client, fid: int, user_id: int, self_id: int, queue: asyncio.Queue[_DeleteOp]
+) -> None:
+    """分批并发抓取用户主题贴历史，筛选出指定吧的主题贴放入删除队列"""
+    pn = 1
+    while True:
+        results = await asyncio.gather(
+            *(client.get_user_threads(user_id, pn=page) for page in range(pn, pn + config.clear_posts_page_batch))
+        )
         for result in results:
             if not result.objs:
-                has_empty = True
-                break
+                return
             for thread in result.objs:
                 if thread.user.user_id == self_id:  # 保险栓
                     break
                 if thread.fid == fid:
-                    if await client.del_thread(fid, tid=thread.tid):
-                        threads_deleted += 1
-        current_page += batch_size
-    return posts_deleted, threads_deleted
+                    await queue.put(_DeleteOp(thread.tid))
+        pn += config.clear_posts_page_batch
+
+
+async def _consume_delete_ops(
+    client: Client,
+    fid: int,
+    queue: asyncio.Queue[_DeleteOp],
+    bucket: TokenBucket,
+    deleted: list[int],
+    on_progress: Callable[[int, int], None] | None,
+) -> None:
+    """从删除队列取出发言并限速删除，deleted 为 [回复数, 主题贴数] 的共享计数"""
+    while True:
+        op = await queue.get()
+        try:
+            await bucket.acquire()
+            if op.pid:
+                if await client.del_post(fid, tid=op.tid, pid=op.pid):
+                    deleted[0] += 1
+            elif await client.del_thread(fid, tid=op.tid):
+                deleted[1] += 1
+            if on_progress is not None:
+                on_progress(deleted[0], deleted[1])
+        except Exception as e:
+            log.warning(f"[ClearPosts] 删除失败 tid={op.tid} pid={op.pid}: {e}")
+        finally:
+            queue.task_done()
+
+
+async def del_posts_from_user_posts(
+    client: Client, fid: int, user_id: int, on_progress: Callable[[int, int], None] | None = None
+) -> tuple[int, int]:
+    """
+    通过遍历用户发贴历史删除用户在指定吧的所有主题贴和回复。
+
+    回复与主题贴的历史由两个生产者同时抓取，筛选后放入共享队列，
+    由多个删除协程按 clear_posts_rps 限速消费，抓取与删除互相重叠。
+
+    Args:
+        client: 已登录的 Tieba Client 实例。
+        fid: 指定贴吧的 fid。
+        user_id: 目标用户 user_id。
+        on_progress: 每删除一条发言后以 (posts_deleted, threads_deleted) 调用的进度回调。
+
+    Returns:
+        tuple: (posts_deleted, threads_deleted)
+    """
+    self_id = (await client.get_self_info()).user_id
+    bucket = TokenBucket(config.clear_posts_rps)
+    deleted = [0, 0]
+
+    for _ in range(CLEAR_POSTS_MAX_PASSES):
+        deleted_before = sum(deleted)
+        queue: asyncio.Queue[_DeleteOp] = asyncio.Queue(maxsize=config.clear_posts_workers * 20)
+        workers = [
+            asyncio.create_task(_consume_delete_ops(client, fid, queue, bucket, deleted, on_progress))
+            for _ in range(config.clear_posts_workers)
+        ]
+        producers = [
+            asyncio.create_task(_produce_post_ops(client, fid, user_id, self_id, queue)),
+            asyncio.create_task(_produce_thread_ops(client, fid, user_id, self_id, queue)),
+        ]
+        try:
+            await asyncio.gather(*producers)
+            await queue.join()
+        finally:
+            # 一个生产者出错时另一个可能仍在运行，无人消费时会永久阻塞在 queue.put 上
+            for task in (*producers, *workers):
+                task.cancel()
+            await asyncio.gather(*producers, *workers, return_exceptions=True)
+        if sum(deleted) == deleted_before:
+            break
+
+    return deleted[0], deleted[1]
+
+
+async def clear_users_posts(job: Job, task_id: str, info: ClearPostsInfo) -> None:
+    """
+    清空发言（方式1）后台任务，依次清理各用户在本吧的发言并在群内反馈结果。
+
+    任务信息持久化在磁盘缓存中，每清理完一个用户更新一次；
+    停机中断的任务会在下次启动、发起任务的机器人连接后由 resume_clear_posts_tasks 从未完成的用户继续。
+
+    Args:
+        job: 所属后台任务，用于汇报进度。
+        task_id: 持久化任务记录的 ID。
+        info: 任务信息。
+    """
+    keep_record = False
+    try:
+        group_info = await group.get_group(info["group_id"])
+        client = await ClientCache.get_bawu_client(info["group_id"])
+        self_id = (await client.get_self_info()).user_id
+        user_ids = list(info["user_ids"])
+        for index, user_id in enumerate(user_ids, start=1):
+            if user_id == self_id:
+                break
+
+            def report(posts_deleted: int, threads_deleted: int, index: int = index) -> None:
+                job.report(
+                    f"第 {index}/{len(user_ids)} 个用户，已删除 {posts_deleted} 条回复和 {threads_deleted} 个主题贴"
+                )
+
+            posts_deleted, threads_deleted = await del_posts_from_user_posts(client, group_info.fid, user_id, report)
+            user_info = await client.get_user_info(user_id)
+            await associated.add_associated_data(
+                user_info,
+                group_info,
+                text_data=[
+                    TextDataModel(
+                        uploader_id=info["operator_id"], fid=group_info.fid, text="[自动添加]清空发言（方式1）"
+                    )
+                ],
+            )
+            info["user_ids"] = user_ids[index:]
+            await set_clear_posts_record(task_id, info)
+            await _send_group_msg(
+                info,
+                f"用户 {user_info.nick_name}({user_info.tieba_uid}) 在本吧的发言清理完成，"
+                f"共删除 {posts_deleted} 条回复和 {threads_deleted} 个主题贴。",
+            )
+    except asyncio.CancelledError:
+        # 停机导致的取消保留记录以便下次启动时继续
+        keep_record = JobManager.is_draining()
+        raise
+    finally:
+        _active_clear_posts.discard(task_id)
+        if not keep_record:
+            await remove_clear_posts_record(task_id)
+
+
+async def submit_clear_posts(info: ClearPostsInfo, task_id: str | None = None) -> Job:
+    """提交清空发言后台任务，task_id 为空时创建并持久化新的任务记录"""
+    if task_id is None:
+        task_id = f"{info['group_id']}_{time.time_ns()}"
+        await set_clear_posts_record(task_id, info)
+    _active_clear_posts.add(task_id)
+    return JobManager.submit(
+        "清空发言", partial(clear_users_posts, task_id=task_id, info=info), group_id=info["group_id"]
+    )
+
+
+async def resume_clear_posts_tasks(bot_id: str) -> None:
+    """
+    恢复由指定机器人发起、上次停机时未完成的清空发言任务。
+
+    须在机器人连接后调用，否则任务的反馈消息无法发出；本进程中仍在执行的任务会被跳过。
+    """
+    resumed = 0
+    for task_id, info in (await get_all_clear_posts_records()).items():
+        if info["bot_id"] != bot_id or task_id in _active_clear_posts:
+            continue
+        if not info["user_ids"]:
+            await remove_clear_posts_record(task_id)
+            continue
+        await submit_clear_posts(info, task_id)
+        resumed += 1
+    if resumed:
+        log.info(f"[ClearPosts] 已恢复 {resumed} 个清空发言任务")
+
+
+async def _send_group_msg(info: ClearPostsInfo, message: str) -> None:
+    try:
+        bot = get_bot(info["bot_id"])
+        await bot.send_group_msg(group_id=info["group_id"], message=message)
+    except Exception as e:
+        log.error(f"[ClearPosts] 发送反馈消息失败: {e}")
 
 
 async def add_ban_and_block(
-    client: Client, fid: int, group_id: int, user: UserInfo, operator_id: int, text_reasons: list, img_reasons: list
+    client: Client, group_info: GroupInfo, user: UserInfo, operator_id: int, text_reasons: list, img_reasons: list
 ) -> tuple[bool, bool]:
     """
-    将用户加入循封列表并在贴吧封禁。
+    将用户加入循封列表、记录关联信息并在贴吧封禁。
 
     Args:
         client: 已登录的 Tieba Client 实例。
-        fid: 贴吧 fid。
-        group_id: 群组 ID。
+        group_info: 群组信息。
         user: 目标用户信息。
         operator_id: 操作者 ID。
         text_reasons: 文本原因列表。
@@ -86,6 +273,7 @@ async def add_ban_and_block(
     Returns:
         tuple: (db_success, tieba_success)
     """
+    fid = group_info.fid
     ban_reason = BanList(
         fid=fid,
         user_id=user.user_id,
@@ -94,7 +282,17 @@ async def add_ban_and_block(
         text_reason=text_reasons,
         img_reason=img_reasons,
     )
-    db_success = await autoban.add_ban(fid, group_id, ban_reason)
+    try:
+        async with unit_of_work():
+            db_success = await autoban.add_ban(fid, group_info.group_id, ban_reason)
+            if db_success:
+                db_success = await associated.add_associated_data(
+                    user,
+                    group_info,
+                    text_data=[TextDataModel(uploader_id=operator_id, fid=fid, text="[自动添加]循封")],
+                )
+    except UnitOfWorkError:
+        db_success = False
 
     tieba_success = False
     if db_success:
@@ -124,21 +322,30 @@ async def process_ban_images(
         tuple: (new_img_reasons, failed_count)
     """
     new_img_reasons = []
+    downloaded: list[tuple[bytes, str]] = []
     failed_count = 0
 
+    # 先完成所有下载，避免在事务中等待网络请求
     for img_info in pending_imgs:
-        img_data = await image.download_and_save_img(
-            url=img_info["url"], uploader_id=uploader_id, fid=fid, note=img_info["note"]
-        )
-        if isinstance(img_data, int):
+        content = await image.download_img(img_info["url"])
+        if isinstance(content, int):
             failed_count += 1
         else:
-            new_img_reasons.append(img_data)
+            downloaded.append((content, img_info["note"]))
+
+    if not downloaded:
+        return new_img_reasons, failed_count
 
-    if new_img_reasons:
-        current_img_reasons.extend(new_img_reasons)
-        await autoban.update_ban_reason(fid, user_id, img_reason=current_img_reasons)
+    try:
+        async with unit_of_work():
+            for content, note in downloaded:
+                new_img_reasons.append(await image.save_image(uploader_id, fid, content, note))
+            if not await autoban.update_ban_reason(fid, user_id, img_reason=[*current_img_reasons, *new_img_reasons]):
+                raise UnitOfWorkError("Failed to update ban reason")
+    except SQLAlchemyError:
+        return [], failed_count + len(downloaded)
 
+    current_img_reasons.extend(new_img_reasons)
     return new_img_reasons, failed_count
 
 
@@ -226,11 +433,17 @@ async def remove_autoban_users(
     """
     success = []
     failure = []
+    statuses = await autoban.get_ban_statuses(group_info.fid, [user_info.user_id for user_info in user_infos])
     for user_info in user_infos:
-        is_banned, ban_reason = await autoban.get_ban_status(group_info.fid, user_info.user_id)
-        if ban_reason is None:
+        is_banned = statuses[user_info.user_id]
+        if is_banned == "not":
             failure.append((user_info.nick_name, user_info.tieba_uid, "不在循封列表中"))
         elif is_banned == "unbanned":
+            # 只有已解除的用户需要完整记录中的解封时间与操作人
+            _, ban_reason = await autoban.get_ban_status(group_info.fid, user_info.user_id)
+            if ban_reason is None:
+                failure.append((user_info.nick_name, user_info.tieba_uid, "不在循封列表中"))
+                continue
             unban_time_str = (
                 ban_reason.unban_time.strftime("%Y-%m-%d %H:%M:%S") if ban_reason.unban_time else "未知时间"
             )
@@ -281,17 +494,25 @@ async def delete_ban_reasons(
     Returns:
         bool: 更新循封原因是否成功。
     """
+    deleted_images: list[ImgDataModel] = []
     for delete_id in delete_ids:
-        text = next((text_reason for index, text_reason in text_reasons if index == delete_id), None)
-        if text is not None:
+        if any(index == delete_id for index, _ in text_reasons):
             text_reasons[:] = [x for x in text_reasons if x[0] != delete_id]
-            continue
-        img = next((img_reason for index, img_reason in img_reasons if index == delete_id), None)
-        if img is not None:
-            await image.delete_image(img.image_id)
+        elif (img := next((img for index, img in img_reasons if index == delete_id), None)) is not None:
+            deleted_images.append(img)
             img_reasons[:] = [x for x in img_reasons if x[0] != delete_id]
-            continue
 
-    text_reason_models = [text for _, text in text_reasons]
-    img_reason_models = [img for _, img in img_reasons]
-    return await autoban.update_ban_reason(fid, user_id, text_reason=text_reason_models, img_reason=img_reason_models)
+    try:
+        async with unit_of_work():
+            for img in deleted_images:
+                await image.delete_image(img.image_id)
+            if not await autoban.update_ban_reason(
+                fid,
+                user_id,
+                text_reason=[text for _, text in text_reasons],
+                img_reason=[img for _, img in img_reasons],
+            ):
+                raise UnitOfWorkError("Failed to update ban reason")
+    except UnitOfWorkError:
+        return False
+    return True
@@ -1,5 +1,6 @@
 from .decorators import require_bduss, require_master_bduss, require_slave_bduss, require_stoken
 from .helpers import (
+    TIEBA_URL_MARK,
     get_tieba_user_info,
     get_user_name,
     handle_post_url,
@@ -25,6 +26,7 @@ from .rules import (
 )
 
 __all__ = [
+    "TIEBA_URL_MARK",
     "get_tieba_user_info",
     "get_user_name",
     "handle_post_url",
@@ -3,23 +3,29 @@ from __future__ import annotations
 import re
 from typing import TYPE_CHECKING
 
-from src.common.cache import ClientCache
+from src.common.cache import ClientCache, get_group_member
 
 if TYPE_CHECKING:
     from aiotieba.api.tieba_uid2user_info._classdef import UserInfo_TUid
     from nonebot.adapters import Bot
     from tiebameow.client import Client
 
+# 贴子链接的公共片段，可用于在正则匹配前快速排除无关消息
+TIEBA_URL_MARK = "tieba.baidu.com/p/"
+_TIEBA_UID_RE = re.compile(r"#(\d+)#")
+_THREAD_URL_RE = re.compile(r"tieba\.baidu\.com/p/(\d+)")
+_POST_URL_RE = re.compile(r"tieba\.baidu\.com/p/(\d+)\?.*post_id=(\d+)")
+
 
 async def get_user_name(bot: Bot, group_id: int, user_id: int) -> str | None:
+    if (member := await get_group_member(bot, group_id, user_id)) is None:
+        return None
+    if member.name:
+        return member.name
     try:
-        username = (await bot.call_api("get_group_member_info", group_id=group_id, user_id=user_id)).get("card_new", "")
-        if not username:
-            username = (await bot.call_api("get_stranger_info", user_id=user_id)).get("nickname", "")
+        return (await bot.call_api("get_stranger_info", user_id=user_id)).get("nickname", "")
     except Exception:
         return None
-    else:
-        return username
 
 
 async def get_tieba_user_info(tieba_uid: int, client: Client) -> UserInfo_TUid:
@@ -40,7 +46,7 @@ async def handle_tieba_uid(tieba_uid_str: str, client: Client | None = None) ->
             return 0
     if tieba_uid_str.isdigit():
         return int(tieba_uid_str)
-    match = re.search(r"#(\d+)#", tieba_uid_str)
+    match = _TIEBA_UID_RE.search(tieba_uid_str)
     if match:
         return int(match.group(1))
     else:
@@ -56,7 +62,9 @@ async def handle_tieba_uids(tieba_uid_strs: tuple[str, ...]) -> list[int]:
 def handle_thread_url(thread_url: str) -> int:
     if thread_url.isdigit():
         return int(thread_url)
-    match = re.search(r"tieba.baidu.com/p/(\d+)", thread_url)
+    if TIEBA_URL_MARK not in thread_url:
+        return 0
+    match = _THREAD_URL_RE.search(thread_url)
     if match:
         return int(match.group(1))
     else:
@@ -68,7 +76,9 @@ def handle_thread_urls(thread_urls: tuple[str, ...]) -> list[int]:
 
 
 def handle_post_url(post_url: str) -> tuple[int, int]:
-    match = re.search(r"tieba.baidu.com/p/(\d+)\?.*post_id=(\d+)", post_url)
+    if TIEBA_URL_MARK not in post_url:
+        return 0, 0
+    match = _POST_URL_RE.search(post_url)
     if match:
         return int(match.group(1)), int(match.group(2))
     else:
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import nonebot
+from nonebot.adapters.onebot.v11 import GroupMessageEvent
+from nonebot.exception import IgnoredException
+from nonebot.matcher import matchers
+
+from src.db.crud.group import get_group_entry
+
+from .helpers import TIEBA_URL_MARK
+
+if TYPE_CHECKING:
+    from nonebot.adapters import Event
+
+# 所有指令都启用了 use_cmd_start，不以指令前缀开头的消息不会触发任何指令
+_COMMAND_START = tuple(nonebot.get_driver().config.command_start)
+
+
+def _has_pending_session() -> bool:
+    """是否有等待用户后续输入的临时响应器（prompt、receive 等）"""
+    return any(matcher.temp for group in matchers.values() for matcher in group)
+
+
+async def prefilter_message(event: Event) -> None:
+    """
+    群消息预过滤
+
+    在分发到各响应器之前丢弃不可能被处理的群消息，按开销从低到高依次检查：
+    指令前缀、贴子链接、回复消息（仅已初始化的群处理），最后是是否有进行中的交互会话。
+    未初始化的群中只有初始化指令和贴子链接预览可能生效，普通消息会在此处直接丢弃。
+    """
+    if not isinstance(event, GroupMessageEvent):
+        return
+    if event.get_plaintext().lstrip().startswith(_COMMAND_START) or TIEBA_URL_MARK in event.raw_message:
+        return
+    if event.reply and await get_group_entry(event.group_id) is not None:
+        return
+    if _has_pending_session():
+        return
+    raise IgnoredException("message is irrelevant to all matchers")
@@ -1,36 +1,28 @@
 from nonebot.adapters import Bot
 from nonebot.adapters.onebot.v11 import FriendRequestEvent, GroupMessageEvent, NoticeEvent
 
-from src.db.crud import get_all_groups, get_group
+from src.common.cache import get_group_member
+from src.db.crud import GroupRole, get_group_role
+from src.db.crud.group import get_group_entry, get_registry
 
 
 async def rule_owner(bot: Bot, event: GroupMessageEvent) -> bool:
-    group_member_list: list = await bot.call_api("get_group_member_list", group_id=event.group_id)
-    return any(item["role"] == "owner" and item["user_id"] == event.sender.user_id for item in group_member_list)
+    if not event.sender.user_id:
+        return False
+    member = await get_group_member(bot, event.group_id, event.sender.user_id)
+    return member is not None and member.role == "owner"
 
 
 async def is_master(user_id: int, group_id: int) -> bool:
-    try:
-        group_info = await get_group(group_id)
-    except KeyError:
-        return False
-    return user_id == group_info.master
+    return await get_group_role(group_id, user_id) >= GroupRole.MASTER
 
 
 async def is_admin(user_id: int, group_id: int) -> bool:
-    try:
-        group_info = await get_group(group_id)
-    except KeyError:
-        return False
-    return user_id in group_info.admins or await is_master(user_id, group_id)
+    return await get_group_role(group_id, user_id) >= GroupRole.ADMIN
 
 
 async def is_moderator(user_id: int, group_id: int) -> bool:
-    try:
-        group_info = await get_group(group_id)
-    except KeyError:
-        return False
-    return user_id in group_info.moderators or await is_admin(user_id, group_id)
+    return await get_group_role(group_id, user_id) >= GroupRole.MODERATOR
 
 
 async def rule_reply(event: GroupMessageEvent) -> bool:
@@ -85,17 +77,9 @@ async def rule_signed(event: GroupMessageEvent | NoticeEvent) -> bool:
         group_id = getattr(event, "group_id", None)
         if not group_id:
             return False
-    try:
-        _ = await get_group(group_id)
-        return True
-    except KeyError:
-        return False
+    return await get_group_entry(group_id) is not None
 
 
 async def rule_member(event: FriendRequestEvent) -> bool:
     user_id = event.user_id
-    group_infos = await get_all_groups()
-    for group_info in group_infos:
-        if user_id in group_info.admins or user_id in group_info.moderators or user_id == group_info.master:
-            return True
-    return False
+    return user_id in (await get_registry()).members
@@ -0,0 +1,4 @@
+import nonebot
+
+# src 下的模块在导入时读取驱动器配置，须先初始化
+nonebot.init()